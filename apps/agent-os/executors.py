@@ -0,0 +1,128 @@
+"""
+Bounded Executors: Per-dependency thread pools for blocking calls
+Each pool has a fixed number of threads and a bounded queue; once both are
+full, submit() fails fast so the API can shed load instead of queueing it
+"""
+
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when a pool's threads and queue are all taken."""
+    
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} executor is saturated, retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class BoundedExecutor(Executor):
+    """
+    ThreadPoolExecutor that admits at most max_workers + max_queue tasks.
+    
+    Usable anywhere an Executor is expected (loop.run_in_executor,
+    ThreadedComplianceMemoryAgent). Rejected submissions raise
+    ExecutorSaturatedError with a Retry-After estimate derived from the
+    recent task duration and the current backlog.
+    """
+    
+    def __init__(self, name: str, max_workers: int, max_queue: int = 0):
+        """
+        Args:
+            name: Pool name, used in thread names, errors and metrics
+            max_workers: Threads running tasks concurrently
+            max_queue: Tasks allowed to wait for a thread (0: no waiting)
+        """
+        if max_workers < 1 or max_queue < 0:
+            raise ValueError(f"Invalid executor size: max_workers={max_workers}, max_queue={max_queue}")
+        
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-executor")
+        self._lock = threading.Lock()
+        self._admitted = 0  # Queued + running
+        self._running = 0
+        
+        # Stats
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._avg_duration = 0.0  # Exponentially weighted, seconds
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturatedError(self.name, self._retry_after())
+            self._admitted += 1
+        
+        submitted_at = time.monotonic()
+        
+        def run():
+            started_at = time.monotonic()
+            with self._lock:
+                self._running += 1
+                wait = started_at - submitted_at
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                duration = time.monotonic() - started_at
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._avg_duration = duration if self._completed == 1 else 0.8 * self._avg_duration + 0.2 * duration
+        
+        try:
+            future = self._executor.submit(run)
+        except RuntimeError:
+            # Executor shut down
+            self._release()
+            raise
+        
+        # Also fires for queued futures cancelled before they ran
+        # (future.cancel(), shutdown(cancel_futures=True))
+        future.add_done_callback(self._release)
+        return future
+    
+    def _release(self, future: Future = None):
+        with self._lock:
+            self._admitted -= 1
+    
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Await fn(*args, **kwargs) on this pool."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+    
+    def _retry_after(self) -> float:
+        # Time for the backlog ahead of a new task to drain (caller holds the lock)
+        backlog = self._admitted / self.max_workers
+        return max(1.0, math.ceil(backlog * self._avg_duration))
+    
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy, rejections and queue wait-time statistics."""
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "utilization": round(self._running / self.max_workers, 3),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(1000 * self._total_wait / started, 3) if started else 0.0,
+                "max_wait_ms": round(1000 * self._max_wait, 3),
+                "avg_duration_ms": round(1000 * self._avg_duration, 3)
+            }
@@ -0,0 +1,163 @@
+"""
+Uploads: Stream uploaded documents to disk in fixed-size chunks
+The body is hashed, size-checked and UTF-8 validated as it is copied, so
+memory per upload is bounded by the chunk size, not the file size.
+UploadSizeLimitMiddleware caps the request body while it is received,
+before the framework spools the multipart form.
+"""
+
+import asyncio
+import codecs
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+
+from fastapi.responses import JSONResponse
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+    
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the {max_bytes} byte limit")
+        self.max_bytes = max_bytes
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware rejecting request bodies over max_bytes with 413.
+    
+    Content-Length is checked up front, and the bytes actually received
+    are counted as well, so chunked requests (no Content-Length) cannot
+    get past the limit. Once the limit is crossed the app's own response
+    (usually a form parsing error) is replaced with the 413.
+    """
+    
+    def __init__(self, app, path: str, max_bytes: int, limit_bytes: int):
+        """
+        Args:
+            app: Wrapped ASGI app
+            path: Upload route (POST requests to it are limited)
+            max_bytes: Upload size limit reported to the client
+            limit_bytes: Body size enforced (max_bytes plus multipart framing)
+        """
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+        self.limit_bytes = limit_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+        
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.limit_bytes:
+            await self._reject(scope, receive, send)
+            return
+        
+        received = 0
+        exceeded = False
+        response_started = False
+        
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit_bytes:
+                    exceeded = True
+                    raise UploadTooLargeError(self.max_bytes)
+            return message
+        
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                # Drop whatever the app answers to the aborted body
+                return
+            response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        
+        if exceeded and not response_started:
+            await self._reject(scope, receive, send)
+    
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Upload exceeds the {self.max_bytes} byte limit"},
+            headers={"Connection": "close"}
+        )
+        await response(scope, receive, send)
+
+
+@dataclass
+class StoredUpload:
+    """An upload written to the uploads directory"""
+    path: str
+    size_bytes: int
+    sha256: str
+
+
+async def store_upload(file, upload_dir: str, max_bytes: int, chunk_size: int = 1024 * 1024) -> StoredUpload:
+    """
+    Copy an UploadFile to upload_dir, chunk by chunk.
+    
+    The data is spooled to a temporary file and renamed to <sha256>.txt once
+    complete, so identical uploads share one file and readers never see a
+    partial one.
+    
+    Args:
+        file: FastAPI UploadFile
+        upload_dir: Directory shared with the job workers
+        max_bytes: Largest accepted upload
+        chunk_size: Bytes read (and held in memory) at a time
+    
+    Raises:
+        UploadTooLargeError: More than max_bytes were sent
+        UnicodeDecodeError: The upload is not UTF-8 text
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    size = 0
+    
+    fd, spool_path = tempfile.mkstemp(dir=upload_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                
+                # Only validates; the decoded text is not kept
+                decoder.decode(chunk)
+                digest.update(chunk)
+                await loop.run_in_executor(None, spool.write, chunk)
+            
+            decoder.decode(b"", final=True)
+        
+        path = os.path.join(upload_dir, f"{digest.hexdigest()}.txt")
+        os.replace(spool_path, path)
+    
+    except BaseException:
+        try:
+            os.unlink(spool_path)
+        except OSError:
+            pass
+        raise
+    
+    return StoredUpload(path=path, size_bytes=size, sha256=digest.hexdigest())
+
+
+def read_upload(path: str) -> str:
+    """Text of a stored upload."""
+    with open(path, encoding="utf-8") as f:
+        return f.read()
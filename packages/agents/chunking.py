@@ -0,0 +1,232 @@
+"""
+Document Chunking: Section-aware splitting and map-reduce merging for long documents
+Chunks are analyzed independently and their findings merged into one deduplicated list
+"""
+
+import re
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .compliance_agents import ComplianceFinding
+
+
+# Lines that start a new section: markdown headings, "Section 4", "ARTICLE IX",
+# numbered headings ("12.3 Limitation of Liability") and short all-caps titles
+SECTION_HEADING = re.compile(
+    r"^[ \t]*("
+    r"#{1,6}[ \t]+\S.*"
+    r"|(?i:section|article|clause|schedule|appendix|exhibit|annex|part)[ \t]+[\dIVXLC]+[\w.]*\b.*"
+    r"|\d{1,3}(?:\.\d{1,3})*[.)]?[ \t]+[A-Z][^\n]{0,100}"
+    r"|[A-Z][A-Z0-9 ,&/\-]{3,80}"
+    r")[ \t]*$",
+    re.MULTILINE
+)
+
+SEVERITY_RANK = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+
+
+@dataclass
+class DocumentChunk:
+    """A contiguous slice of a document, with leading overlap from the previous chunk"""
+    index: int
+    total: int
+    text: str
+    start_char: int  # Offset of text[0] in the document (including overlap)
+    end_char: int
+    section_title: Optional[str] = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English prose)."""
+    return max(1, len(text) // 4)
+
+
+def split_sections(text: str) -> List[Tuple[int, int, Optional[str]]]:
+    """Return (start, end, title) spans covering text, cut at section headings."""
+    starts = [m.start() for m in SECTION_HEADING.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    
+    spans = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        if end <= start:
+            continue
+        first_line = text[start:end].strip().split("\n", 1)[0].strip()
+        title = first_line[:120] if SECTION_HEADING.match(first_line) else None
+        spans.append((start, end, title))
+    
+    return spans
+
+
+def _split_oversized(start: int, end: int, text: str, max_chars: int) -> List[Tuple[int, int]]:
+    """Cut a span longer than max_chars at paragraph, then sentence, then word boundaries."""
+    pieces = []
+    
+    while end - start > max_chars:
+        window = text[start:start + max_chars]
+        cut = -1
+        for boundary in ("\n\n", "\n", ". ", " "):
+            cut = window.rfind(boundary, max_chars // 2)
+            if cut != -1:
+                cut += len(boundary)
+                break
+        if cut <= 0:
+            cut = max_chars
+        pieces.append((start, start + cut))
+        start += cut
+    
+    pieces.append((start, end))
+    return pieces
+
+
+def split_into_chunks(
+    text: str,
+    max_chars: int = 10000,
+    overlap_chars: int = 500
+) -> List[DocumentChunk]:
+    """
+    Split a document into chunks of at most max_chars (plus overlap).
+    
+    Whole sections are packed greedily into each chunk; only sections longer
+    than max_chars are cut inside. Every chunk after the first repeats the
+    last overlap_chars of its predecessor, so clauses spanning a boundary are
+    seen whole by at least one chunk.
+    
+    Args:
+        text: Full document text
+        max_chars: Maximum new characters per chunk
+        overlap_chars: Characters repeated from the previous chunk
+    
+    Returns:
+        Chunks in document order
+    """
+    if len(text) <= max_chars:
+        return [DocumentChunk(index=0, total=1, text=text, start_char=0, end_char=len(text))]
+    
+    # Pack sections into (start, end, title) ranges of at most max_chars
+    ranges: List[Tuple[int, int, Optional[str]]] = []
+    current_start, current_end, current_title = None, None, None
+    
+    for start, end, title in split_sections(text):
+        for piece_start, piece_end in _split_oversized(start, end, text, max_chars):
+            if current_start is not None and piece_end - current_start <= max_chars:
+                current_end = piece_end
+                continue
+            if current_start is not None:
+                ranges.append((current_start, current_end, current_title))
+            current_start, current_end, current_title = piece_start, piece_end, title
+    
+    if current_start is not None:
+        ranges.append((current_start, current_end, current_title))
+    
+    chunks = []
+    for i, (start, end, title) in enumerate(ranges):
+        chunk_start = start
+        if i > 0 and overlap_chars > 0:
+            chunk_start = max(0, start - overlap_chars)
+            # Begin the overlap on a word boundary
+            space = text.find(" ", chunk_start, start)
+            if space != -1:
+                chunk_start = space + 1
+        
+        chunks.append(DocumentChunk(
+            index=i,
+            total=len(ranges),
+            text=text[chunk_start:end],
+            start_char=chunk_start,
+            end_char=end,
+            section_title=title
+        ))
+    
+    return chunks
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercased alphanumeric words, for comparing titles and evidence."""
+    return re.sub(r"[^a-z0-9]+", " ", (value or "").lower()).strip()
+
+
+def merge_findings(chunk_findings: List[List["ComplianceFinding"]]) -> List["ComplianceFinding"]:
+    """
+    Reduce per-chunk findings into one list, in document order.
+    
+    Findings are duplicates when they share framework and normalized title,
+    or framework and normalized evidence (the same clause seen by two
+    overlapping chunks). The most severe duplicate is kept and the locations
+    of all duplicates are combined.
+    """
+    merged: List["ComplianceFinding"] = []
+    by_key = {}
+    
+    for findings in chunk_findings:
+        for finding in findings:
+            keys = [("title", finding.framework, normalize_text(finding.title))]
+            evidence = normalize_text(finding.evidence)
+            if len(evidence) >= 20:
+                keys.append(("evidence", finding.framework, evidence))
+            
+            existing = next((by_key[k] for k in keys if k in by_key), None)
+            
+            if existing is None:
+                position = len(merged)
+                merged.append(finding)
+            else:
+                position = existing
+                kept = merged[position]
+                locations = [loc for loc in (kept.location, finding.location) if loc]
+                location = "; ".join(dict.fromkeys(locations)) or None
+                
+                if SEVERITY_RANK.get(finding.severity, 0) > SEVERITY_RANK.get(kept.severity, 0):
+                    kept = finding
+                merged[position] = replace(kept, location=location)
+            
+            for key in keys:
+                by_key.setdefault(key, position)
+    
+    return merged
+
+
+class TokenBudget:
+    """
+    Weighted semaphore over estimated prompt tokens in flight.
+    
+    Shared by all agents so that concurrent chunk calls stay under one
+    process-wide token budget. A request larger than the whole budget is
+    admitted on its own once nothing else is in flight.
+    """
+    
+    def __init__(self, max_tokens: int):
+        """
+        Args:
+            max_tokens: Maximum estimated prompt tokens across in-flight calls
+        """
+        self.max_tokens = max_tokens
+        self._in_flight = 0
+        self._peak = 0
+        self._condition = threading.Condition()
+    
+    def acquire(self, tokens: int) -> int:
+        """Block until tokens fit in the budget; returns the amount to release."""
+        tokens = min(tokens, self.max_tokens)
+        with self._condition:
+            while self._in_flight + tokens > self.max_tokens:
+                self._condition.wait()
+            self._in_flight += tokens
+            self._peak = max(self._peak, self._in_flight)
+        return tokens
+    
+    def release(self, tokens: int):
+        with self._condition:
+            self._in_flight -= tokens
+            self._condition.notify_all()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "max_tokens": self.max_tokens,
+                "in_flight_tokens": self._in_flight,
+                "peak_tokens": self._peak
+            }
@@ -3,85 +3,469 @@ Compliance Framework Agents
 Specialized agents for GDPR, SOC2, and Contract Risk analysis
 """
 
-from typing import Dict, Any, List, Optional
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 import json
+import logging
+import time
+
+from .llm_cache import LLMResponseCache
+from .chunking import DocumentChunk, TokenBudget, split_into_chunks, merge_findings
+from .token_budget import TokenUsageRecorder, count_tokens, document_token_budget, chars_for_tokens
+from .streaming import IncrementalFindingsParser
+
+
+logger = logging.getLogger(__name__)
+
+# System prompt shared by every framework agent. With the document right
+# after it, all analyses of the same document (or chunk) start with an
+# identical prefix that provider-side prompt caching can reuse.
+PROMPT_PREAMBLE = (
+    "You are a compliance analysis assistant. The user message starts with the document "
+    "to review, followed by the framework, rubric and JSON output format to apply to it. "
+    "Answer with a single JSON object in that format."
+)
+
+DOCUMENT_HEADER = "**Document Content:**\n"
+
+# Tokens set aside for the framework suffix when sizing chunks. Using the same
+# reserve for every framework keeps chunk boundaries, and so the cacheable
+# prefixes, identical across the GDPR, SOC 2 and contract calls.
+PROMPT_SUFFIX_RESERVE = 2048
+
+# Values compliance_findings accepts (see the schema); anything else the model
+# (or a cached response) returns is mapped through the aliases or defaulted
+SEVERITIES = ("critical", "high", "medium", "low", "info")
+FINDING_TYPES = ("violation", "gap", "risk", "compliant", "best_practice", "favorable", "standard")
+SEVERITY_ALIASES = {
+    "severe": "critical",
+    "major": "high",
+    "moderate": "medium",
+    "minor": "low",
+    "informational": "info",
+    "none": "info"
+}
+FINDING_TYPE_ALIASES = {
+    "best practice": "best_practice",
+    "recommendation": "best_practice",
+    "non-compliant": "violation",
+    "noncompliant": "violation",
+    "non_compliant": "violation"
+}
 
 
 @dataclass
 class ComplianceFinding:
     """Structured compliance finding"""
     framework: str
-    finding_type: str  # 'violation', 'gap', 'risk', 'compliant'
-    severity: str  # 'critical', 'high', 'medium', 'low'
+    finding_type: str  # One of FINDING_TYPES
+    severity: str  # One of SEVERITIES
     title: str
     description: str
     location: Optional[str] = None
     evidence: Optional[str] = None
     recommendation: Optional[str] = None
     reasoning: Optional[str] = None
+    pattern_key: Optional[str] = None  # Learned pattern that produced this finding
+    start_offset: Optional[int] = None  # Character offsets of deterministic matches
+    end_offset: Optional[int] = None
+    section_hash: Optional[str] = None  # Section the finding is anchored in (incremental re-analysis)
 
 
-class GDPRComplianceAgent:
+class ComplianceFrameworkAgent(ABC):
     """
-    Agent specialized in GDPR (General Data Protection Regulation) analysis.
-    Checks for compliance with EU data protection requirements.
+    Base class for framework agents: JSON findings out of LLM calls.
+    Subclasses provide the prompts and the framework identifier.
+    
+    Documents that do not fit one request are analyzed map-reduce style:
+    split on section boundaries, chunks analyzed concurrently, findings
+    merged. Chunk size is measured in tokens against the model's context
+    window unless a fixed chunk_chars is configured.
     """
     
-    def __init__(self, llm_client, model: str = "gpt-4o"):
+    framework = ""
+    label = ""  # Human-readable framework name
+    expert_intro = ""  # First line of the system prompt
+    default_finding_type = "gap"
+    temperature = 0.2  # Lower temperature for consistent compliance checks
+    
+    def __init__(
+        self,
+        llm_client,
+        model: str = "gpt-4o",
+        response_cache: Optional[LLMResponseCache] = None,
+        chunk_chars: Optional[int] = None,
+        chunk_overlap: int = 500,
+        chunk_concurrency: int = 4,
+        token_budget: Optional[TokenBudget] = None,
+        max_chunk_tokens: Optional[int] = None,
+        completion_reserve: int = 4096,
+        usage_recorder: Optional[TokenUsageRecorder] = None
+    ):
+        """
+        Args:
+            llm_client: LiteLLM or OpenAI client
+            model: LLM model identifier
+            response_cache: Optional on-disk cache of LLM responses
+            chunk_chars: Fixed document characters per LLM call (None: size by tokens)
+            chunk_overlap: Characters repeated between consecutive chunks
+            chunk_concurrency: Maximum chunk calls in flight per document
+            token_budget: Optional shared limit on prompt tokens in flight
+            max_chunk_tokens: Cap on document tokens per call (None: fill the context window)
+            completion_reserve: Tokens kept free for (and requested as) the response
+            usage_recorder: Optional sink for per-request token counts
+        """
         self.llm = llm_client
         self.model = model
-        self.name = "gdpr_agent"
+        self.response_cache = response_cache
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self.chunk_concurrency = max(1, chunk_concurrency)
+        self.token_budget = token_budget
+        self.max_chunk_tokens = max_chunk_tokens
+        self.completion_reserve = completion_reserve
+        self.usage_recorder = usage_recorder
     
-    def analyze_document(self, document_text: str, document_metadata: Dict[str, Any]) -> List[ComplianceFinding]:
+    def analyze_document(
+        self,
+        document_text: str,
+        document_metadata: Dict[str, Any],
+        bypass_cache: bool = False,
+        on_finding: Optional[Callable[[ComplianceFinding], None]] = None
+    ) -> List[ComplianceFinding]:
         """
-        Analyze a document for GDPR compliance.
+        Analyze a document against this agent's framework.
+        
+        Args:
+            document_text: Full text content
+            document_metadata: Metadata (filename, type, etc.)
+            bypass_cache: Always call the LLM (the fresh response is still cached)
+            on_finding: Called with each finding as soon as it is parsed from the
+                streamed completion (before chunk results are merged)
         
         Returns:
             List of compliance findings
         """
         
+        chunk_chars = self.chunk_chars or self._chunk_chars_for(document_text, document_metadata)
+        chunks = split_into_chunks(document_text, chunk_chars, self.chunk_overlap)
+        if len(chunks) == 1:
+            return self._analyze_text(document_text, document_metadata, bypass_cache, on_finding)
+        
+        def run(chunk: DocumentChunk):
+            try:
+                metadata = {**document_metadata, "chunk": chunk}
+                return self._analyze_text(chunk.text, metadata, bypass_cache, on_finding), None
+            except Exception as e:
+                logger.exception("%s: chunk %d/%d failed", self.framework, chunk.index + 1, chunk.total)
+                return None, e
+        
+        with ThreadPoolExecutor(
+            max_workers=min(self.chunk_concurrency, len(chunks)),
+            thread_name_prefix=f"{self.framework}-chunk"
+        ) as executor:
+            outcomes = list(executor.map(run, chunks))
+        
+        chunk_findings = [findings for findings, _ in outcomes if findings is not None]
+        if not chunk_findings:
+            raise outcomes[0][1]
+        
+        return merge_findings(chunk_findings)
+    
+    def _chunk_chars_for(self, document_text: str, document_metadata: Dict[str, Any]) -> int:
+        """
+        Characters of this document that fit one request: the model's context
+        minus preamble, framework suffix and completion reserve, converted
+        with the document's own token density.
+        """
+        # Worst-case excerpt line, so the budget holds for every chunk
+        placeholder = DocumentChunk(
+            index=9999, total=9999, text="",
+            start_char=10 ** 9, end_char=10 ** 9, section_title="x" * 120
+        )
+        suffix_tokens = count_tokens(
+            self._build_instructions({**document_metadata, "chunk": placeholder}),
+            self.model
+        )
+        fixed_tokens = (
+            count_tokens(self._get_system_prompt(), self.model)
+            + count_tokens(DOCUMENT_HEADER, self.model)
+            + max(PROMPT_SUFFIX_RESERVE, suffix_tokens)
+        )
+        
+        tokens = document_token_budget(self.model, fixed_tokens, self.completion_reserve, self.max_chunk_tokens)
+        chars = chars_for_tokens(document_text, tokens, self.model)
+        
+        # Overlap is added on top of each chunk's new text
+        return max(1000, chars - self.chunk_overlap)
+    
+    def _analyze_text(
+        self,
+        document_text: str,
+        document_metadata: Dict[str, Any],
+        bypass_cache: bool = False,
+        on_finding: Optional[Callable[[ComplianceFinding], None]] = None
+    ) -> List[ComplianceFinding]:
+        """Single LLM call over text that fits in one prompt."""
+        
+        system_prompt = self._get_system_prompt()
         prompt = self._build_analysis_prompt(document_text, document_metadata)
         
-        response = self.llm.chat.completions.create(
-            model=self.model,
-            messages=[
+        analysis = json.loads(self._complete(system_prompt, prompt, bypass_cache, on_finding))
+        
+        # Convert to ComplianceFinding objects
+        findings = []
+        for finding_dict in analysis.get("findings", []):
+            finding = self._to_finding(finding_dict)
+            if finding is not None:
+                findings.append(finding)
+        
+        return findings
+    
+    def _to_finding(self, finding_dict: Dict[str, Any]) -> Optional[ComplianceFinding]:
+        if not isinstance(finding_dict, dict):
+            logger.warning("Dropping malformed finding: %.200r", finding_dict)
+            return None
+        
+        return ComplianceFinding(
+            framework=self.framework,
+            finding_type=self._normalize(
+                finding_dict.get("finding_type"), FINDING_TYPES, FINDING_TYPE_ALIASES, self.default_finding_type
+            ),
+            severity=self._normalize(finding_dict.get("severity"), SEVERITIES, SEVERITY_ALIASES, "medium"),
+            title=finding_dict.get("title") or "",
+            description=finding_dict.get("description") or "",
+            location=finding_dict.get("location"),
+            evidence=finding_dict.get("evidence"),
+            recommendation=finding_dict.get("recommendation"),
+            reasoning=finding_dict.get("reasoning")
+        )
+    
+    @staticmethod
+    def _normalize(value: Any, allowed: Tuple[str, ...], aliases: Dict[str, str], default: str) -> str:
+        """Map a model-supplied enum value onto the allowed set ("Critical" -> "critical")."""
+        if value is None:
+            return default
+        key = str(value).strip().lower()
+        key = aliases.get(key, key).replace(" ", "_")
+        if key in allowed:
+            return key
+        logger.warning("Unexpected value %.50r; using %r", value, default)
+        return default
+    
+    def _complete(
+        self,
+        system_prompt: str,
+        prompt: str,
+        bypass_cache: bool = False,
+        on_finding: Optional[Callable[[ComplianceFinding], None]] = None
+    ) -> str:
+        """
+        Return the raw JSON response, from the response cache when possible.
+        With on_finding, the completion is streamed and each finding is
+        reported as soon as its JSON object is complete.
+        """
+        
+        prompt_tokens = count_tokens(system_prompt, self.model) + count_tokens(prompt, self.model)
+        
+        cache_key = None
+        if self.response_cache:
+            cache_key = LLMResponseCache.make_key(self.model, system_prompt, prompt, self.temperature)
+            if bypass_cache:
+                self.response_cache.record_bypass()
+            else:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    if self.usage_recorder:
+                        self.usage_recorder.record(self.model, self.name, prompt_tokens, 0, cached=True)
+                    if on_finding:
+                        for finding_dict in json.loads(cached).get("findings", []):
+                            self._report_finding(finding_dict, on_finding)
+                    return cached
+        
+        request = {
+            "model": self.model,
+            "messages": [
                 {
                     "role": "system",
-                    "content": self._get_system_prompt()
+                    "content": system_prompt
                 },
                 {
                     "role": "user",
                     "content": prompt
                 }
             ],
-            temperature=0.2,  # Lower temperature for consistent compliance checks
-            response_format={"type": "json_object"}
+            "temperature": self.temperature,
+            "max_tokens": self.completion_reserve,
+            "response_format": {"type": "json_object"}
+        }
+        
+        reserved = 0
+        if self.token_budget:
+            reserved = self.token_budget.acquire(prompt_tokens)
+        
+        start = time.monotonic()
+        try:
+            if on_finding:
+                content, usage = self._stream_completion(request, on_finding)
+            else:
+                response = self.llm.chat.completions.create(**request)
+                content, usage = response.choices[0].message.content, getattr(response, "usage", None)
+        finally:
+            if self.token_budget:
+                self.token_budget.release(reserved)
+        
+        if self.usage_recorder:
+            # Provider-reported usage when available, local count otherwise
+            details = getattr(usage, "prompt_tokens_details", None)
+            self.usage_recorder.record(
+                self.model,
+                self.name,
+                getattr(usage, "prompt_tokens", None) or prompt_tokens,
+                getattr(usage, "completion_tokens", None) or count_tokens(content or "", self.model),
+                duration_ms=1000 * (time.monotonic() - start),
+                cached_prompt_tokens=getattr(details, "cached_tokens", None) or 0
+            )
+        
+        # Only cache responses that parse, so a malformed answer is retried next time
+        if cache_key:
+            json.loads(content)
+            self.response_cache.put(cache_key, self.model, content)
+        
+        return content
+    
+    def _stream_completion(
+        self,
+        request: Dict[str, Any],
+        on_finding: Callable[[ComplianceFinding], None]
+    ) -> Tuple[str, Any]:
+        """
+        Stream a completion, reporting findings as they complete.
+        
+        Returns:
+            (full text, usage from the final chunk or None)
+        """
+        parser = IncrementalFindingsParser()
+        usage = None
+        
+        stream = self.llm.chat.completions.create(
+            **request,
+            stream=True,
+            stream_options={"include_usage": True}
         )
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                for finding_dict in parser.feed(delta):
+                    self._report_finding(finding_dict, on_finding)
         
-        analysis = json.loads(response.choices[0].message.content)
+        return parser.text, usage
+    
+    def _report_finding(
+        self,
+        finding_dict: Dict[str, Any],
+        on_finding: Callable[[ComplianceFinding], None]
+    ):
+        finding = self._to_finding(finding_dict)
+        if finding is None:
+            return
+        try:
+            on_finding(finding)
+        except Exception:
+            # A failing listener (e.g. closed WebSocket) must not fail the analysis
+            logger.exception("Finding listener failed")
+    
+    def _excerpt_note(self, metadata: Dict[str, Any]) -> str:
+        """
+        Prompt lines telling the model it sees only part of the document:
+        the changed sections of a revision and/or one chunk of a longer text.
+        """
+        note = ""
         
-        # Convert to ComplianceFinding objects
-        findings = []
-        for finding_dict in analysis.get("findings", []):
-            findings.append(ComplianceFinding(
-                framework="gdpr",
-                finding_type=finding_dict.get("finding_type", "gap"),
-                severity=finding_dict.get("severity", "medium"),
-                title=finding_dict.get("title", ""),
-                description=finding_dict.get("description", ""),
-                location=finding_dict.get("location"),
-                evidence=finding_dict.get("evidence"),
-                recommendation=finding_dict.get("recommendation"),
-                reasoning=finding_dict.get("reasoning")
-            ))
+        revision = metadata.get("revision")
+        if revision:
+            note += (
+                f"**Revision:** Only the {revision['changed_sections']} of {revision['total_sections']} "
+                "sections changed since the last analysis are shown; findings for the unchanged "
+                "sections are kept from that analysis. Report issues evidenced in these sections.\n"
+            )
         
-        return findings
+        chunk = metadata.get("chunk")
+        if chunk:
+            section = f", starting in section \"{chunk.section_title}\"" if chunk.section_title else ""
+            note += (
+                f"**Excerpt:** Part {chunk.index + 1} of {chunk.total} "
+                f"(characters {chunk.start_char}-{chunk.end_char}{section}). "
+                "Other parts are analyzed separately: report issues evidenced in this excerpt, "
+                "not requirements that may be covered elsewhere in the document.\n"
+            )
+        
+        return note
     
     def _get_system_prompt(self) -> str:
-        return """You are a GDPR compliance expert. Analyze documents for compliance with the General Data Protection Regulation (GDPR).
+        return PROMPT_PREAMBLE
+    
+    def _build_analysis_prompt(self, document_text: str, metadata: Dict[str, Any]) -> str:
+        """
+        Document first (stable, shared by every framework), then this
+        framework's rubric and the per-request instructions.
+        """
+        return f"""{DOCUMENT_HEADER}{document_text}
+
+---
+
+{self._build_instructions(metadata)}"""
+    
+    def _build_instructions(self, metadata: Dict[str, Any]) -> str:
+        return f"""{self.expert_intro}
 
-**Key GDPR Requirements to Check:**
+{self._get_rubric()}
+
+**Output Format (JSON):**
+{self._get_output_format()}
+
+{self._build_task_prompt(metadata)}"""
+    
+    @abstractmethod
+    def _get_rubric(self) -> str:
+        """What to check and how to grade severity."""
+    
+    @abstractmethod
+    def _get_output_format(self) -> str:
+        """JSON schema the model must answer with."""
+    
+    @abstractmethod
+    def _build_task_prompt(self, metadata: Dict[str, Any]) -> str:
+        """Short per-request tail: document details and the analysis instruction."""
+
+
+class GDPRComplianceAgent(ComplianceFrameworkAgent):
+    """
+    Agent specialized in GDPR (General Data Protection Regulation) analysis.
+    Checks for compliance with EU data protection requirements.
+    """
+    
+    framework = "gdpr"
+    label = "GDPR"
+    expert_intro = "You are a GDPR compliance expert. Analyze documents for compliance with the General Data Protection Regulation (GDPR)."
+    
+    def __init__(
+        self,
+        llm_client,
+        model: str = "gpt-4o",
+        response_cache: Optional[LLMResponseCache] = None,
+        **chunking_options
+    ):
+        super().__init__(llm_client, model, response_cache, **chunking_options)
+        self.name = "gdpr_agent"
+    
+    def _get_rubric(self) -> str:
+        return """**Key GDPR Requirements to Check:**
 
 1. **Lawful Basis (Article 6)**: Is there a clear lawful basis for processing personal data?
 2. **Data Subject Rights (Articles 15-22)**: Are procedures for data subject access, rectification, erasure, and portability documented?
@@ -98,10 +482,10 @@ class GDPRComplianceAgent:
 - **Critical**: Clear GDPR violation that could result in significant fines (e.g., no lawful basis, no breach notification procedure)
 - **High**: Important requirement missing or unclear (e.g., no data retention period, weak security measures)
 - **Medium**: Best practice not followed or requirement partially met (e.g., consent mechanism unclear)
-- **Low**: Minor gap or area for improvement
-
-**Output Format (JSON):**
-{
+- **Low**: Minor gap or area for improvement"""
+    
+    def _get_output_format(self) -> str:
+        return """{
     "findings": [
         {
             "finding_type": "violation|gap|risk|compliant",
@@ -118,75 +502,38 @@ class GDPRComplianceAgent:
     "summary": "Overall assessment"
 }"""
     
-    def _build_analysis_prompt(self, document_text: str, metadata: Dict[str, Any]) -> str:
+    def _build_task_prompt(self, metadata: Dict[str, Any]) -> str:
         doc_type = metadata.get("document_type", "unknown")
         filename = metadata.get("filename", "document")
         
-        return f"""Analyze this document for GDPR compliance:
-
-**Document Type:** {doc_type}
+        return f"""**Document Type:** {doc_type}
 **Filename:** {filename}
 
-**Document Content:**
-{document_text[:10000]}  # Limit to first 10k chars for MVP
+{self._excerpt_note(metadata)}Analyze the document above for GDPR compliance. Provide a comprehensive GDPR compliance analysis with specific findings, evidence, and recommendations."""
 
-Provide a comprehensive GDPR compliance analysis with specific findings, evidence, and recommendations."""
 
-
-class SOC2ComplianceAgent:
+class SOC2ComplianceAgent(ComplianceFrameworkAgent):
     """
     Agent specialized in SOC 2 (Service Organization Control 2) analysis.
     Checks for compliance with SOC 2 Trust Service Criteria.
     """
     
-    def __init__(self, llm_client, model: str = "gpt-4o"):
-        self.llm = llm_client
-        self.model = model
-        self.name = "soc2_agent"
+    framework = "soc2"
+    label = "SOC 2"
+    expert_intro = "You are a SOC 2 compliance expert. Analyze documents for compliance with SOC 2 Trust Service Criteria."
     
-    def analyze_document(self, document_text: str, document_metadata: Dict[str, Any]) -> List[ComplianceFinding]:
-        """Analyze a document for SOC 2 compliance."""
-        
-        prompt = self._build_analysis_prompt(document_text, document_metadata)
-        
-        response = self.llm.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": self._get_system_prompt()
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.2,
-            response_format={"type": "json_object"}
-        )
-        
-        analysis = json.loads(response.choices[0].message.content)
-        
-        findings = []
-        for finding_dict in analysis.get("findings", []):
-            findings.append(ComplianceFinding(
-                framework="soc2",
-                finding_type=finding_dict.get("finding_type", "gap"),
-                severity=finding_dict.get("severity", "medium"),
-                title=finding_dict.get("title", ""),
-                description=finding_dict.get("description", ""),
-                location=finding_dict.get("location"),
-                evidence=finding_dict.get("evidence"),
-                recommendation=finding_dict.get("recommendation"),
-                reasoning=finding_dict.get("reasoning")
-            ))
-        
-        return findings
+    def __init__(
+        self,
+        llm_client,
+        model: str = "gpt-4o",
+        response_cache: Optional[LLMResponseCache] = None,
+        **chunking_options
+    ):
+        super().__init__(llm_client, model, response_cache, **chunking_options)
+        self.name = "soc2_agent"
     
-    def _get_system_prompt(self) -> str:
-        return """You are a SOC 2 compliance expert. Analyze documents for compliance with SOC 2 Trust Service Criteria.
-
-**SOC 2 Trust Service Criteria:**
+    def _get_rubric(self) -> str:
+        return """**SOC 2 Trust Service Criteria:**
 
 1. **Security (Common Criteria - Required)**:
    - Access controls (logical and physical)
@@ -219,10 +566,10 @@ class SOC2ComplianceAgent:
 - **Critical**: Major control gap that would fail SOC 2 audit (e.g., no encryption, no access controls)
 - **High**: Important control missing or inadequate (e.g., no incident response plan)
 - **Medium**: Control exists but needs improvement (e.g., incomplete backup procedures)
-- **Low**: Minor gap or documentation issue
-
-**Output Format (JSON):**
-{
+- **Low**: Minor gap or documentation issue"""
+    
+    def _get_output_format(self) -> str:
+        return """{
     "findings": [
         {
             "finding_type": "violation|gap|risk|compliant",
@@ -245,74 +592,38 @@ class SOC2ComplianceAgent:
     "summary": "Overall assessment"
 }"""
     
-    def _build_analysis_prompt(self, document_text: str, metadata: Dict[str, Any]) -> str:
+    def _build_task_prompt(self, metadata: Dict[str, Any]) -> str:
         doc_type = metadata.get("document_type", "unknown")
         filename = metadata.get("filename", "document")
         
-        return f"""Analyze this document for SOC 2 compliance:
-
-**Document Type:** {doc_type}
+        return f"""**Document Type:** {doc_type}
 **Filename:** {filename}
 
-**Document Content:**
-{document_text[:10000]}
-
-Provide a comprehensive SOC 2 analysis focusing on the Trust Service Criteria."""
+{self._excerpt_note(metadata)}Analyze the document above for SOC 2 compliance. Provide a comprehensive SOC 2 analysis focusing on the Trust Service Criteria."""
 
 
-class ContractRiskAgent:
+class ContractRiskAgent(ComplianceFrameworkAgent):
     """
     Agent specialized in identifying legal and financial risks in contracts.
     """
     
-    def __init__(self, llm_client, model: str = "gpt-4o"):
-        self.llm = llm_client
-        self.model = model
-        self.name = "contract_risk_agent"
+    framework = "contract_risk"
+    default_finding_type = "risk"
+    label = "Contract risk"
+    expert_intro = "You are a contract risk analysis expert. Identify legal and financial risks in contracts and agreements."
     
-    def analyze_document(self, document_text: str, document_metadata: Dict[str, Any]) -> List[ComplianceFinding]:
-        """Analyze a contract for legal and financial risks."""
-        
-        prompt = self._build_analysis_prompt(document_text, document_metadata)
-        
-        response = self.llm.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": self._get_system_prompt()
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.2,
-            response_format={"type": "json_object"}
-        )
-        
-        analysis = json.loads(response.choices[0].message.content)
-        
-        findings = []
-        for finding_dict in analysis.get("findings", []):
-            findings.append(ComplianceFinding(
-                framework="contract_risk",
-                finding_type=finding_dict.get("finding_type", "risk"),
-                severity=finding_dict.get("severity", "medium"),
-                title=finding_dict.get("title", ""),
-                description=finding_dict.get("description", ""),
-                location=finding_dict.get("location"),
-                evidence=finding_dict.get("evidence"),
-                recommendation=finding_dict.get("recommendation"),
-                reasoning=finding_dict.get("reasoning")
-            ))
-        
-        return findings
+    def __init__(
+        self,
+        llm_client,
+        model: str = "gpt-4o",
+        response_cache: Optional[LLMResponseCache] = None,
+        **chunking_options
+    ):
+        super().__init__(llm_client, model, response_cache, **chunking_options)
+        self.name = "contract_risk_agent"
     
-    def _get_system_prompt(self) -> str:
-        return """You are a contract risk analysis expert. Identify legal and financial risks in contracts and agreements.
-
-**Common Contract Risks to Flag:**
+    def _get_rubric(self) -> str:
+        return """**Common Contract Risks to Flag:**
 
 1. **Liability Issues**:
    - Unlimited liability clauses
@@ -358,10 +669,10 @@ class ContractRiskAgent:
 - **Critical**: Major financial or legal risk (e.g., unlimited liability, IP loss)
 - **High**: Significant risk that should be negotiated (e.g., unfavorable termination, high penalties)
 - **Medium**: Moderate risk or unclear terms (e.g., vague SLAs, missing clauses)
-- **Low**: Minor issue or area for clarification
-
-**Output Format (JSON):**
-{
+- **Low**: Minor issue or area for clarification"""
+    
+    def _get_output_format(self) -> str:
+        return """{
     "findings": [
         {
             "finding_type": "risk|gap|favorable|standard",
@@ -382,14 +693,96 @@ class ContractRiskAgent:
     "overall_assessment": "high_risk|moderate_risk|low_risk|acceptable"
 }"""
     
-    def _build_analysis_prompt(self, document_text: str, metadata: Dict[str, Any]) -> str:
+    def _build_task_prompt(self, metadata: Dict[str, Any]) -> str:
         filename = metadata.get("filename", "contract")
         
-        return f"""Analyze this contract for legal and financial risks:
+        return f"""**Contract:** {filename}
+
+{self._excerpt_note(metadata)}Analyze the contract above for legal and financial risks. Identify all significant risks, unfavorable terms, and areas that should be negotiated. Provide specific evidence and actionable recommendations."""
 
-**Contract:** {filename}
 
-**Contract Text:**
-{document_text[:10000]}
+class MultiFrameworkComplianceAgent(ComplianceFrameworkAgent):
+    """
+    Runs several framework rubrics in one LLM request.
+    The document text is sent once and every finding comes back tagged with
+    its framework, in the same shape the separate agents produce.
+    """
+    
+    framework = "multi"
+    label = "Multi-framework"
+    expert_intro = "You are a compliance expert. Analyze documents against each framework below and tag every finding with the framework it belongs to."
+    
+    # Framework names models tend to answer with instead of the identifier
+    FRAMEWORK_ALIASES = {
+        "soc 2": "soc2",
+        "soc_2": "soc2",
+        "contract": "contract_risk",
+        "contract risk": "contract_risk"
+    }
+    
+    def __init__(self, agents: List[ComplianceFrameworkAgent]):
+        """
+        Args:
+            agents: Framework agents whose rubrics are combined; the LLM client,
+                model, cache and chunking settings are taken from the first
+        """
+        first = agents[0]
+        super().__init__(
+            first.llm,
+            first.model,
+            first.response_cache,
+            chunk_chars=first.chunk_chars,
+            chunk_overlap=first.chunk_overlap,
+            chunk_concurrency=first.chunk_concurrency,
+            token_budget=first.token_budget,
+            max_chunk_tokens=first.max_chunk_tokens,
+            completion_reserve=first.completion_reserve,
+            usage_recorder=first.usage_recorder
+        )
+        self.agents = {agent.framework: agent for agent in agents}
+        self.name = "multi_framework_agent"
+    
+    def _to_finding(self, finding_dict: Dict[str, Any]) -> Optional[ComplianceFinding]:
+        framework = str(finding_dict.get("framework", "")).strip().lower()
+        framework = self.FRAMEWORK_ALIASES.get(framework, framework)
+        
+        agent = self.agents.get(framework)
+        if agent is None:
+            logger.warning("Dropping finding tagged with unrequested framework %r", framework)
+            return None
+        return agent._to_finding(finding_dict)
+    
+    def _get_rubric(self) -> str:
+        return "\n\n".join(
+            f"## {agent.label}\n\n{agent._get_rubric()}"
+            for agent in self.agents.values()
+        )
+    
+    def _get_output_format(self) -> str:
+        frameworks = "|".join(self.agents)
+        return f"""{{
+    "findings": [
+        {{
+            "framework": "{frameworks}",
+            "finding_type": "violation|gap|risk|compliant|favorable|standard",
+            "severity": "critical|high|medium|low",
+            "title": "Brief title",
+            "description": "Detailed description of the issue",
+            "location": "Where in the document (page, section)",
+            "evidence": "Specific text that shows the issue",
+            "recommendation": "Specific action to fix",
+            "reasoning": "Why this matters for the framework"
+        }}
+    ],
+    "summary": "Overall assessment for each framework"
+}}"""
+    
+    def _build_task_prompt(self, metadata: Dict[str, Any]) -> str:
+        doc_type = metadata.get("document_type", "unknown")
+        filename = metadata.get("filename", "document")
+        labels = ", ".join(agent.label for agent in self.agents.values())
+        
+        return f"""**Document Type:** {doc_type}
+**Filename:** {filename}
 
-Identify all significant risks, unfavorable terms, and areas that should be negotiated. Provide specific evidence and actionable recommendations."""
+{self._excerpt_note(metadata)}Analyze the document above for {labels} compliance. Provide findings for every framework listed, tagging each with its framework identifier ({", ".join(self.agents)}), with specific evidence and recommendations."""
@@ -4,14 +4,43 @@ Main orchestrator for SIAI compliance analysis.
 Implements the perceive -> plan -> act -> reflect loop for continuous learning.
 """
 
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 
-from .compliance_agents import GDPRComplianceAgent, SOC2ComplianceAgent, ContractRiskAgent, ComplianceFinding
+from .compliance_agents import (
+    GDPRComplianceAgent, SOC2ComplianceAgent, ContractRiskAgent, MultiFrameworkComplianceAgent, ComplianceFinding
+)
+from .llm_cache import LLMResponseCache
+from .chunking import TokenBudget, merge_findings, normalize_text
+from .pattern_matcher import PatternMatcher
+from .token_budget import TokenUsageRecorder
+from .revisions import (
+    DocumentSection, RevisionPlan, fingerprint_sections, plan_revision, revision_text,
+    anchor_section, superseded_finding_ids, section_rows
+)
 from ..memory.compliance_memory import ComplianceMemoryAgent
 
 
+logger = logging.getLogger(__name__)
+
+# Plan actions that run a framework agent: action -> (framework, agent attribute, label)
+FRAMEWORK_ACTIONS = {
+    'run_gdpr_analysis': ("gdpr", "gdpr_agent", "GDPR compliance analysis"),
+    'run_soc2_analysis': ("soc2", "soc2_agent", "SOC 2 compliance analysis"),
+    'run_contract_analysis': ("contract_risk", "contract_agent", "Contract risk analysis")
+}
+
+# Stored finding columns needed to carry findings forward or supersede them
+PREVIOUS_FINDING_FIELDS = [
+    "id", "framework", "finding_type", "severity", "title", "description", "location",
+    "evidence", "recommendation", "agent_reasoning", "pattern_key", "section_hash"
+]
+
+
 @dataclass
 class DocumentState:
     """Current state of a document being analyzed"""
@@ -20,6 +49,13 @@ class DocumentState:
     document_type: str
     text_content: str
     intent: str  # 'full_analysis', 'quick_scan', 're_analyze', 'validate_fix'
+    bypass_cache: bool = False  # Force fresh LLM calls for this request
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None  # Progress listener
+    incremental: bool = True  # On re-analysis, send only changed sections to the LLM
+    sections: List[DocumentSection] = field(default_factory=list)  # Fingerprints of text_content
+    previous_sections: List[Dict[str, Any]] = field(default_factory=list)  # Fingerprints last analyzed
+    previous_findings: List[Dict[str, Any]] = field(default_factory=list)
+    revision: Optional[RevisionPlan] = None
 
 
 class DocumentAnalystAgent:
@@ -32,23 +68,63 @@ class DocumentAnalystAgent:
         self,
         llm_client,
         memory: ComplianceMemoryAgent,
-        model: str = "gpt-4o"
+        model: str = "gpt-4o",
+        framework_concurrency: int = 3,
+        response_cache: Optional[LLMResponseCache] = None,
+        chunk_chars: Optional[int] = None,
+        chunk_overlap: int = 500,
+        chunk_concurrency: int = 4,
+        token_budget: Optional[TokenBudget] = None,
+        max_chunk_tokens: Optional[int] = None,
+        completion_reserve: int = 4096,
+        usage_recorder: Optional[TokenUsageRecorder] = None,
+        combined_analysis: bool = False,
+        pattern_skip_precision: Optional[float] = None,
+        incremental_max_changed_ratio: float = 0.5
     ):
         """
         Args:
             llm_client: LiteLLM or OpenAI client
             memory: ComplianceMemoryAgent instance
             model: LLM model identifier
+            framework_concurrency: Maximum framework analyses running at once per document
+            response_cache: Optional on-disk cache shared by the framework agents
+            chunk_chars: Fixed chunk size in characters (None: sized by tokens per model)
+            chunk_overlap: Characters repeated between consecutive chunks
+            chunk_concurrency: Maximum chunk calls in flight per framework
+            token_budget: Optional shared limit on prompt tokens in flight
+            max_chunk_tokens: Cap on document tokens per LLM call (None: fill the context window)
+            completion_reserve: Tokens kept free for each response
+            usage_recorder: Optional sink for per-request token counts
+            combined_analysis: Send multi-framework documents to the LLM once, with merged rubrics
+            pattern_skip_precision: Skip a framework's LLM call when a learned pattern of at
+                least this precision matched (None: always call the LLM)
+            incremental_max_changed_ratio: Largest changed share of a document that
+                is re-analyzed incrementally (above it the whole text is re-analyzed)
         """
         self.llm = llm_client
         self.memory = memory
         self.model = model
+        self.framework_concurrency = max(1, framework_concurrency)
+        self.combined_analysis = combined_analysis
+        self.pattern_skip_precision = pattern_skip_precision
+        self.incremental_max_changed_ratio = incremental_max_changed_ratio
+        self.pattern_matcher = PatternMatcher()
         self.name = "document_analyst"
         
         # Initialize specialized agents
-        self.gdpr_agent = GDPRComplianceAgent(llm_client, model)
-        self.soc2_agent = SOC2ComplianceAgent(llm_client, model)
-        self.contract_agent = ContractRiskAgent(llm_client, model)
+        chunking_options = {
+            "chunk_chars": chunk_chars,
+            "chunk_overlap": chunk_overlap,
+            "chunk_concurrency": chunk_concurrency,
+            "token_budget": token_budget,
+            "max_chunk_tokens": max_chunk_tokens,
+            "completion_reserve": completion_reserve,
+            "usage_recorder": usage_recorder
+        }
+        self.gdpr_agent = GDPRComplianceAgent(llm_client, model, response_cache, **chunking_options)
+        self.soc2_agent = SOC2ComplianceAgent(llm_client, model, response_cache, **chunking_options)
+        self.contract_agent = ContractRiskAgent(llm_client, model, response_cache, **chunking_options)
         
         self.current_plan = []
     
@@ -57,7 +133,10 @@ class DocumentAnalystAgent:
         document_id: str,
         document_text: str,
         document_metadata: Dict[str, Any],
-        frameworks: Optional[List[str]] = None
+        frameworks: Optional[List[str]] = None,
+        bypass_cache: bool = False,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        incremental: bool = True
     ) -> Dict[str, Any]:
         """
         Main entry point: Analyze a document using the full agentic loop.
@@ -67,21 +146,34 @@ class DocumentAnalystAgent:
             document_text: Full text content
             document_metadata: Metadata (filename, type, etc.)
             frameworks: Which frameworks to analyze (default: auto-detect)
+            bypass_cache: Skip cached LLM responses for this request
+            on_event: Called (from worker threads) with agent_status and
+                finding_discovered events while the analysis runs; findings
+                are reported as soon as the LLM has produced them
+            incremental: When the document was analyzed before, send only the
+                sections that changed to the LLM and carry the other findings forward
         
         Returns:
             Complete analysis with findings, scores, and recommendations
         """
         
         # PERCEIVE: Understand the document
+        self._emit(on_event, {"type": "agent_status", "phase": "perceive", "message": "Understanding document context..."})
         state = self.perceive(document_id, document_text, document_metadata)
+        state.bypass_cache = bypass_cache
+        state.on_event = on_event
+        state.incremental = incremental
         
         # PLAN: Decide which analyses to run
+        self._emit(on_event, {"type": "agent_status", "phase": "plan", "message": "Planning compliance analysis..."})
         plan = self.plan(state, frameworks)
         
         # ACT: Execute the analysis plan
+        self._emit(on_event, {"type": "agent_status", "phase": "act", "message": "Analyzing document for compliance issues..."})
         results = self.act(plan, state)
         
         # REFLECT: Store findings and learn patterns
+        self._emit(on_event, {"type": "agent_status", "phase": "reflect", "message": "Learning from analysis results..."})
         self.reflect(state, plan, results)
         
         return results
@@ -99,10 +191,14 @@ class DocumentAnalystAgent:
         document_type = document_metadata.get("document_type", "unknown")
         
         # Check if this document has been analyzed before
-        previous_findings = self.memory.episodic.get_document_findings(document_id)
+        previous_sections = self.memory.episodic.get_document_sections(document_id)
+        previous_findings = self.memory.episodic.get_document_findings(
+            document_id,
+            fields=PREVIOUS_FINDING_FIELDS
+        )
         
         # Determine intent based on context
-        if previous_findings:
+        if previous_findings or previous_sections:
             intent = "re_analyze"  # Document has been analyzed before
         else:
             intent = "full_analysis"  # First time analyzing this document
@@ -112,7 +208,10 @@ class DocumentAnalystAgent:
             document_data=document_metadata,
             document_type=document_type,
             text_content=document_text,
-            intent=intent
+            intent=intent,
+            sections=fingerprint_sections(document_text),
+            previous_sections=previous_sections,
+            previous_findings=previous_findings
         )
     
     def plan(
@@ -143,6 +242,19 @@ class DocumentAnalystAgent:
             elif framework == "contract_risk":
                 plan.append(('run_contract_analysis', state))
         
+        # Re-analysis: keep findings of sections that did not change
+        if state.intent == "re_analyze" and state.incremental:
+            planned = [FRAMEWORK_ACTIONS[action][0] for action, _ in plan if action in FRAMEWORK_ACTIONS]
+            state.revision = plan_revision(
+                state.sections,
+                state.previous_sections,
+                state.previous_findings,
+                planned,
+                max_changed_ratio=self.incremental_max_changed_ratio
+            )
+            if state.revision.incremental:
+                plan.append(('carry_forward_findings', state.revision))
+        
         # Always generate summary
         plan.append(('generate_summary', None))
         
@@ -163,49 +275,73 @@ class DocumentAnalystAgent:
             "document_id": state.document_id,
             "analysis_timestamp": datetime.now().isoformat(),
             "frameworks_analyzed": [],
+            "frameworks_skipped": [],  # LLM call skipped; earlier findings are kept
             "findings": [],
             "summary": None,
             "learned_patterns_applied": [],
-            "actions_taken": []
+            "actions_taken": [],
+            "errors": []
         }
         
         all_findings: List[ComplianceFinding] = []
         
+        report_finding = self._finding_reporter(state)
+        
+        # Findings of unchanged sections, kept from the previous analysis
+        carried = []
+        if state.revision is not None and state.revision.incremental:
+            carried = [(row, self._stored_to_finding(row)) for row in state.revision.carried_forward]
+        carried_keys = {(f.framework, normalize_text(f.title)) for _, f in carried}
+        if report_finding:
+            for _, finding in carried:
+                report_finding(finding)
+        
+        # Deterministic pass: learned risk indicators, one linear scan of the text
+        pattern_findings = self._match_learned_patterns(plan, state)
+        if report_finding:
+            for findings in pattern_findings.values():
+                for finding in findings:
+                    report_finding(finding)
+        skip_frameworks = {
+            framework for framework, findings in pattern_findings.items()
+            if self._pattern_findings_suffice(findings)
+        }
+        
+        # Framework analyses are independent LLM calls: run them concurrently
+        framework_results = self._run_frameworks(plan, state, skip_frameworks, report_finding)
+        
         for action_type, action_param in plan:
             
-            if action_type == 'run_gdpr_analysis':
-                # Run GDPR analysis
-                findings = self.gdpr_agent.analyze_document(
-                    state.text_content,
-                    state.document_data
-                )
-                all_findings.extend(findings)
-                results["frameworks_analyzed"].append("gdpr")
-                results["actions_taken"].append("GDPR compliance analysis completed")
-            
-            elif action_type == 'run_soc2_analysis':
-                # Run SOC 2 analysis
-                findings = self.soc2_agent.analyze_document(
-                    state.text_content,
-                    state.document_data
-                )
-                all_findings.extend(findings)
-                results["frameworks_analyzed"].append("soc2")
-                results["actions_taken"].append("SOC 2 compliance analysis completed")
+            if action_type in FRAMEWORK_ACTIONS:
+                framework, _, label = FRAMEWORK_ACTIONS[action_type]
+                findings, error = framework_results[action_type]
+                matched = pattern_findings.pop(framework, [])
+                fresh = [f for f in findings if (f.framework, normalize_text(f.title)) not in carried_keys]
+                all_findings.extend(merge_findings([matched, fresh]))
+                
+                if error is not None:
+                    results["errors"].append({"framework": framework, "error": str(error)})
+                    results["actions_taken"].append(f"{label} failed")
+                    continue
+                
+                if framework in skip_frameworks:
+                    # Not re-analyzed, so reflect() must not supersede its LLM findings
+                    results["frameworks_skipped"].append(framework)
+                    results["actions_taken"].append(f"{label} completed from learned patterns")
+                else:
+                    results["frameworks_analyzed"].append(framework)
+                    results["actions_taken"].append(f"{label} completed")
             
-            elif action_type == 'run_contract_analysis':
-                # Run contract risk analysis
-                findings = self.contract_agent.analyze_document(
-                    state.text_content,
-                    state.document_data
+            elif action_type == 'carry_forward_findings':
+                revision = action_param
+                results["actions_taken"].append(
+                    f"Re-analyzed {len(revision.changed)} of {len(revision.sections)} sections; "
+                    f"carried forward {len(carried)} findings"
                 )
-                all_findings.extend(findings)
-                results["frameworks_analyzed"].append("contract_risk")
-                results["actions_taken"].append("Contract risk analysis completed")
             
             elif action_type == 'generate_summary':
                 # Generate executive summary
-                summary = self._generate_summary(all_findings, state)
+                summary = self._generate_summary(all_findings + [f for _, f in carried], state)
                 results["summary"] = summary
                 results["actions_taken"].append("Executive summary generated")
             
@@ -223,27 +359,228 @@ class DocumentAnalystAgent:
                 ]
                 results["actions_taken"].append(f"Applied {len(patterns)} learned patterns")
         
-        # Convert findings to dict format
-        results["findings"] = [
-            {
-                "framework": f.framework,
-                "finding_type": f.finding_type,
-                "severity": f.severity,
-                "title": f.title,
-                "description": f.description,
-                "location": f.location,
-                "evidence": f.evidence,
-                "recommendation": f.recommendation,
-                "reasoning": f.reasoning
-            }
-            for f in all_findings
+        # Framework-independent patterns
+        all_findings.extend(pattern_findings.get("all", []))
+        
+        self._anchor_findings(all_findings, state)
+        
+        # Convert findings to dict format; carried findings keep their stored id
+        results["findings"] = [asdict(f) for f in all_findings] + [
+            {**asdict(finding), "id": str(row["id"]), "carried_forward": True}
+            for row, finding in carried
         ]
         
+        revision = state.revision
+        results["revision"] = {
+            "mode": "incremental" if revision is not None and revision.incremental else "full",
+            "changed_sections": len(revision.changed) if revision is not None else len(state.sections),
+            "total_sections": len(state.sections),
+            "carried_forward": len(carried)
+        }
+        
         # Calculate risk score
-        results["risk_score"] = self._calculate_risk_score(all_findings)
+        results["risk_score"] = self._calculate_risk_score(all_findings + [f for _, f in carried])
         
         return results
     
+    @staticmethod
+    def _emit(on_event: Optional[Callable[[Dict[str, Any]], None]], event: Dict[str, Any]):
+        if on_event is None:
+            return
+        try:
+            on_event(event)
+        except Exception:
+            logger.exception("Analysis event listener failed")
+    
+    @staticmethod
+    def _stored_to_finding(row: Dict[str, Any]) -> ComplianceFinding:
+        return ComplianceFinding(
+            framework=row["framework"],
+            finding_type=row["finding_type"],
+            severity=row["severity"],
+            title=row["title"],
+            description=row["description"],
+            location=row.get("location"),
+            evidence=row.get("evidence"),
+            recommendation=row.get("recommendation"),
+            reasoning=row.get("agent_reasoning"),
+            pattern_key=row.get("pattern_key"),
+            section_hash=row.get("section_hash")
+        )
+    
+    def _analysis_input(self, state: DocumentState) -> Tuple[str, Dict[str, Any]]:
+        """Text and metadata the framework agents see: the changed sections on incremental runs."""
+        revision = state.revision
+        if revision is None or not revision.incremental:
+            return state.text_content, state.document_data
+        
+        metadata = {
+            **state.document_data,
+            "revision": {"changed_sections": len(revision.changed), "total_sections": len(revision.sections)}
+        }
+        return revision_text(state.text_content, revision.changed), metadata
+    
+    def _anchor_findings(self, findings: List[ComplianceFinding], state: DocumentState):
+        """
+        Record the section each new finding belongs to, so the next
+        re-analysis knows whether it can be carried forward. Findings whose
+        evidence and offsets lie in no section stay unanchored.
+        """
+        for finding in findings:
+            finding.section_hash = anchor_section(
+                state.text_content,
+                state.sections,
+                finding.evidence,
+                finding.start_offset
+            )
+    
+    def _finding_reporter(self, state: DocumentState) -> Optional[Callable[[ComplianceFinding], None]]:
+        """
+        Callback that forwards each new finding to state.on_event as a
+        finding_discovered event. Findings repeated by overlapping chunks
+        (same framework and title) are reported once.
+        """
+        if state.on_event is None:
+            return None
+        
+        seen = set()
+        lock = threading.Lock()
+        
+        def report(finding: ComplianceFinding):
+            key = (finding.framework, normalize_text(finding.title))
+            with lock:
+                if key in seen:
+                    return
+                seen.add(key)
+            self._emit(state.on_event, {"type": "finding_discovered", "finding": asdict(finding)})
+        
+        return report
+    
+    def _match_learned_patterns(
+        self,
+        plan: List[Tuple[str, Any]],
+        state: DocumentState
+    ) -> Dict[str, List[ComplianceFinding]]:
+        """
+        Scan the document for the risk indicators of the plan's learned patterns.
+        
+        Returns:
+            Deterministic findings grouped by framework
+        """
+        patterns = next((param for action, param in plan if action == 'apply_learned_patterns'), None)
+        if not patterns:
+            return {}
+        
+        self.pattern_matcher.refresh(patterns)
+        matches = self.pattern_matcher.scan(state.text_content)
+        
+        grouped: Dict[str, List[ComplianceFinding]] = {}
+        for finding in self.pattern_matcher.to_findings(state.text_content, matches):
+            grouped.setdefault(finding.framework, []).append(finding)
+        
+        return grouped
+    
+    def _pattern_findings_suffice(self, findings: List[ComplianceFinding]) -> bool:
+        """Whether a deterministic match is trusted enough to skip the framework's LLM call."""
+        if self.pattern_skip_precision is None:
+            return False
+        return any(
+            self.pattern_matcher.precision_of(f.pattern_key) >= self.pattern_skip_precision
+            for f in findings
+        )
+    
+    def _run_frameworks(
+        self,
+        plan: List[Tuple[str, Any]],
+        state: DocumentState,
+        skip_frameworks: Optional[set] = None,
+        report_finding: Optional[Callable[[ComplianceFinding], None]] = None
+    ) -> Dict[str, Tuple[List[ComplianceFinding], Optional[Exception]]]:
+        """
+        Run every framework step of the plan, at most framework_concurrency at a time.
+        
+        A failing framework is logged and reported instead of raised, so the
+        other frameworks still produce results. Frameworks in skip_frameworks
+        return no LLM findings.
+        
+        Returns:
+            Mapping of action -> (findings, error)
+        """
+        # Incremental re-analysis with no changed section: nothing to send
+        nothing_changed = state.revision is not None and state.revision.incremental and not state.revision.changed
+        
+        skipped = {
+            action: ([], None)
+            for action, _ in plan
+            if action in FRAMEWORK_ACTIONS
+            and (nothing_changed or FRAMEWORK_ACTIONS[action][0] in (skip_frameworks or ()))
+        }
+        actions = list(dict.fromkeys(
+            action for action, _ in plan
+            if action in FRAMEWORK_ACTIONS and action not in skipped
+        ))
+        if not actions:
+            return skipped
+        
+        text, metadata = self._analysis_input(state)
+        
+        def run(action: str) -> Tuple[List[ComplianceFinding], Optional[Exception]]:
+            framework, agent_attr, _ = FRAMEWORK_ACTIONS[action]
+            try:
+                agent = getattr(self, agent_attr)
+                findings = agent.analyze_document(
+                    text,
+                    metadata,
+                    bypass_cache=state.bypass_cache,
+                    on_finding=report_finding
+                )
+                return findings, None
+            except Exception as e:
+                logger.exception("%s analysis failed for document %s", framework, state.document_id)
+                return [], e
+        
+        if len(actions) == 1:
+            return {**skipped, actions[0]: run(actions[0])}
+        
+        if self.combined_analysis:
+            try:
+                return {**skipped, **self._run_combined(actions, state, report_finding)}
+            except Exception:
+                logger.exception(
+                    "Combined analysis failed for document %s; falling back to separate agents",
+                    state.document_id
+                )
+        
+        with ThreadPoolExecutor(
+            max_workers=min(self.framework_concurrency, len(actions)),
+            thread_name_prefix="framework-analysis"
+        ) as executor:
+            outcomes = list(executor.map(run, actions))
+        
+        return {**skipped, **dict(zip(actions, outcomes))}
+    
+    def _run_combined(
+        self,
+        actions: List[str],
+        state: DocumentState,
+        report_finding: Optional[Callable[[ComplianceFinding], None]] = None
+    ) -> Dict[str, Tuple[List[ComplianceFinding], Optional[Exception]]]:
+        """Run all framework actions as one multi-framework LLM analysis."""
+        agents = [getattr(self, FRAMEWORK_ACTIONS[action][1]) for action in actions]
+        
+        text, metadata = self._analysis_input(state)
+        findings = MultiFrameworkComplianceAgent(agents).analyze_document(
+            text,
+            metadata,
+            bypass_cache=state.bypass_cache,
+            on_finding=report_finding
+        )
+        
+        return {
+            action: ([f for f in findings if f.framework == FRAMEWORK_ACTIONS[action][0]], None)
+            for action in actions
+        }
+    
     def reflect(
         self,
         state: DocumentState,
@@ -255,22 +592,36 @@ class DocumentAnalystAgent:
         This is where the agent learns.
         """
         
-        # Store all findings in episodic memory
-        for finding in results["findings"]:
-            self.memory.remember_finding(
-                document_id=state.document_id,
-                framework=finding["framework"],
-                finding_type=finding["finding_type"],
-                severity=finding["severity"],
-                title=finding["title"],
-                description=finding["description"],
-                location=finding.get("location"),
-                evidence=finding.get("evidence"),
-                recommendation=finding.get("recommendation"),
-                agent_name=self.name,
-                agent_reasoning=finding.get("reasoning"),
-                document_type=state.document_type
+        # Replace what this run re-analyzed: earlier findings of the analyzed
+        # frameworks (except those carried forward) and earlier pattern matches
+        new_findings = [f for f in results["findings"] if not f.get("carried_forward")]
+        patterns_scanned = any(action == 'apply_learned_patterns' for action, _ in plan)
+        superseded_ids = superseded_finding_ids(
+            state.previous_findings,
+            results["frameworks_analyzed"],
+            [FRAMEWORK_ACTIONS[action][0] for action, _ in plan if action in FRAMEWORK_ACTIONS] if patterns_scanned else [],
+            {f["id"] for f in results["findings"] if f.get("carried_forward")}
+        )
+        
+        # Store all findings in episodic memory (one transaction per analysis)
+        finding_ids = self.memory.remember_findings_batch(
+            document_id=state.document_id,
+            findings=new_findings,
+            document_type=state.document_type,
+            agent_name=self.name,
+            superseded_ids=superseded_ids,
+            sections=section_rows(
+                state.text_content,
+                state.sections,
+                state.previous_sections,
+                results["frameworks_analyzed"]
             )
+        )
+        
+        for finding, finding_id in zip(new_findings, finding_ids):
+            finding["id"] = finding_id
+        
+        results["revision"]["superseded"] = len(superseded_ids)
     
     def _auto_detect_frameworks(self, document_type: str, text_content: str) -> List[str]:
         """
@@ -0,0 +1,176 @@
+"""
+LLM Response Cache: Content-addressed, on-disk cache for compliance agent completions
+Identical prompts against the same model return the stored response instead of a new LLM call
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with size-bounded LRU eviction.
+    
+    Keys are derived from the model, a hash of the system prompt, a hash of
+    the user prompt and the temperature, so byte-identical documents analyzed
+    with the same prompts hit the cache. When the stored responses exceed
+    max_bytes, the least recently used entries are evicted.
+    """
+    
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            max_bytes: Upper bound on the total size of cached responses
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                cache_key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                content TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_lru ON llm_responses(last_accessed_at)"
+        )
+        
+        row = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_responses"
+        ).fetchone()
+        self._entries, self._size_bytes = row[0], row[1]
+        
+        # Stats
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._evictions = 0
+    
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+        """
+        Content address of a completion request.
+        
+        Returns:
+            Hex digest over model, system-prompt hash, user-prompt hash and temperature
+        """
+        parts = [model, _sha256(system_prompt), _sha256(user_prompt), repr(float(temperature))]
+        return _sha256("\x1f".join(parts))
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key (and mark it recently used), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM llm_responses WHERE cache_key = ?", (key,)
+            ).fetchone()
+            
+            if row is None:
+                self._misses += 1
+                return None
+            
+            self._conn.execute(
+                "UPDATE llm_responses SET last_accessed_at = ? WHERE cache_key = ?",
+                (time.time(), key)
+            )
+            self._hits += 1
+            return row[0]
+    
+    def put(self, key: str, model: str, content: str):
+        """Store a response, evicting least recently used entries beyond max_bytes."""
+        size = len(content.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        
+        now = time.time()
+        
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size_bytes FROM llm_responses WHERE cache_key = ?", (key,)
+            ).fetchone()
+            
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_responses
+                    (cache_key, model, content, size_bytes, created_at, last_accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, model, content, size, now, now)
+            )
+            
+            if old is None:
+                self._entries += 1
+                self._size_bytes += size
+            else:
+                self._size_bytes += size - old[0]
+            
+            if self._size_bytes > self.max_bytes:
+                self._evict(self._size_bytes - self.max_bytes)
+    
+    def record_bypass(self):
+        """Count a request that skipped the cache on purpose."""
+        with self._lock:
+            self._bypassed += 1
+    
+    def _evict(self, bytes_to_free: int):
+        """Delete least recently used entries until bytes_to_free is reclaimed (lock held)."""
+        freed = 0
+        victims = []
+        
+        for key, size in self._conn.execute(
+            "SELECT cache_key, size_bytes FROM llm_responses ORDER BY last_accessed_at ASC"
+        ):
+            if freed >= bytes_to_free:
+                break
+            victims.append((key,))
+            freed += size
+        
+        self._conn.executemany("DELETE FROM llm_responses WHERE cache_key = ?", victims)
+        
+        self._entries -= len(victims)
+        self._size_bytes -= freed
+        self._evictions += len(victims)
+    
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._entries = 0
+            self._size_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": self._entries,
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "bypassed": self._bypassed,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0
+            }
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,340 @@
+"""
+LLM Gateway: Process-wide rate limiting, retry and circuit breaking for LLM calls
+Wraps an OpenAI-compatible client and exposes the same chat.completions.create interface
+"""
+
+import logging
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Any, Optional
+
+from .token_budget import count_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# OpenAI SDK exceptions without a status code that are still transient
+RETRYABLE_ERROR_NAMES = {"APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"}
+
+
+class LLMUnavailableError(RuntimeError):
+    """The gateway refused a call; retry_after says when trying again makes sense."""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Calls to this model are failing; the breaker rejects them without trying."""
+
+
+class RateLimitTimeoutError(LLMUnavailableError):
+    """Waited longer than max_wait for request or token capacity."""
+
+
+class TokenBucket:
+    """Continuously refilling bucket; capacity and refill are per minute."""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 if it is now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+    
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker: closed -> open after failure_threshold
+    failures, half-open after reset_timeout (one trial call), closed again
+    on success.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+    
+    def rejecting(self, now: float) -> bool:
+        """True while open, or half-open with the trial call already out."""
+        if self.state == "open" and now - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self.trial_in_flight = False
+        if self.state == "open":
+            return True
+        return self.state == "half_open" and self.trial_in_flight
+    
+    def admit(self):
+        if self.state == "half_open":
+            self.trial_in_flight = True
+    
+    def retry_after(self, now: float) -> float:
+        return max(1.0, self.reset_timeout - (now - self.opened_at))
+    
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self.trial_in_flight = False
+    
+    def record_failure(self, now: float):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("Circuit opened after %d consecutive failures", self.failures)
+            self.state = "open"
+            self.opened_at = now
+            self.trial_in_flight = False
+
+
+class LLMGateway:
+    """
+    Single choke point for every LLM call in the process.
+    
+    Per model: token buckets for requests/minute and tokens/minute (prompt
+    tokens counted locally plus the requested max_tokens), jittered
+    exponential retries on transient errors (honouring Retry-After), and a
+    circuit breaker. Drop-in for the OpenAI client: agents call
+    gateway.chat.completions.create(...) unchanged.
+    """
+    
+    def __init__(
+        self,
+        client,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 200000,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_wait: float = 120.0,
+        breaker_threshold: int = 5,
+        breaker_reset: float = 30.0,
+        default_max_tokens: int = 1024
+    ):
+        """
+        Args:
+            client: OpenAI-compatible client
+            requests_per_minute: Request budget per model
+            tokens_per_minute: Prompt + completion token budget per model
+            max_retries: Retries after the first attempt for transient errors
+            base_delay: First backoff ceiling in seconds (doubles per attempt)
+            max_delay: Maximum backoff between attempts
+            max_wait: Longest a call may queue for rate-limit capacity
+            breaker_threshold: Consecutive failures that open a model's breaker
+            breaker_reset: Seconds an open breaker rejects calls before a trial
+            default_max_tokens: Completion size assumed when max_tokens is not given
+        """
+        self.client = client
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.default_max_tokens = default_max_tokens
+        
+        self._condition = threading.Condition()
+        self._models: Dict[str, Dict[str, Any]] = {}
+        
+        # Same shape as the OpenAI client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create_chat_completion))
+    
+    def _model_state(self, model: str) -> Dict[str, Any]:
+        """Per-model limiter state (caller holds the condition)."""
+        state = self._models.get(model)
+        if state is None:
+            state = {
+                "requests": TokenBucket(self.requests_per_minute),
+                "tokens": TokenBucket(self.tokens_per_minute),
+                "breaker": CircuitBreaker(self.breaker_threshold, self.breaker_reset),
+                "waiting": 0,
+                "in_flight": 0,
+                "calls": 0,
+                "retries": 0,
+                "failures": 0,
+                "rejected": 0,
+                "wait_seconds": 0.0
+            }
+            self._models[model] = state
+        return state
+    
+    def _estimate_tokens(self, kwargs: Dict[str, Any]) -> int:
+        model = kwargs.get("model", "")
+        prompt = sum(
+            count_tokens(message.get("content") or "", model) + 4
+            for message in kwargs.get("messages", [])
+            if isinstance(message.get("content", ""), str)
+        )
+        return prompt + (kwargs.get("max_tokens") or self.default_max_tokens)
+    
+    def _admit(self, model: str, tokens: int):
+        """Block until the model's breaker and buckets allow one call of tokens."""
+        deadline = time.monotonic() + self.max_wait
+        
+        with self._condition:
+            state = self._model_state(model)
+            state["waiting"] += 1
+            started = time.monotonic()
+            
+            try:
+                while True:
+                    now = time.monotonic()
+                    breaker = state["breaker"]
+                    
+                    if breaker.rejecting(now):
+                        state["rejected"] += 1
+                        raise CircuitOpenError(
+                            f"LLM circuit open for model {model}",
+                            retry_after=breaker.retry_after(now)
+                        )
+                    
+                    wait = max(
+                        state["requests"].wait_time(1, now),
+                        state["tokens"].wait_time(tokens, now)
+                    )
+                    if wait == 0:
+                        breaker.admit()
+                        state["requests"].take(1)
+                        state["tokens"].take(tokens)
+                        state["in_flight"] += 1
+                        return
+                    
+                    if now + wait > deadline:
+                        state["rejected"] += 1
+                        raise RateLimitTimeoutError(
+                            f"LLM rate limit for model {model}: waited {self.max_wait:.0f}s",
+                            retry_after=wait
+                        )
+                    self._condition.wait(timeout=wait)
+            finally:
+                state["waiting"] -= 1
+                state["wait_seconds"] += time.monotonic() - started
+    
+    def _release(self, model: str, failed: bool):
+        """
+        Record the outcome of an admitted call. Only transient errors count
+        against the breaker; a 4xx means the model is up.
+        """
+        with self._condition:
+            state = self._model_state(model)
+            state["in_flight"] -= 1
+            if failed:
+                state["failures"] += 1
+                state["breaker"].record_failure(time.monotonic())
+            else:
+                state["breaker"].record_success()
+            self._condition.notify_all()
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        status = getattr(error, "status_code", None)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        return type(error).__name__ in RETRYABLE_ERROR_NAMES
+    
+    @staticmethod
+    def _retry_after_header(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+    
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full jitter, but never sooner than the server's Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = self._retry_after_header(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+    
+    def create_chat_completion(self, **kwargs):
+        """
+        chat.completions.create with admission control, retries and circuit breaking.
+        
+        With stream=True the stream is returned once the request is accepted;
+        errors after the first chunk are not retried.
+        
+        Raises:
+            CircuitOpenError: The model's breaker is open
+            RateLimitTimeoutError: No capacity within max_wait
+        """
+        model = kwargs.get("model", "")
+        tokens = self._estimate_tokens(kwargs)
+        
+        for attempt in range(self.max_retries + 1):
+            self._admit(model, tokens)
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                retryable = self._is_retryable(e)
+                self._release(model, failed=retryable)
+                
+                if not retryable or attempt == self.max_retries:
+                    raise
+                
+                delay = self._backoff(attempt, e)
+                with self._condition:
+                    self._model_state(model)["retries"] += 1
+                logger.warning("LLM call to %s failed (%s); retry %d/%d in %.1fs",
+                               model, type(e).__name__, attempt + 1, self.max_retries, delay)
+                time.sleep(delay)
+                continue
+            
+            self._release(model, failed=False)
+            with self._condition:
+                self._model_state(model)["calls"] += 1
+            return response
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            now = time.monotonic()
+            models = {}
+            for state in self._models.values():
+                state["requests"].wait_time(0, now)
+                state["tokens"].wait_time(0, now)
+            
+            for model, state in self._models.items():
+                models[model] = {
+                    "queue_depth": state["waiting"],
+                    "in_flight": state["in_flight"],
+                    "calls": state["calls"],
+                    "retries": state["retries"],
+                    "failures": state["failures"],
+                    "rejected": state["rejected"],
+                    "wait_seconds": round(state["wait_seconds"], 3),
+                    "circuit": state["breaker"].state,
+                    "requests_available": int(state["requests"].tokens),
+                    "tokens_available": int(state["tokens"].tokens)
+                }
+            return {
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "queue_depth": sum(s["waiting"] for s in self._models.values()),
+                "models": models
+            }
@@ -0,0 +1,225 @@
+"""
+Pattern Matcher: Deterministic pre-LLM scan for learned risk indicators
+Compiles high-precision risk_patterns into an Aho-Corasick automaton and
+scans documents in one linear pass
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+from .compliance_agents import ComplianceFinding
+
+
+# Indicators that describe something missing cannot be found by matching text
+ABSENCE_PREFIXES = ("no ", "missing ", "lack of ", "absence of ", "without ")
+
+# Characters of surrounding text kept as evidence
+EVIDENCE_CONTEXT_CHARS = 80
+
+
+@dataclass
+class PatternMatch:
+    """One occurrence of a risk indicator in a document"""
+    pattern_key: str
+    start: int  # Character offset in the document
+    end: int
+    matched_text: str
+
+
+def _fold(text: str) -> str:
+    """Lowercase without changing string length, so offsets stay exact."""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher: all occurrences of all keywords in O(text + matches)."""
+    
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]  # state -> [(keyword length, payload)]
+    
+    def add(self, keyword: str, payload: Any):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(keyword), payload))
+    
+    def build(self):
+        """Compute failure links breadth-first; call once after all add() calls."""
+        todo = deque(self._goto[0].values())
+        
+        while todo:
+            state = todo.popleft()
+            for char, next_state in self._goto[state].items():
+                todo.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def iter_matches(self, text: str):
+        """Yield (start, end, payload) for every keyword occurrence in text."""
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            
+            for length, payload in self._output[state]:
+                yield position + 1 - length, position + 1, payload
+
+
+class PatternMatcher:
+    """
+    Scans documents for the risk_indicator text of learned patterns.
+    
+    The automaton is rebuilt only when the pattern set changes (compared by
+    a signature over key, indicator and scores), so refresh() can be called
+    with the cached reliable patterns on every analysis.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple] = None
+        self._automaton: Optional[AhoCorasick] = None
+        self._patterns: Dict[str, Dict[str, Any]] = {}
+        
+        # Stats
+        self._builds = 0
+        self._scans = 0
+    
+    @staticmethod
+    def _signature_of(patterns: List[Dict[str, Any]]) -> Tuple:
+        return tuple(sorted(
+            (
+                p.get("pattern_key"),
+                p.get("risk_indicator"),
+                str(p.get("precision_score")),
+                str(p.get("confidence_score")),
+                p.get("avg_severity")
+            )
+            for p in patterns
+        ))
+    
+    def refresh(self, patterns: List[Dict[str, Any]]) -> bool:
+        """
+        Compile patterns if they differ from the current set.
+        
+        Returns:
+            True if the automaton was rebuilt
+        """
+        signature = self._signature_of(patterns)
+        if signature == self._signature:
+            return False
+        
+        automaton = AhoCorasick()
+        compiled = {}
+        
+        for pattern in patterns:
+            indicator = _fold((pattern.get("risk_indicator") or "").strip())
+            if len(indicator) < 3 or indicator.startswith(ABSENCE_PREFIXES):
+                continue
+            automaton.add(indicator, pattern["pattern_key"])
+            compiled[pattern["pattern_key"]] = pattern
+        
+        automaton.build()
+        
+        with self._lock:
+            self._automaton = automaton
+            self._patterns = compiled
+            self._signature = signature
+            self._builds += 1
+        
+        return True
+    
+    def scan(self, text: str) -> List[PatternMatch]:
+        """Return whole-word indicator matches in document order."""
+        with self._lock:
+            automaton = self._automaton
+        
+        if automaton is None:
+            return []
+        
+        self._scans += 1
+        matches = []
+        
+        for start, end, pattern_key in automaton.iter_matches(_fold(text)):
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            matches.append(PatternMatch(pattern_key, start, end, text[start:end]))
+        
+        matches.sort(key=lambda m: (m.start, m.end))
+        return matches
+    
+    def to_findings(self, text: str, matches: List[PatternMatch]) -> List[ComplianceFinding]:
+        """
+        One finding per matched pattern, located at its first occurrence.
+        Further occurrences are listed in the location.
+        """
+        with self._lock:
+            patterns = self._patterns
+        
+        occurrences: Dict[str, List[PatternMatch]] = {}
+        for match in matches:
+            occurrences.setdefault(match.pattern_key, []).append(match)
+        
+        findings = []
+        for pattern_key, found in occurrences.items():
+            pattern = patterns.get(pattern_key)
+            if pattern is None:
+                continue
+            
+            first = found[0]
+            context_start = max(0, first.start - EVIDENCE_CONTEXT_CHARS)
+            context_end = min(len(text), first.end + EVIDENCE_CONTEXT_CHARS)
+            offsets = ", ".join(f"{m.start}-{m.end}" for m in found[:10])
+            more = f" (+{len(found) - 10} more)" if len(found) > 10 else ""
+            
+            findings.append(ComplianceFinding(
+                framework=pattern.get("framework") or "all",
+                finding_type="risk",
+                severity=pattern.get("avg_severity") or "medium",
+                title=pattern.get("pattern_description") or pattern_key,
+                description=f"Matched learned risk indicator \"{first.matched_text}\" "
+                            f"({len(found)} occurrence{'s' if len(found) != 1 else ''}).",
+                location=f"characters {offsets}{more}",
+                evidence=text[context_start:context_end].strip(),
+                recommendation=pattern.get("remediation_template"),
+                reasoning=pattern.get("learned_rule"),
+                pattern_key=pattern_key,
+                start_offset=first.start,
+                end_offset=first.end
+            ))
+        
+        return findings
+    
+    def precision_of(self, pattern_key: str) -> float:
+        with self._lock:
+            pattern = self._patterns.get(pattern_key) or {}
+        return float(pattern.get("precision_score") or 0.0)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "patterns": len(self._patterns),
+                "builds": self._builds,
+                "scans": self._scans
+            }
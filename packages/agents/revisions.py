@@ -0,0 +1,212 @@
+"""
+Document Revisions: Section fingerprints for incremental re-analysis
+Works out which sections changed since the last analysis so only those
+are sent to the framework agents and findings elsewhere are carried forward
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Set
+
+from .chunking import split_sections, normalize_text
+
+
+# Placed between non-adjacent changed sections in the re-analysis text
+OMITTED_MARKER = "\n\n[... unchanged sections omitted ...]\n\n"
+
+
+@dataclass
+class DocumentSection:
+    """One section of the current document text"""
+    index: int
+    start_char: int
+    end_char: int
+    content_hash: str
+    section_title: Optional[str] = None
+
+
+@dataclass
+class RevisionPlan:
+    """Outcome of comparing a document with the revision last analyzed"""
+    sections: List[DocumentSection]
+    changed: List[DocumentSection]  # Sections the framework agents must see
+    unchanged_hashes: Set[str]  # Sections every planned framework already analyzed
+    incremental: bool  # False: the whole document is re-analyzed
+    carried_forward: List[Dict[str, Any]] = field(default_factory=list)  # Stored findings kept as they are
+
+
+def section_hash(text: str) -> str:
+    """Content hash of a section, insensitive to whitespace-only edits."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def fingerprint_sections(text: str) -> List[DocumentSection]:
+    """Split text at section headings and hash every section."""
+    return [
+        DocumentSection(
+            index=i,
+            start_char=start,
+            end_char=end,
+            content_hash=section_hash(text[start:end]),
+            section_title=title
+        )
+        for i, (start, end, title) in enumerate(split_sections(text))
+    ]
+
+
+def plan_revision(
+    sections: List[DocumentSection],
+    previous_sections: List[Dict[str, Any]],
+    previous_findings: List[Dict[str, Any]],
+    frameworks: List[str],
+    max_changed_ratio: float = 0.5
+) -> RevisionPlan:
+    """
+    Decide between incremental and full re-analysis.
+    
+    A section is unchanged when every planned framework has analyzed a
+    section with the same hash. If the changed sections make up more than
+    max_changed_ratio of the text (or nothing was fingerprinted before),
+    the whole document is re-analyzed.
+    
+    In incremental mode, stored LLM findings of the planned frameworks are
+    carried forward when anchored in an unchanged section. A stored LLM
+    finding not anchored to any section (a document-level gap such as a
+    missing clause) can be resolved by an edit anywhere, and the changed
+    sections alone cannot show that, so it forces a full re-analysis.
+    Pattern-matcher findings are never carried: the deterministic scan
+    always covers the full text.
+    
+    Args:
+        sections: Fingerprints of the current text
+        previous_sections: Stored rows (content_hash, frameworks)
+        previous_findings: Stored findings (framework, section_hash, pattern_key, ...)
+        frameworks: Frameworks planned for this run
+        max_changed_ratio: Largest changed share of the text re-analyzed incrementally
+    """
+    current_hashes = {s.content_hash for s in sections}
+    
+    known: Dict[str, Set[str]] = {framework: set() for framework in frameworks}
+    for row in previous_sections:
+        for framework in row.get("frameworks") or ():
+            if framework in known:
+                known[framework].add(row["content_hash"])
+    
+    unchanged = set.intersection(current_hashes, *known.values()) if known else set()
+    changed = [s for s in sections if s.content_hash not in unchanged]
+    
+    total_chars = sum(s.end_char - s.start_char for s in sections) or 1
+    changed_chars = sum(s.end_char - s.start_char for s in changed)
+    llm_findings = [f for f in previous_findings if f.get("framework") in known and not f.get("pattern_key")]
+    incremental = (
+        bool(previous_sections)
+        and changed_chars <= max_changed_ratio * total_chars
+        and all(f.get("section_hash") is not None for f in llm_findings)
+    )
+    
+    if not incremental:
+        return RevisionPlan(sections, list(sections), set(), incremental=False)
+    
+    carried = [f for f in llm_findings if f.get("section_hash") in unchanged]
+    return RevisionPlan(sections, changed, unchanged, incremental=True, carried_forward=carried)
+
+
+def revision_text(text: str, changed: List[DocumentSection]) -> str:
+    """Changed sections in document order, with gaps marked."""
+    parts = []
+    previous_end = None
+    
+    for section in changed:
+        piece = text[section.start_char:section.end_char]
+        if previous_end is not None and section.start_char == previous_end:
+            parts[-1] += piece
+        else:
+            parts.append(piece)
+        previous_end = section.end_char
+    
+    return OMITTED_MARKER.join(part.strip("\n") for part in parts)
+
+
+def superseded_finding_ids(
+    previous_findings: List[Dict[str, Any]],
+    analyzed_frameworks: List[str],
+    rescanned_frameworks: List[str],
+    keep_ids: Set[str]
+) -> List[str]:
+    """
+    Stored findings this run replaces.
+    
+    Args:
+        previous_findings: Stored findings of the document
+        analyzed_frameworks: Frameworks re-analyzed successfully (all their
+            findings not in keep_ids are replaced)
+        rescanned_frameworks: Frameworks whose pattern-matcher findings were
+            recomputed by this run's scan ("all" is implied)
+        keep_ids: Findings carried forward
+    """
+    analyzed = set(analyzed_frameworks)
+    rescanned = set(rescanned_frameworks) | ({"all"} if rescanned_frameworks else set())
+    return [
+        str(f["id"]) for f in previous_findings
+        if str(f["id"]) not in keep_ids
+        and (f.get("framework") in analyzed or (f.get("pattern_key") and f.get("framework") in rescanned))
+    ]
+
+
+def anchor_section(
+    text: str,
+    sections: List[DocumentSection],
+    evidence: Optional[str],
+    start_offset: Optional[int] = None
+) -> Optional[str]:
+    """
+    Hash of the section a finding belongs to: the section containing its
+    start offset, else the one quoting its evidence (exactly, then after
+    normalization). None when it cannot be located.
+    """
+    if start_offset is None and evidence:
+        position = text.find(evidence.strip())
+        if position != -1:
+            start_offset = position
+    
+    if start_offset is not None:
+        for section in sections:
+            if section.start_char <= start_offset < section.end_char:
+                return section.content_hash
+    
+    needle = normalize_text(evidence)
+    if len(needle) < 20:
+        return None
+    for section in sections:
+        if needle in normalize_text(text[section.start_char:section.end_char]):
+            return section.content_hash
+    return None
+
+
+def section_rows(
+    text: str,
+    sections: List[DocumentSection],
+    previous_sections: List[Dict[str, Any]],
+    frameworks: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Rows to store for the current revision. Each section records the
+    frameworks whose findings reflect it: this run's frameworks, plus
+    earlier frameworks for sections whose content did not change.
+    """
+    previous_frameworks: Dict[str, Set[str]] = {}
+    for row in previous_sections:
+        previous_frameworks.setdefault(row["content_hash"], set()).update(row.get("frameworks") or ())
+    
+    return [
+        {
+            "chunk_index": s.index,
+            "content": text[s.start_char:s.end_char],
+            "section_title": s.section_title,
+            "content_hash": s.content_hash,
+            "start_char": s.start_char,
+            "end_char": s.end_char,
+            "frameworks": sorted(set(frameworks) | previous_frameworks.get(s.content_hash, set()))
+        }
+        for s in sections
+    ]
@@ -0,0 +1,106 @@
+"""
+Streaming: Incremental extraction of findings from a streamed JSON completion
+Each finding object is yielded as soon as its closing brace arrives
+"""
+
+import json
+import logging
+from typing import List, Dict, Any, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalFindingsParser:
+    """
+    Character-level scanner over a JSON document arriving in pieces.
+    
+    Tracks string/escape state and container nesting, finds the top-level
+    "findings" array and returns every object inside it once complete. The
+    full text is kept so the caller can still json.loads() the whole
+    response at the end.
+    """
+    
+    def __init__(self, array_key: str = "findings"):
+        """
+        Args:
+            array_key: Top-level key of the array whose items are emitted
+        """
+        self.array_key = array_key
+        self.text = ""
+        self._position = 0
+        self._stack: List[str] = []  # open containers: '{' or '['
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None  # last string closed directly inside the root object
+        self._array_depth: Optional[int] = None  # stack depth inside the findings array
+        self._item_start: Optional[int] = None
+        self.emitted = 0
+    
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        """
+        Add the next piece of the response.
+        
+        Returns:
+            Finding objects completed by this piece, in order
+        """
+        self.text += delta
+        completed = []
+        text = self.text
+        
+        for i in range(self._position, len(text)):
+            char = text[i]
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._stack[0] == "{":
+                        self._last_key = text[self._string_start + 1:i]
+                continue
+            
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            
+            elif char in "{[":
+                self._stack.append(char)
+                depth = len(self._stack)
+                
+                if char == "[" and depth == 2 and self._last_key == self.array_key:
+                    self._array_depth = depth
+                elif char == "{" and self._array_depth is not None and depth == self._array_depth + 1:
+                    self._item_start = i
+            
+            elif char in "}]":
+                depth = len(self._stack)
+                if self._stack:
+                    self._stack.pop()
+                
+                if char == "}" and self._item_start is not None and depth == (self._array_depth or 0) + 1:
+                    item = self._parse_item(text[self._item_start:i + 1])
+                    if item is not None:
+                        completed.append(item)
+                    self._item_start = None
+                elif char == "]" and depth == self._array_depth:
+                    self._array_depth = None
+        
+        self._position = len(text)
+        return completed
+    
+    def _parse_item(self, raw: str) -> Optional[Dict[str, Any]]:
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            logger.warning("Skipping malformed streamed finding: %.200s", raw)
+            return None
+        
+        if not isinstance(item, dict):
+            return None
+        
+        self.emitted += 1
+        return item
@@ -0,0 +1,190 @@
+"""
+Token Budget: Tokenizer-based prompt sizing and LLM usage accounting
+Chunk sizes follow each model's context window instead of a fixed character cut-off
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+from .chunking import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# Context windows (prompt + completion tokens) by model name prefix.
+# Provider prefixes ("anthropic/", "groq/", ...) are stripped before lookup.
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4-1106": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "o1": 200000,
+    "o3": 200000,
+    "claude-3": 200000,
+    "llama3-70b-8192": 8192,
+    "llama3": 8192,
+    "llama-3.1": 128000,
+    "mixtral-8x7b-32768": 32768
+}
+
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Headroom for tokenizer differences between models
+SAFETY_MARGIN = 0.05
+
+# Longest prefix of a document used to measure its characters per token
+DENSITY_SAMPLE_CHARS = 200000
+
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+
+
+def context_window(model: str) -> int:
+    """Context size of a model, by longest matching name prefix."""
+    name = model.split("/")[-1].lower()
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+def _encoding_for(model: str):
+    name = model.split("/")[-1]
+    
+    with _encodings_lock:
+        if name not in _encodings:
+            try:
+                _encodings[name] = tiktoken.encoding_for_model(name)
+            except KeyError:
+                # Non-OpenAI models: o200k_base is a close enough proxy for budgeting
+                _encodings[name] = tiktoken.get_encoding("o200k_base")
+        return _encodings[name]
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Tokens in text for model (local tokenizer; ~4 chars/token without tiktoken)."""
+    if not text:
+        return 0
+    if tiktoken is None:
+        return estimate_tokens(text)
+    return len(_encoding_for(model).encode(text, disallowed_special=()))
+
+
+def document_token_budget(
+    model: str,
+    prompt_tokens: int,
+    completion_reserve: int,
+    max_document_tokens: Optional[int] = None
+) -> int:
+    """
+    Tokens left for document text in one request.
+    
+    Args:
+        model: LLM model identifier
+        prompt_tokens: System prompt plus the fixed part of the user prompt
+        completion_reserve: Tokens kept free for the response
+        max_document_tokens: Optional cap below what the context would allow
+    
+    Returns:
+        Document tokens per request (at least 256)
+    """
+    available = int(context_window(model) * (1 - SAFETY_MARGIN)) - prompt_tokens - completion_reserve
+    if max_document_tokens:
+        available = min(available, max_document_tokens)
+    return max(256, available)
+
+
+def chars_for_tokens(text: str, tokens: int, model: str) -> int:
+    """Characters of text that fit in tokens, using the text's own token density."""
+    sample = text[:DENSITY_SAMPLE_CHARS]
+    sample_tokens = count_tokens(sample, model)
+    if not sample_tokens:
+        return tokens * 4
+    return int(tokens * len(sample) / sample_tokens)
+
+
+class TokenUsageRecorder:
+    """
+    Per-request prompt/completion token accounting for capacity planning.
+    
+    Totals are kept per model; the most recent requests are kept individually.
+    """
+    
+    def __init__(self, history: int = 200):
+        """
+        Args:
+            history: Number of recent requests kept for inspection
+        """
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=history)
+        self._by_model: Dict[str, Dict[str, int]] = {}
+    
+    def record(
+        self,
+        model: str,
+        agent: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        duration_ms: float = 0.0,
+        cached: bool = False,
+        cached_prompt_tokens: int = 0
+    ):
+        """
+        Record one LLM request.
+        
+        Args:
+            cached: Served from the response cache; prompt_tokens counts as saved
+            cached_prompt_tokens: Prompt tokens the provider served from its
+                prompt cache (part of prompt_tokens)
+        """
+        with self._lock:
+            totals = self._by_model.setdefault(model, {
+                "requests": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cache_hits": 0,
+                "prompt_tokens_saved": 0,
+                "cached_prompt_tokens": 0
+            })
+            
+            if cached:
+                totals["cache_hits"] += 1
+                totals["prompt_tokens_saved"] += prompt_tokens
+            else:
+                totals["requests"] += 1
+                totals["prompt_tokens"] += prompt_tokens
+                totals["completion_tokens"] += completion_tokens
+                totals["cached_prompt_tokens"] += cached_prompt_tokens
+            
+            self._recent.append({
+                "timestamp": time.time(),
+                "model": model,
+                "agent": agent,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cached_prompt_tokens": cached_prompt_tokens,
+                "duration_ms": round(duration_ms, 1),
+                "cached": cached
+            })
+    
+    def stats(self, recent: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tokenizer": "tiktoken" if tiktoken is not None else "estimate",
+                "by_model": {
+                    model: {
+                        **totals,
+                        "prompt_cache_rate": round(totals["cached_prompt_tokens"] / totals["prompt_tokens"], 3)
+                        if totals["prompt_tokens"] else 0.0
+                    }
+                    for model, totals in self._by_model.items()
+                },
+                "recent": list(self._recent)[-recent:]
+            }
@@ -41,6 +41,11 @@ CREATE TABLE document_chunks (
     embedding vector(1536), -- OpenAI ada-002 embedding dimension
     page_number INTEGER,
     section_title VARCHAR(500),
+    content_hash VARCHAR(64), -- sha256 of the whitespace-normalized section text
+    start_char INTEGER, -- Offsets of the section in the analyzed text
+    end_char INTEGER,
+    frameworks TEXT[] DEFAULT '{}', -- Frameworks whose stored findings reflect this section
+    analyzed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(), -- When the analysis that wrote this section ran
     metadata JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -65,6 +70,8 @@ CREATE TABLE compliance_findings (
     recommendation TEXT, -- What to do about it
     agent_name VARCHAR(100), -- Which agent found this
     agent_reasoning TEXT, -- Why the agent flagged this
+    pattern_key VARCHAR(255), -- Risk pattern this finding was matched to (for feedback learning)
+    section_hash VARCHAR(64), -- document_chunks.content_hash of the section it was found in (NULL: document-level)
     user_feedback VARCHAR(20), -- 'accepted', 'rejected', 'false_positive'
     user_action_taken TEXT, -- What the user did about it
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -75,6 +82,8 @@ CREATE INDEX idx_findings_document_id ON compliance_findings(document_id);
 CREATE INDEX idx_findings_framework ON compliance_findings(framework);
 CREATE INDEX idx_findings_severity ON compliance_findings(severity);
 CREATE INDEX idx_findings_created_at ON compliance_findings(created_at DESC);
+CREATE INDEX idx_findings_pattern_key ON compliance_findings(pattern_key) WHERE pattern_key IS NOT NULL;
+CREATE INDEX idx_findings_document_page ON compliance_findings(document_id, created_at DESC, id DESC); -- Keyset pagination
 
 -- ============================================================================
 -- SEMANTIC MEMORY: Risk Patterns
@@ -190,6 +199,49 @@ CREATE TABLE users (
 
 CREATE INDEX idx_users_email ON users(email);
 
+-- ============================================================================
+-- ANALYSIS JOBS: Durable queue of document analyses
+-- ============================================================================
+
+-- Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED. document_id has
+-- no foreign key: jobs are queued before the document row exists.
+CREATE TABLE analysis_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_type VARCHAR(50) NOT NULL DEFAULT 'analyze_document',
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- 'queued', 'running', 'succeeded', 'failed'
+    document_id UUID,
+    session_id VARCHAR(255), -- WebSocket session receiving progress events
+    payload JSONB NOT NULL,
+    result JSONB,
+    error TEXT,
+    progress JSONB, -- Latest agent_status event
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(), -- Retry backoff
+    locked_by VARCHAR(255), -- Worker running the job
+    heartbeat_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX idx_jobs_queued ON analysis_jobs(run_after, created_at) WHERE status = 'queued';
+CREATE INDEX idx_jobs_running_heartbeat ON analysis_jobs(heartbeat_at) WHERE status = 'running';
+CREATE INDEX idx_jobs_document_id ON analysis_jobs(document_id, created_at DESC);
+
+-- ============================================================================
+-- WRITE-BEHIND: Items already committed by the findings write-behind buffer
+-- ============================================================================
+
+-- Spill file replay can hand over items that were committed before a crash;
+-- their ids are recorded in the same transaction so replays skip them.
+CREATE TABLE write_behind_applied (
+    item_id UUID PRIMARY KEY,
+    applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX idx_write_behind_applied_at ON write_behind_applied(applied_at);
+
 -- ============================================================================
 -- FUNCTIONS: Auto-update timestamps
 -- ============================================================================
@@ -207,11 +259,276 @@ CREATE TRIGGER update_risk_patterns_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Notify agent workers that risk patterns changed (invalidates their pattern caches)
+CREATE OR REPLACE FUNCTION notify_risk_patterns_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('risk_patterns_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_risk_patterns_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON risk_patterns
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_risk_patterns_changed();
+
+-- Wake idle job workers as soon as a job is queued
+CREATE OR REPLACE FUNCTION notify_analysis_jobs_queued()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('analysis_jobs', 'queued');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_analysis_jobs_queued
+    AFTER INSERT ON analysis_jobs
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_analysis_jobs_queued();
+
+-- ============================================================================
+-- DOCUMENT COMPLIANCE SUMMARY: Incrementally maintained dashboard counters
+-- ============================================================================
+
+-- One row per document, kept current by statement-level triggers on
+-- compliance_findings, alerts and compliance_scores. Dashboard reads are
+-- O(documents) instead of joining findings x alerts x scores.
+CREATE TABLE document_compliance_summary (
+    document_id UUID PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+    critical_findings INTEGER NOT NULL DEFAULT 0,
+    high_findings INTEGER NOT NULL DEFAULT 0,
+    medium_findings INTEGER NOT NULL DEFAULT 0,
+    low_findings INTEGER NOT NULL DEFAULT 0,
+    open_alerts INTEGER NOT NULL DEFAULT 0,
+    latest_compliance_score INTEGER,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Apply per-finding severity deltas (+1 / -1), aggregated per document.
+-- Documents deleted in the same statement (cascades) are skipped.
+CREATE OR REPLACE FUNCTION apply_finding_deltas(doc_ids UUID[], severities TEXT[], deltas INTEGER[])
+RETURNS VOID AS $$
+    INSERT INTO document_compliance_summary AS s
+        (document_id, critical_findings, high_findings, medium_findings, low_findings)
+    SELECT
+        d.document_id,
+        COALESCE(SUM(d.delta) FILTER (WHERE d.severity = 'critical'), 0),
+        COALESCE(SUM(d.delta) FILTER (WHERE d.severity = 'high'), 0),
+        COALESCE(SUM(d.delta) FILTER (WHERE d.severity = 'medium'), 0),
+        COALESCE(SUM(d.delta) FILTER (WHERE d.severity = 'low'), 0)
+    FROM unnest(doc_ids, severities, deltas) AS d(document_id, severity, delta)
+    JOIN documents doc ON doc.id = d.document_id
+    GROUP BY d.document_id
+    ORDER BY d.document_id
+    ON CONFLICT (document_id) DO UPDATE SET
+        critical_findings = s.critical_findings + EXCLUDED.critical_findings,
+        high_findings = s.high_findings + EXCLUDED.high_findings,
+        medium_findings = s.medium_findings + EXCLUDED.medium_findings,
+        low_findings = s.low_findings + EXCLUDED.low_findings,
+        updated_at = NOW();
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION summarize_findings_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM apply_finding_deltas(ARRAY_AGG(document_id), ARRAY_AGG(severity::text), ARRAY_AGG(1))
+        FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM apply_finding_deltas(ARRAY_AGG(document_id), ARRAY_AGG(severity::text), ARRAY_AGG(-1))
+        FROM old_rows;
+    ELSE
+        -- Only rows whose document or severity changed move the counters
+        PERFORM apply_finding_deltas(
+            ARRAY_AGG(c.document_id), ARRAY_AGG(c.severity::text), ARRAY_AGG(c.delta)
+        )
+        FROM (
+            SELECT o.document_id, o.severity, -1 AS delta
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE (o.document_id, o.severity) IS DISTINCT FROM (n.document_id, n.severity)
+            UNION ALL
+            SELECT n.document_id, n.severity, 1
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE (o.document_id, o.severity) IS DISTINCT FROM (n.document_id, n.severity)
+        ) c;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER summarize_findings_insert
+    AFTER INSERT ON compliance_findings
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION summarize_findings_change();
+
+CREATE TRIGGER summarize_findings_update
+    AFTER UPDATE ON compliance_findings
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION summarize_findings_change();
+
+CREATE TRIGGER summarize_findings_delete
+    AFTER DELETE ON compliance_findings
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION summarize_findings_change();
+
+-- Apply open-alert deltas, aggregated per document
+CREATE OR REPLACE FUNCTION apply_alert_deltas(doc_ids UUID[], deltas INTEGER[])
+RETURNS VOID AS $$
+    INSERT INTO document_compliance_summary AS s (document_id, open_alerts)
+    SELECT d.document_id, SUM(d.delta)
+    FROM unnest(doc_ids, deltas) AS d(document_id, delta)
+    JOIN documents doc ON doc.id = d.document_id
+    GROUP BY d.document_id
+    ORDER BY d.document_id
+    ON CONFLICT (document_id) DO UPDATE SET
+        open_alerts = s.open_alerts + EXCLUDED.open_alerts,
+        updated_at = NOW();
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION summarize_alerts_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM apply_alert_deltas(ARRAY_AGG(document_id), ARRAY_AGG(1))
+        FROM new_rows
+        WHERE document_id IS NOT NULL AND is_sent = FALSE;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM apply_alert_deltas(ARRAY_AGG(document_id), ARRAY_AGG(-1))
+        FROM old_rows
+        WHERE document_id IS NOT NULL AND is_sent = FALSE;
+    ELSE
+        PERFORM apply_alert_deltas(ARRAY_AGG(c.document_id), ARRAY_AGG(c.delta))
+        FROM (
+            SELECT o.document_id, -1 AS delta
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE o.document_id IS NOT NULL AND o.is_sent = FALSE
+              AND (o.document_id, o.is_sent) IS DISTINCT FROM (n.document_id, n.is_sent)
+            UNION ALL
+            SELECT n.document_id, 1
+            FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE n.document_id IS NOT NULL AND n.is_sent = FALSE
+              AND (o.document_id, o.is_sent) IS DISTINCT FROM (n.document_id, n.is_sent)
+        ) c;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER summarize_alerts_insert
+    AFTER INSERT ON alerts
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION summarize_alerts_change();
+
+CREATE TRIGGER summarize_alerts_update
+    AFTER UPDATE ON alerts
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION summarize_alerts_change();
+
+CREATE TRIGGER summarize_alerts_delete
+    AFTER DELETE ON alerts
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION summarize_alerts_change();
+
+CREATE OR REPLACE FUNCTION summarize_scores_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        -- New scores can only raise the maximum
+        INSERT INTO document_compliance_summary AS s (document_id, latest_compliance_score)
+        SELECT n.document_id, MAX(n.overall_score)
+        FROM new_rows n
+        JOIN documents doc ON doc.id = n.document_id
+        GROUP BY n.document_id
+        ORDER BY n.document_id
+        ON CONFLICT (document_id) DO UPDATE SET
+            latest_compliance_score = GREATEST(s.latest_compliance_score, EXCLUDED.latest_compliance_score),
+            updated_at = NOW();
+    ELSE
+        -- Deleted or changed scores may lower it: recompute for affected documents only
+        UPDATE document_compliance_summary s
+        SET latest_compliance_score = (
+                SELECT MAX(cs.overall_score) FROM compliance_scores cs WHERE cs.document_id = s.document_id
+            ),
+            updated_at = NOW()
+        WHERE s.document_id IN (SELECT document_id FROM old_rows);
+
+        IF TG_OP = 'UPDATE' THEN
+            INSERT INTO document_compliance_summary AS s (document_id, latest_compliance_score)
+            SELECT n.document_id, MAX(n.overall_score)
+            FROM new_rows n
+            JOIN documents doc ON doc.id = n.document_id
+            GROUP BY n.document_id
+            ORDER BY n.document_id
+            ON CONFLICT (document_id) DO UPDATE SET
+                latest_compliance_score = GREATEST(s.latest_compliance_score, EXCLUDED.latest_compliance_score),
+                updated_at = NOW();
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER summarize_scores_insert
+    AFTER INSERT ON compliance_scores
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION summarize_scores_change();
+
+CREATE TRIGGER summarize_scores_update
+    AFTER UPDATE ON compliance_scores
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION summarize_scores_change();
+
+CREATE TRIGGER summarize_scores_delete
+    AFTER DELETE ON compliance_scores
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION summarize_scores_change();
+
+-- Backfill (no-op on a fresh database; needed when adding the table to an existing one)
+INSERT INTO document_compliance_summary
+    (document_id, critical_findings, high_findings, medium_findings, low_findings,
+     open_alerts, latest_compliance_score)
+SELECT
+    d.id,
+    COALESCE(f.critical, 0),
+    COALESCE(f.high, 0),
+    COALESCE(f.medium, 0),
+    COALESCE(f.low, 0),
+    COALESCE(a.open_alerts, 0),
+    sc.latest_score
+FROM documents d
+LEFT JOIN (
+    SELECT document_id,
+        COUNT(*) FILTER (WHERE severity = 'critical') AS critical,
+        COUNT(*) FILTER (WHERE severity = 'high') AS high,
+        COUNT(*) FILTER (WHERE severity = 'medium') AS medium,
+        COUNT(*) FILTER (WHERE severity = 'low') AS low
+    FROM compliance_findings GROUP BY document_id
+) f ON f.document_id = d.id
+LEFT JOIN (
+    SELECT document_id, COUNT(*) FILTER (WHERE is_sent = FALSE) AS open_alerts
+    FROM alerts GROUP BY document_id
+) a ON a.document_id = d.id
+LEFT JOIN (
+    SELECT document_id, MAX(overall_score) AS latest_score
+    FROM compliance_scores GROUP BY document_id
+) sc ON sc.document_id = d.id
+ON CONFLICT (document_id) DO NOTHING;
+
 -- ============================================================================
 -- VIEWS: Useful aggregations
 -- ============================================================================
 
--- View: Document compliance overview
+-- View: Document compliance overview (reads the incrementally maintained summary)
 CREATE VIEW document_compliance_overview AS
 SELECT 
     d.id,
@@ -219,18 +536,15 @@ SELECT
     d.document_type,
     d.uploaded_at,
     d.last_analyzed_at,
-    COUNT(DISTINCT cf.id) FILTER (WHERE cf.severity = 'critical') as critical_findings,
-    COUNT(DISTINCT cf.id) FILTER (WHERE cf.severity = 'high') as high_findings,
-    COUNT(DISTINCT cf.id) FILTER (WHERE cf.severity = 'medium') as medium_findings,
-    COUNT(DISTINCT cf.id) FILTER (WHERE cf.severity = 'low') as low_findings,
-    COUNT(DISTINCT a.id) FILTER (WHERE a.is_sent = FALSE) as open_alerts,
-    MAX(cs.overall_score) as latest_compliance_score
+    COALESCE(s.critical_findings, 0) as critical_findings,
+    COALESCE(s.high_findings, 0) as high_findings,
+    COALESCE(s.medium_findings, 0) as medium_findings,
+    COALESCE(s.low_findings, 0) as low_findings,
+    COALESCE(s.open_alerts, 0) as open_alerts,
+    s.latest_compliance_score
 FROM documents d
-LEFT JOIN compliance_findings cf ON d.id = cf.document_id
-LEFT JOIN alerts a ON d.id = a.document_id
-LEFT JOIN compliance_scores cs ON d.id = cs.document_id
-WHERE d.is_archived = FALSE
-GROUP BY d.id, d.filename, d.document_type, d.uploaded_at, d.last_analyzed_at;
+LEFT JOIN document_compliance_summary s ON s.document_id = d.id
+WHERE d.is_archived = FALSE;
 
 -- ============================================================================
 -- SEED DATA: Example risk patterns
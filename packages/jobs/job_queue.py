@@ -0,0 +1,291 @@
+"""
+Analysis Job Queue: Postgres-backed work queue for document analysis
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+worker threads or processes can share one queue without double-claiming
+"""
+
+import json
+import logging
+from typing import Dict, Any, List, Optional
+
+from psycopg2.extras import RealDictCursor, Json
+
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel raised by the analysis_jobs insert trigger
+JOB_NOTIFY_CHANNEL = "analysis_jobs"
+
+# Columns returned by get() (the payload, which holds the document text, is left out)
+JOB_STATUS_COLUMNS = (
+    "id", "job_type", "status", "document_id", "session_id", "progress", "error",
+    "attempts", "max_attempts", "created_at", "started_at", "finished_at"
+)
+
+
+def _to_json(value: Any) -> Json:
+    # Analysis results carry datetimes and UUIDs
+    return Json(value, dumps=lambda v: json.dumps(v, default=str))
+
+
+class AnalysisJobQueue:
+    """
+    Durable queue of analysis jobs in the analysis_jobs table.
+    
+    Lifecycle: queued -> running -> succeeded | failed. A failed attempt is
+    re-queued with a growing delay until max_attempts; a running job whose
+    worker stops heartbeating is re-queued by requeue_stale().
+    """
+    
+    def __init__(self, pool, max_attempts: int = 3, retry_delay: float = 30.0):
+        """
+        Args:
+            pool: ComplianceConnectionPool (connection() commits on exit)
+            max_attempts: Attempts per job before it is marked failed
+            retry_delay: Seconds before a retry, multiplied by the attempt number
+        """
+        self.pool = pool
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+    
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        job_type: str = "analyze_document",
+        document_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> str:
+        """
+        Queue a job.
+        
+        Returns:
+            job_id: UUID of the queued job
+        """
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute("""
+                    INSERT INTO analysis_jobs (job_type, document_id, session_id, payload, max_attempts)
+                    VALUES (%s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (job_type, document_id, session_id, _to_json(payload), self.max_attempts))
+                
+                return str(cur.fetchone()[0])
+            
+            finally:
+                cur.close()
+    
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest runnable job, skipping jobs other workers hold locked.
+        
+        Returns:
+            The job (with payload), or None if nothing is runnable
+        """
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            
+            try:
+                cur.execute("""
+                    UPDATE analysis_jobs SET
+                        status = 'running',
+                        attempts = attempts + 1,
+                        locked_by = %s,
+                        started_at = NOW(),
+                        heartbeat_at = NOW()
+                    WHERE id = (
+                        SELECT id FROM analysis_jobs
+                        WHERE status = 'queued' AND run_after <= NOW()
+                        ORDER BY run_after, created_at
+                        LIMIT 1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, job_type, document_id, session_id, payload, attempts, max_attempts
+                """, (worker_id,))
+                
+                row = cur.fetchone()
+                if row is None:
+                    return None
+                
+                job = dict(row)
+                job["id"] = str(job["id"])
+                if job["document_id"] is not None:
+                    job["document_id"] = str(job["document_id"])
+                return job
+            
+            finally:
+                cur.close()
+    
+    def heartbeat(self, held: Dict[str, str]) -> int:
+        """
+        Mark running jobs as alive.
+        
+        Args:
+            held: job_id -> worker_id of the jobs this process is running
+        
+        Returns:
+            Number of jobs still held by their worker
+        """
+        if not held:
+            return 0
+        
+        job_ids, worker_ids = zip(*held.items())
+        
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute("""
+                    UPDATE analysis_jobs j SET heartbeat_at = NOW()
+                    FROM unnest(%s::uuid[], %s::text[]) AS h(id, worker_id)
+                    WHERE j.id = h.id AND j.locked_by = h.worker_id AND j.status = 'running'
+                """, (list(job_ids), list(worker_ids)))
+                return cur.rowcount
+            
+            finally:
+                cur.close()
+    
+    def record_progress(self, job_id: str, worker_id: str, progress: Dict[str, Any]):
+        """Store the latest progress event, so pollers see it too."""
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute("""
+                    UPDATE analysis_jobs SET progress = %s, heartbeat_at = NOW()
+                    WHERE id = %s AND locked_by = %s
+                """, (_to_json(progress), job_id, worker_id))
+            
+            finally:
+                cur.close()
+    
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a job's result.
+        
+        Returns:
+            False if the job was no longer held by worker_id (e.g. re-queued as stale)
+        """
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute("""
+                    UPDATE analysis_jobs SET
+                        status = 'succeeded',
+                        result = %s,
+                        error = NULL,
+                        locked_by = NULL,
+                        finished_at = NOW()
+                    WHERE id = %s AND locked_by = %s
+                """, (_to_json(result), job_id, worker_id))
+                return cur.rowcount == 1
+            
+            finally:
+                cur.close()
+    
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> Optional[str]:
+        """
+        Record a failed attempt; re-queue it with backoff while attempts remain.
+        
+        Returns:
+            The job's new status ('queued' or 'failed'), or None if it was no
+            longer held by worker_id
+        """
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute("""
+                    UPDATE analysis_jobs SET
+                        status = CASE WHEN %(retry)s AND attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                        run_after = NOW() + make_interval(secs => %(delay)s * attempts),
+                        finished_at = CASE WHEN %(retry)s AND attempts < max_attempts THEN NULL ELSE NOW() END,
+                        error = %(error)s,
+                        locked_by = NULL
+                    WHERE id = %(id)s AND locked_by = %(worker)s
+                    RETURNING status
+                """, {"retry": retry, "delay": self.retry_delay, "error": error[:10000],
+                      "id": job_id, "worker": worker_id})
+                
+                row = cur.fetchone()
+                return row[0] if row else None
+            
+            finally:
+                cur.close()
+    
+    def requeue_stale(self, stale_after: float) -> List[str]:
+        """
+        Release running jobs whose worker has not heartbeated for stale_after
+        seconds (crashed or killed process).
+        
+        Returns:
+            Ids of the released jobs
+        """
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute("""
+                    UPDATE analysis_jobs SET
+                        status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                        finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+                        error = 'Worker stopped responding',
+                        locked_by = NULL
+                    WHERE status = 'running' AND heartbeat_at < NOW() - make_interval(secs => %s)
+                    RETURNING id
+                """, (stale_after,))
+                
+                released = [str(row[0]) for row in cur.fetchall()]
+            
+            finally:
+                cur.close()
+        
+        if released:
+            logger.warning("Released %d stale analysis jobs: %s", len(released), ", ".join(released))
+        return released
+    
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """Status (and optionally result) of a job, or None if unknown."""
+        columns = list(JOB_STATUS_COLUMNS) + (["result"] if include_result else [])
+        
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            
+            try:
+                cur.execute(
+                    f"SELECT {', '.join(columns)} FROM analysis_jobs WHERE id = %s",
+                    (job_id,)
+                )
+                row = cur.fetchone()
+                return dict(row) if row else None
+            
+            finally:
+                cur.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Jobs per status and the age of the oldest runnable job."""
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            
+            try:
+                cur.execute("""
+                    SELECT
+                        COUNT(*) FILTER (WHERE status = 'queued') AS queued,
+                        COUNT(*) FILTER (WHERE status = 'running') AS running,
+                        COUNT(*) FILTER (WHERE status = 'succeeded') AS succeeded,
+                        COUNT(*) FILTER (WHERE status = 'failed') AS failed,
+                        EXTRACT(EPOCH FROM NOW() - MIN(created_at) FILTER (
+                            WHERE status = 'queued' AND run_after <= NOW()
+                        )) AS oldest_queued_seconds
+                    FROM analysis_jobs
+                """)
+                
+                stats = dict(cur.fetchone())
+                if stats["oldest_queued_seconds"] is not None:
+                    stats["oldest_queued_seconds"] = round(float(stats["oldest_queued_seconds"]), 1)
+                return stats
+            
+            finally:
+                cur.close()
@@ -0,0 +1,241 @@
+"""
+Job Workers: Thread pool that claims and runs queued analysis jobs
+Workers wake on NOTIFY from the analysis_jobs table (with polling as a
+fallback); add threads or processes to scale throughput
+"""
+
+import logging
+import os
+import select
+import socket
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+from .job_queue import AnalysisJobQueue, JOB_NOTIFY_CHANNEL
+
+
+logger = logging.getLogger(__name__)
+
+# handler(payload, report) -> result; report(event) publishes progress
+JobHandler = Callable[[Dict[str, Any], Callable[[Dict[str, Any]], None]], Dict[str, Any]]
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed (e.g. invalid payload)."""
+
+
+class JobWorkerPool:
+    """
+    Worker threads sharing one AnalysisJobQueue.
+    
+    Each worker claims a job, runs the handler registered for its job_type
+    and stores the result. A maintenance thread heartbeats the jobs this
+    process is running and re-queues jobs abandoned by dead workers. A
+    listener thread LISTENs for new jobs so idle workers start at once.
+    """
+    
+    def __init__(
+        self,
+        queue: AnalysisJobQueue,
+        handlers: Dict[str, JobHandler],
+        db_connection_string: Optional[str] = None,
+        workers: int = 2,
+        poll_interval: float = 5.0,
+        heartbeat_interval: float = 15.0,
+        stale_after: float = 120.0,
+        on_event: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None
+    ):
+        """
+        Args:
+            queue: Job queue to work on
+            handlers: job_type -> handler
+            db_connection_string: DSN for the LISTEN connection (None: poll only)
+            workers: Number of worker threads
+            poll_interval: Seconds an idle worker waits before checking the queue again
+            heartbeat_interval: Seconds between heartbeats for running jobs
+            stale_after: Seconds without heartbeat after which a running job is re-queued
+            on_event: Called with (job, event) for every progress event of a job
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.conn_string = db_connection_string
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.on_event = on_event
+        
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._running: Dict[str, str] = {}  # job_id -> worker_id
+        
+        # Stats
+        self._completed = 0
+        self._failed = 0
+        self._retried = 0
+    
+    def start(self):
+        for index in range(self.workers):
+            self._spawn(self._work, f"job-worker-{index}", index)
+        self._spawn(self._maintain, "job-maintenance")
+        if self.conn_string:
+            self._spawn(self._listen, "job-listener")
+    
+    def _spawn(self, target, name: str, *args):
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+    
+    def notify(self):
+        """Wake idle workers (e.g. right after submitting a job in this process)."""
+        self._wakeup.set()
+    
+    def stop(self, timeout: float = 30.0):
+        """
+        Stop claiming jobs and wait up to timeout for running ones.
+        Jobs still running afterwards are re-queued by another process once
+        their heartbeat goes stale.
+        """
+        self._stop_event.set()
+        self._wakeup.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+    
+    def _work(self, index: int):
+        worker_id = f"{self.worker_prefix}:{index}"
+        
+        while not self._stop_event.is_set():
+            try:
+                job = self.queue.claim(worker_id)
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+            
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            
+            self._run_job(job, worker_id)
+    
+    def _run_job(self, job: Dict[str, Any], worker_id: str):
+        job_id = job["id"]
+        with self._lock:
+            self._running[job_id] = worker_id
+        
+        def report(event: Dict[str, Any]):
+            event = {**event, "job_id": job_id}
+            if event.get("type") == "agent_status":
+                try:
+                    self.queue.record_progress(job_id, worker_id, event)
+                except Exception:
+                    logger.exception("Recording progress of job %s failed", job_id)
+            self._publish(job, event)
+        
+        try:
+            handler = self.handlers.get(job["job_type"])
+            if handler is None:
+                raise PermanentJobError(f"No handler for job type {job['job_type']}")
+            
+            result = handler(job["payload"], report)
+            
+            if self.queue.complete(job_id, worker_id, result):
+                self._completed += 1
+            else:
+                logger.warning("Job %s was released before it completed; result discarded", job_id)
+        
+        except Exception as e:
+            logger.exception("Job %s failed (attempt %d/%d)", job_id, job["attempts"], job["max_attempts"])
+            try:
+                status = self.queue.fail(job_id, worker_id, str(e), retry=not isinstance(e, PermanentJobError))
+            except Exception:
+                logger.exception("Recording failure of job %s failed", job_id)
+                status = None
+            
+            if status == "queued":
+                self._retried += 1
+            else:
+                self._failed += 1
+            self._publish(job, {
+                "type": "error",
+                "job_id": job_id,
+                "message": str(e),
+                "retrying": status == "queued"
+            })
+        
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+    
+    def _publish(self, job: Dict[str, Any], event: Dict[str, Any]):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(job, event)
+        except Exception:
+            logger.exception("Job event listener failed")
+    
+    def _maintain(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            try:
+                with self._lock:
+                    held = dict(self._running)
+                self.queue.heartbeat(held)
+                self.queue.requeue_stale(self.stale_after)
+            except Exception:
+                logger.exception("Job maintenance failed")
+    
+    def _listen(self):
+        """Wake workers on NOTIFY; reconnects like the pattern change listener."""
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.conn_string)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {JOB_NOTIFY_CHANNEL}")
+                cur.close()
+                
+                # Jobs may have been queued while we were not listening
+                self._wakeup.set()
+                
+                while not self._stop_event.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    
+                    conn.poll()
+                    if conn.notifies:
+                        del conn.notifies[:]
+                        self._wakeup.set()
+            
+            except psycopg2.Error:
+                logger.warning("Job listener connection lost; retrying in %.0fs", self.poll_interval)
+                self._stop_event.wait(self.poll_interval)
+            
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except psycopg2.Error:
+                        pass
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            running = len(self._running)
+        return {
+            "workers": self.workers,
+            "running": running,
+            "idle": self.workers - running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "retried": self._retried
+        }
@@ -0,0 +1,737 @@
+"""
+Async Compliance Memory: asyncio backends for the SIAI memory interface
+Lets the FastAPI endpoints await database I/O instead of blocking the event loop
+"""
+
+import asyncio
+import time
+import uuid
+from typing import List, Dict, Optional, Any
+
+from .compliance_memory import (
+    EpisodicComplianceMemory,
+    SemanticComplianceMemory,
+    FINDING_INSERT_COLUMNS,
+    SECTION_INSERT_COLUMNS,
+    resolve_finding_columns,
+    encode_findings_cursor,
+    decode_findings_cursor
+)
+from .connection_pool import PoolTimeoutError
+from .pattern_cache import PatternCache, PATTERN_CHANGE_CHANNEL
+from .feedback_learning import feedback_batch_sql, feedback_batch_params
+
+try:
+    import asyncpg
+except ImportError:  # Only required for MEMORY_BACKEND=asyncpg
+    asyncpg = None
+
+
+def _record_to_dict(record) -> Dict[str, Any]:
+    """Convert an asyncpg Record to the dict shape psycopg2's RealDictCursor returns."""
+    return {
+        key: str(value) if isinstance(value, uuid.UUID) else value
+        for key, value in record.items()
+    }
+
+
+class _AsyncPoolStats:
+    """Wraps an asyncpg pool to bound and track checkout wait times."""
+    
+    def __init__(self, pool, checkout_timeout: Optional[float] = None):
+        """
+        Args:
+            pool: asyncpg pool
+            checkout_timeout: Seconds to wait for a free connection before
+                PoolTimeoutError (None: wait indefinitely)
+        """
+        self.pool = pool
+        self.checkout_timeout = checkout_timeout
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def acquire(self):
+        return _TimedAcquire(self)
+    
+    def stats(self) -> Dict[str, Any]:
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        return {
+            "backend": "asyncpg",
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(1000 * self.total_wait / self.checkouts, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 3)
+        }
+
+
+class _TimedAcquire:
+    def __init__(self, owner: _AsyncPoolStats):
+        self.owner = owner
+        self.conn = None
+    
+    async def __aenter__(self):
+        start = time.monotonic()
+        try:
+            self.conn = await self.owner.pool.acquire(timeout=self.owner.checkout_timeout)
+        except asyncio.TimeoutError:
+            # Same error as the psycopg2 pool, so callers handle both backends alike
+            self.owner.timeouts += 1
+            raise PoolTimeoutError(
+                f"No database connection available after {self.owner.checkout_timeout}s "
+                f"(max_size={self.owner.pool.get_max_size()})"
+            ) from None
+        wait = time.monotonic() - start
+        self.owner.checkouts += 1
+        self.owner.total_wait += wait
+        self.owner.max_wait = max(self.owner.max_wait, wait)
+        return self.conn
+    
+    async def __aexit__(self, *exc):
+        await self.owner.pool.release(self.conn)
+
+
+class AsyncEpisodicComplianceMemory:
+    """
+    asyncpg implementation of EpisodicComplianceMemory.
+    Same methods and return shapes, as coroutines.
+    """
+    
+    def __init__(self, pool: _AsyncPoolStats):
+        self.pool = pool
+    
+    async def store_finding(
+        self,
+        document_id: str,
+        framework: str,
+        finding_type: str,
+        severity: str,
+        title: str,
+        description: str,
+        location: Optional[str] = None,
+        evidence: Optional[str] = None,
+        recommendation: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        agent_reasoning: Optional[str] = None
+    ) -> str:
+        """Store a compliance finding (episodic memory)."""
+        async with self.pool.acquire() as conn:
+            finding_id = await conn.fetchval("""
+                INSERT INTO compliance_findings
+                (document_id, framework, finding_type, severity, title, description,
+                 location, evidence, recommendation, agent_name, agent_reasoning)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+                RETURNING id
+            """, document_id, framework, finding_type, severity, title, description,
+                location, evidence, recommendation, agent_name, agent_reasoning)
+            
+            return str(finding_id)
+    
+    async def store_findings_batch(
+        self,
+        findings: List[Dict[str, Any]],
+        conn=None
+    ) -> List[str]:
+        """
+        Store many findings with one INSERT ... SELECT FROM unnest(...).
+        Returns finding ids in input order; ids are assigned before the
+        INSERT (client "id" when given) and rows that already exist are skipped.
+        """
+        if not findings:
+            return []
+        
+        finding_ids = [str(f.get("id") or uuid.uuid4()) for f in findings]
+        columns = [finding_ids] + [[f.get(col) for f in findings] for col in FINDING_INSERT_COLUMNS]
+        query = f"""
+            INSERT INTO compliance_findings (id, {", ".join(FINDING_INSERT_COLUMNS)})
+            SELECT * FROM unnest(
+                $1::uuid[], $2::uuid[], $3::varchar[], $4::varchar[], $5::varchar[], $6::varchar[],
+                $7::text[], $8::text[], $9::text[], $10::text[], $11::varchar[], $12::text[],
+                $13::varchar[], $14::varchar[]
+            )
+            ON CONFLICT (id) DO NOTHING
+        """
+        
+        if conn is not None:
+            await conn.execute(query, *columns)
+        else:
+            async with self.pool.acquire() as conn:
+                await conn.execute(query, *columns)
+        
+        return finding_ids
+    
+    async def get_document_findings(
+        self,
+        document_id: str,
+        framework: Optional[str] = None,
+        severity: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        view: str = "full",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Retrieve findings for a specific document, newest first."""
+        page = await self.get_document_findings_page(
+            document_id,
+            framework=framework,
+            severity=severity,
+            fields=fields,
+            view=view,
+            limit=limit,
+            cursor=cursor
+        )
+        return page["findings"]
+    
+    async def get_document_findings_page(
+        self,
+        document_id: str,
+        framework: Optional[str] = None,
+        severity: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        view: str = "full",
+        limit: Optional[int] = 100,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Keyset-paginated findings on (created_at, id)."""
+        columns = resolve_finding_columns(fields, view)
+        query = f"SELECT {', '.join(columns)} FROM compliance_findings WHERE document_id = $1"
+        params: List[Any] = [document_id]
+        
+        if framework:
+            params.append(framework)
+            query += f" AND framework = ${len(params)}"
+        
+        if severity:
+            params.append(severity)
+            query += f" AND severity = ${len(params)}"
+        
+        if cursor:
+            created_at, finding_id = decode_findings_cursor(cursor)
+            params.extend([created_at, finding_id])
+            query += f" AND (created_at, id) < (${len(params) - 1}::text::timestamptz, ${len(params)}::uuid)"
+        
+        query += " ORDER BY created_at DESC, id DESC"
+        
+        if limit is not None:
+            params.append(limit + 1)
+            query += f" LIMIT ${len(params)}"
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *params)
+            findings = [_record_to_dict(row) for row in rows]
+        
+        next_cursor = None
+        if limit is not None and len(findings) > limit:
+            findings = findings[:limit]
+            next_cursor = encode_findings_cursor(findings[-1])
+        
+        return {"findings": findings, "next_cursor": next_cursor}
+    
+    async def get_document_severity_counts(self, document_id: str) -> Dict[str, Any]:
+        """Aggregate a document's findings by severity and framework in one query."""
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT
+                    COUNT(*) AS total_findings,
+                    COUNT(*) FILTER (WHERE severity = 'critical') AS critical,
+                    COUNT(*) FILTER (WHERE severity = 'high') AS high,
+                    COUNT(*) FILTER (WHERE severity = 'medium') AS medium,
+                    COUNT(*) FILTER (WHERE severity = 'low') AS low,
+                    COALESCE(ARRAY_AGG(DISTINCT framework), '{}') AS frameworks_analyzed
+                FROM compliance_findings
+                WHERE document_id = $1
+            """, document_id)
+            
+            return _record_to_dict(row)
+    
+    async def delete_findings(self, finding_ids: List[str], conn=None) -> int:
+        """Delete findings superseded by a re-analysis; returns rows deleted."""
+        if not finding_ids:
+            return 0
+        
+        query = "DELETE FROM compliance_findings WHERE id = ANY($1::uuid[])"
+        if conn is not None:
+            status = await conn.execute(query, list(finding_ids))
+        else:
+            async with self.pool.acquire() as conn:
+                status = await conn.execute(query, list(finding_ids))
+        
+        # asyncpg returns the command tag, e.g. "DELETE 3"
+        return int(status.split()[-1])
+    
+    async def get_document_sections(self, document_id: str) -> List[Dict[str, Any]]:
+        """Section fingerprints of the revision last analyzed, in document order."""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT chunk_index, section_title, content_hash, start_char, end_char, frameworks
+                FROM document_chunks
+                WHERE document_id = $1 AND content_hash IS NOT NULL
+                ORDER BY chunk_index
+            """, document_id)
+            
+            return [_record_to_dict(row) for row in rows]
+    
+    async def replace_document_sections(
+        self,
+        document_id: str,
+        sections: List[Dict[str, Any]],
+        conn=None
+    ):
+        """Replace a document's section fingerprints with those of the revision just analyzed."""
+        if conn is None:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await self.replace_document_sections(document_id, sections, conn=conn)
+            return
+        
+        await conn.execute("""
+            DELETE FROM document_chunks
+            WHERE document_id = $1 AND content_hash IS NOT NULL
+        """, document_id)
+        
+        if sections:
+            await conn.executemany(
+                f"""
+                INSERT INTO document_chunks ({", ".join(SECTION_INSERT_COLUMNS)})
+                VALUES ({", ".join(f"${i + 1}" for i in range(len(SECTION_INSERT_COLUMNS)))})
+                """,
+                [
+                    tuple(document_id if col == "document_id" else section.get(col) for col in SECTION_INSERT_COLUMNS)
+                    for section in sections
+                ]
+            )
+    
+    async def get_document_text(self, document_id: str) -> Optional[str]:
+        """Text of the revision last analyzed, reassembled from its sections."""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT content FROM document_chunks
+                WHERE document_id = $1 AND content_hash IS NOT NULL
+                ORDER BY chunk_index
+            """, document_id)
+            
+            return "".join(row["content"] for row in rows) if rows else None
+    
+    async def record_user_feedback(
+        self,
+        finding_id: str,
+        feedback: str,
+        action_taken: Optional[str] = None
+    ):
+        """Record user feedback on a finding (for learning)."""
+        async with self.pool.acquire() as conn:
+            await conn.execute("""
+                UPDATE compliance_findings
+                SET user_feedback = $1,
+                    user_action_taken = $2,
+                    resolved_at = CASE WHEN $1 IN ('accepted', 'rejected') THEN NOW() ELSE resolved_at END
+                WHERE id = $3
+            """, feedback, action_taken, finding_id)
+
+
+class AsyncSemanticComplianceMemory:
+    """
+    asyncpg implementation of SemanticComplianceMemory.
+    Same methods and return shapes, as coroutines.
+    """
+    
+    def __init__(self, pool: _AsyncPoolStats, pattern_cache: Optional[PatternCache] = None):
+        self.pool = pool
+        self.pattern_cache = pattern_cache
+    
+    async def record_pattern_observation(
+        self,
+        pattern_key: str,
+        framework: str,
+        document_type: str,
+        risk_indicator: str,
+        is_true_positive: bool,
+        severity: Optional[str] = None,
+        conn=None
+    ):
+        """Record an observation of a risk pattern."""
+        await self.record_pattern_observations([{
+            "pattern_key": pattern_key,
+            "framework": framework,
+            "document_type": document_type,
+            "risk_indicator": risk_indicator,
+            "is_true_positive": is_true_positive,
+            "severity": severity
+        }], conn=conn)
+    
+    async def record_pattern_observations(
+        self,
+        observations: List[Dict[str, Any]],
+        conn=None
+    ):
+        """Apply many pattern observations in one atomic upsert."""
+        if not observations:
+            return
+        
+        columns = [
+            [o["pattern_key"] for o in observations],
+            [o["framework"] for o in observations],
+            [o.get("document_type") or "unknown" for o in observations],
+            [o.get("risk_indicator") or "" for o in observations],
+            [bool(o["is_true_positive"]) for o in observations],
+            [o.get("severity") for o in observations]
+        ]
+        query = """
+            INSERT INTO risk_patterns AS rp
+            (pattern_key, pattern_description, framework, document_type, risk_indicator,
+             frequency_observed, true_positive_count, false_positive_count,
+             precision_score, confidence_score, avg_severity, observation_count, learned_rule)
+            SELECT
+                obs.pattern_key,
+                'Pattern: ' || (ARRAY_AGG(obs.risk_indicator))[1] || ' in ' || (ARRAY_AGG(obs.document_type))[1],
+                (ARRAY_AGG(obs.framework))[1],
+                (ARRAY_AGG(obs.document_type))[1],
+                (ARRAY_AGG(obs.risk_indicator))[1],
+                COUNT(*),
+                COUNT(*) FILTER (WHERE obs.is_true_positive),
+                COUNT(*) FILTER (WHERE NOT obs.is_true_positive),
+                COUNT(*) FILTER (WHERE obs.is_true_positive)::numeric / COUNT(*),
+                LEAST(1.0, COUNT(*) / 100.0),
+                COALESCE((ARRAY_AGG(obs.severity))[1], 'medium'),
+                COUNT(*),
+                'Early pattern for ' || (ARRAY_AGG(obs.risk_indicator))[1]
+            FROM unnest($1::varchar[], $2::varchar[], $3::varchar[], $4::text[], $5::bool[], $6::varchar[])
+                AS obs(pattern_key, framework, document_type, risk_indicator, is_true_positive, severity)
+            GROUP BY obs.pattern_key
+            ORDER BY obs.pattern_key
+            ON CONFLICT (pattern_key) DO UPDATE SET
+                frequency_observed = rp.frequency_observed + EXCLUDED.frequency_observed,
+                true_positive_count = rp.true_positive_count + EXCLUDED.true_positive_count,
+                false_positive_count = rp.false_positive_count + EXCLUDED.false_positive_count,
+                precision_score = COALESCE(
+                    (rp.true_positive_count + EXCLUDED.true_positive_count)::numeric
+                    / NULLIF(rp.true_positive_count + EXCLUDED.true_positive_count
+                             + rp.false_positive_count + EXCLUDED.false_positive_count, 0),
+                    0.0
+                ),
+                confidence_score = LEAST(1.0, (rp.frequency_observed + EXCLUDED.frequency_observed) / 100.0),
+                observation_count = rp.frequency_observed + EXCLUDED.frequency_observed,
+                last_updated_at = NOW()
+        """
+        
+        if conn is not None:
+            await conn.execute(query, *columns)
+        else:
+            async with self.pool.acquire() as conn:
+                await conn.execute(query, *columns)
+        
+        if self.pattern_cache:
+            self.pattern_cache.invalidate()
+    
+    async def get_high_precision_patterns(
+        self,
+        framework: Optional[str] = None,
+        min_precision: float = 0.7,
+        min_confidence: float = 0.5
+    ) -> List[Dict[str, Any]]:
+        """Get patterns with high precision and confidence (cached when configured)."""
+        key = ("high_precision", framework, min_precision, min_confidence)
+        
+        if self.pattern_cache:
+            hit, patterns, generation = self.pattern_cache.lookup(key)
+            if not hit:
+                patterns = await self._query_high_precision_patterns(framework, min_precision, min_confidence)
+                self.pattern_cache.store(key, patterns, generation)
+            return [dict(p) for p in patterns]
+        
+        return await self._query_high_precision_patterns(framework, min_precision, min_confidence)
+    
+    async def _query_high_precision_patterns(
+        self,
+        framework: Optional[str],
+        min_precision: float,
+        min_confidence: float
+    ) -> List[Dict[str, Any]]:
+        query = """
+            SELECT * FROM risk_patterns
+            WHERE precision_score >= $1
+              AND confidence_score >= $2
+        """
+        params: List[Any] = [min_precision, min_confidence]
+        
+        if framework:
+            params.append(framework)
+            query += f" AND framework = ${len(params)}"
+        
+        query += " ORDER BY precision_score DESC, confidence_score DESC"
+        
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *params)
+            return [_record_to_dict(row) for row in rows]
+    
+    async def get_pattern(self, pattern_key: str) -> Optional[Dict[str, Any]]:
+        """Get a specific pattern by key."""
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT * FROM risk_patterns
+                WHERE pattern_key = $1
+            """, pattern_key)
+            
+            return _record_to_dict(row) if row else None
+    
+    async def get_remediation_template(self, pattern_key: str) -> Optional[str]:
+        """Get the standard remediation for a pattern."""
+        pattern = await self.get_pattern(pattern_key)
+        return pattern.get('remediation_template') if pattern else None
+
+
+class AsyncComplianceMemoryAgent:
+    """
+    asyncpg implementation of the ComplianceMemoryAgent interface.
+    Owns its own asyncpg pool; call connect() before use and close() on shutdown.
+    """
+    
+    def __init__(
+        self,
+        db_connection_string: str,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_checkout_timeout: float = 30.0,
+        pattern_cache_ttl: float = 300.0,
+        listen_for_pattern_changes: bool = True
+    ):
+        if asyncpg is None:
+            raise ImportError("asyncpg is required for the async memory backend. Install with: pip install asyncpg")
+        
+        self.conn_string = db_connection_string
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_checkout_timeout = pool_checkout_timeout
+        self.listen_for_pattern_changes = listen_for_pattern_changes
+        
+        # Reliable-pattern lookups are cached in-process and invalidated on NOTIFY
+        self.pattern_cache = PatternCache(ttl=pattern_cache_ttl)
+        self._listener_conn = None
+        
+        self.pool: Optional[_AsyncPoolStats] = None
+        self.episodic: Optional[AsyncEpisodicComplianceMemory] = None
+        self.semantic: Optional[AsyncSemanticComplianceMemory] = None
+    
+    async def connect(self):
+        """Open the asyncpg pool."""
+        pool = await asyncpg.create_pool(
+            self.conn_string,
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size
+        )
+        self.pool = _AsyncPoolStats(pool, checkout_timeout=self.pool_checkout_timeout)
+        self.episodic = AsyncEpisodicComplianceMemory(self.pool)
+        self.semantic = AsyncSemanticComplianceMemory(self.pool, pattern_cache=self.pattern_cache)
+        
+        if self.listen_for_pattern_changes:
+            # LISTEN needs a dedicated session outside the pool
+            self._listener_conn = await asyncpg.connect(self.conn_string)
+            await self._listener_conn.add_listener(
+                PATTERN_CHANGE_CHANNEL,
+                lambda *_: self.pattern_cache.invalidate()
+            )
+    
+    async def remember_finding(
+        self,
+        document_id: str,
+        framework: str,
+        finding_type: str,
+        severity: str,
+        title: str,
+        description: str,
+        pattern_key: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """Store a finding and update pattern learning."""
+        finding = {
+            "framework": framework,
+            "finding_type": finding_type,
+            "severity": severity,
+            "title": title,
+            "description": description,
+            "pattern_key": pattern_key,
+            **kwargs
+        }
+        finding_ids = await self.remember_findings_batch(
+            document_id,
+            [finding],
+            document_type=kwargs.get('document_type', 'unknown')
+        )
+        return finding_ids[0]
+    
+    async def remember_findings_batch(
+        self,
+        document_id: str,
+        findings: List[Dict[str, Any]],
+        document_type: str = "unknown",
+        agent_name: Optional[str] = None,
+        superseded_ids: Optional[List[str]] = None,
+        sections: Optional[List[Dict[str, Any]]] = None
+    ) -> List[str]:
+        """
+        Store all findings of one analysis (and their pattern observations) in
+        one transaction; same arguments as ComplianceMemoryAgent.remember_findings_batch.
+        """
+        if not findings and not superseded_ids and sections is None:
+            return []
+        
+        rows = [
+            {
+                "document_id": document_id,
+                "framework": f["framework"],
+                "finding_type": f["finding_type"],
+                "severity": f["severity"],
+                "title": f["title"],
+                "description": f["description"],
+                "location": f.get("location"),
+                "evidence": f.get("evidence"),
+                "recommendation": f.get("recommendation"),
+                "agent_name": f.get("agent_name", agent_name),
+                "agent_reasoning": f.get("agent_reasoning", f.get("reasoning")),
+                "pattern_key": f.get("pattern_key"),
+                "section_hash": f.get("section_hash")
+            }
+            for f in findings
+        ]
+        
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await self.episodic.delete_findings(superseded_ids or [], conn=conn)
+                finding_ids = await self.episodic.store_findings_batch(rows, conn=conn)
+                
+                await self.semantic.record_pattern_observations([
+                    {
+                        "pattern_key": f["pattern_key"],
+                        "framework": f["framework"],
+                        "document_type": document_type,
+                        "risk_indicator": f.get("evidence") or "",
+                        "is_true_positive": True,  # Assume true until user feedback says otherwise
+                        "severity": f["severity"]
+                    }
+                    for f in findings
+                    if f.get("pattern_key")
+                ], conn=conn)
+                
+                if sections is not None:
+                    await self.episodic.replace_document_sections(document_id, sections, conn=conn)
+        
+        return finding_ids
+    
+    async def learn_from_feedback(
+        self,
+        finding_id: str,
+        feedback: str,
+        pattern_key: Optional[str] = None,
+        action_taken: Optional[str] = None
+    ):
+        """Learn from user feedback on a finding (finding and its risk pattern in one statement)."""
+        await self.learn_from_feedback_batch([{
+            "finding_id": str(finding_id),
+            "feedback": feedback,
+            "action_taken": action_taken,
+            "pattern_key": pattern_key
+        }])
+    
+    async def learn_from_feedback_batch(self, events: List[Dict[str, Any]]):
+        """Apply many feedback events to findings and risk patterns in one statement."""
+        if not events:
+            return
+        
+        async with self.pool.acquire() as conn:
+            await conn.execute(feedback_batch_sql("$1", "$2", "$3", "$4"), *feedback_batch_params(events))
+        
+        self.pattern_cache.invalidate()
+    
+    async def get_reliable_patterns(
+        self,
+        framework: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get patterns that are reliable (high precision and confidence)."""
+        return await self.semantic.get_high_precision_patterns(
+            framework=framework,
+            min_precision=0.7,
+            min_confidence=0.5
+        )
+    
+    async def get_document_risk_profile(
+        self,
+        document_id: str,
+        include_findings: bool = True,
+        findings_view: str = "full",
+        findings_limit: Optional[int] = None,
+        findings_cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get a risk profile for a document (SQL aggregates, plus all or a page of findings)."""
+        profile = await self.episodic.get_document_severity_counts(document_id)
+        
+        if include_findings:
+            page = await self.episodic.get_document_findings_page(
+                document_id,
+                view=findings_view,
+                limit=findings_limit,
+                cursor=findings_cursor
+            )
+            profile["findings"] = page["findings"]
+            profile["next_cursor"] = page["next_cursor"]
+        
+        return profile
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool occupancy and wait-time stats."""
+        return self.pool.stats() if self.pool else {"backend": "asyncpg", "size": 0}
+    
+    async def close(self):
+        """Close the listener connection and the asyncpg pool."""
+        if self._listener_conn is not None:
+            await self._listener_conn.close()
+            self._listener_conn = None
+        if self.pool:
+            await self.pool.pool.close()
+
+
+class ThreadedComplianceMemoryAgent:
+    """
+    Async facade over the blocking psycopg2 ComplianceMemoryAgent.
+    Every call runs in a worker thread, so awaiting it never blocks the loop.
+    Used when MEMORY_BACKEND=psycopg2.
+    """
+    
+    def __init__(self, target, executor=None):
+        """
+        Args:
+            target: ComplianceMemoryAgent (or one of its memory classes)
+            executor: concurrent.futures executor (default: the loop's default executor)
+        """
+        self._target = target
+        self._executor = executor
+    
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        
+        if isinstance(attr, (EpisodicComplianceMemory, SemanticComplianceMemory)):
+            return ThreadedComplianceMemoryAgent(attr, self._executor)
+        
+        if not callable(attr):
+            return attr
+        
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, lambda: attr(*args, **kwargs))
+        
+        return call
+    
+    async def connect(self):
+        """Nothing to do; the psycopg2 pool is opened by ComplianceMemoryAgent."""
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        return self._target.pool_stats()
+    
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._target.close)
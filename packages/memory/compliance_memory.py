@@ -4,10 +4,110 @@ Adapted memory architecture for document compliance and risk analysis
 """
 
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
-from typing import List, Dict, Optional, Any
-from datetime import datetime
+from psycopg2.extras import RealDictCursor, Json, execute_values
+from typing import List, Dict, Optional, Any, Tuple
+from datetime import datetime, timezone
+from contextlib import contextmanager
+import base64
 import json
+import uuid
+
+from .connection_pool import ComplianceConnectionPool
+from .pattern_cache import PatternCache, PatternChangeListener
+from .feedback_learning import FeedbackLearningPipeline, PERMANENT_BATCH_ERRORS
+from .write_behind import WriteBehindBuffer
+
+
+# Columns written for each finding, in INSERT order
+FINDING_INSERT_COLUMNS = (
+    "document_id", "framework", "finding_type", "severity", "title", "description",
+    "location", "evidence", "recommendation", "agent_name", "agent_reasoning", "pattern_key",
+    "section_hash"
+)
+
+
+# Columns a findings query may project
+FINDING_COLUMNS = (
+    "id", "document_id", "framework", "finding_type", "severity", "title", "description",
+    "location", "evidence", "recommendation", "agent_name", "agent_reasoning", "pattern_key",
+    "section_hash", "user_feedback", "user_action_taken", "created_at", "resolved_at"
+)
+
+# Columns written for each section fingerprint of the last analyzed revision
+SECTION_INSERT_COLUMNS = (
+    "document_id", "chunk_index", "content", "section_title", "content_hash",
+    "start_char", "end_char", "frameworks"
+)
+
+# Lightweight projection without the large TEXT columns
+FINDING_SUMMARY_FIELDS = (
+    "id", "framework", "finding_type", "severity", "title", "location",
+    "user_feedback", "created_at"
+)
+
+
+def resolve_finding_columns(fields: Optional[List[str]] = None, view: str = "full") -> List[str]:
+    """
+    Work out which columns a findings query selects.
+    id and created_at are always included because they form the page cursor.
+    
+    Raises:
+        ValueError: on an unknown view or field name
+    """
+    if fields:
+        unknown = [f for f in fields if f not in FINDING_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown finding fields: {', '.join(unknown)}")
+        columns = list(fields)
+    elif view == "summary":
+        columns = list(FINDING_SUMMARY_FIELDS)
+    elif view == "full":
+        columns = list(FINDING_COLUMNS)
+    else:
+        raise ValueError(f"Unknown findings view: {view}")
+    
+    for key in ("created_at", "id"):
+        if key not in columns:
+            columns.append(key)
+    
+    return columns
+
+
+def encode_findings_cursor(finding: Dict[str, Any]) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of a finding."""
+    created_at = finding["created_at"]
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, str(finding["id"])]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_findings_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Returns:
+        (created_at ISO string, finding id)
+    
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        created_at, finding_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return created_at, finding_id
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid findings cursor: {cursor}") from e
+
+
+@contextmanager
+def _use_connection(pool: ComplianceConnectionPool, conn=None):
+    """
+    Use the caller's connection (and transaction) if given,
+    otherwise check one out of the pool for a single-statement transaction.
+    """
+    if conn is not None:
+        yield conn
+    else:
+        with pool.connection() as pooled:
+            yield pooled
 
 
 class EpisodicComplianceMemory:
@@ -16,8 +116,9 @@ class EpisodicComplianceMemory:
     Each episode captures: document, finding, user feedback, resolution
     """
     
-    def __init__(self, db_connection_string: str):
+    def __init__(self, db_connection_string: str, pool: Optional[ComplianceConnectionPool] = None):
         self.conn_string = db_connection_string
+        self.pool = pool or ComplianceConnectionPool(db_connection_string)
     
     def store_finding(
         self,
@@ -39,60 +140,284 @@ class EpisodicComplianceMemory:
         Returns:
             finding_id: UUID of the stored finding
         """
-        conn = psycopg2.connect(self.conn_string)
-        cur = conn.cursor()
-        
-        try:
-            cur.execute("""
-                INSERT INTO compliance_findings 
-                (document_id, framework, finding_type, severity, title, description, 
-                 location, evidence, recommendation, agent_name, agent_reasoning)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (document_id, framework, finding_type, severity, title, description,
-                  location, evidence, recommendation, agent_name, agent_reasoning))
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
             
-            finding_id = cur.fetchone()[0]
-            conn.commit()
+            try:
+                cur.execute("""
+                    INSERT INTO compliance_findings 
+                    (document_id, framework, finding_type, severity, title, description, 
+                     location, evidence, recommendation, agent_name, agent_reasoning)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (document_id, framework, finding_type, severity, title, description,
+                      location, evidence, recommendation, agent_name, agent_reasoning))
+                
+                finding_id = cur.fetchone()[0]
+                
+                return str(finding_id)
             
-            return str(finding_id)
+            finally:
+                cur.close()
+    
+    def store_findings_batch(
+        self,
+        findings: List[Dict[str, Any]],
+        conn=None
+    ) -> List[str]:
+        """
+        Store many findings with a single multi-row INSERT.
+        
+        Args:
+            findings: Dicts keyed by FINDING_INSERT_COLUMNS (missing keys are NULL).
+                A client-generated "id" is used when present (others get a
+                fresh UUID here); rows whose id already exists are skipped,
+                so replays are idempotent.
+            conn: Optional connection whose transaction the insert joins
+        
+        Returns:
+            finding_ids: UUIDs of the findings, in input order. Ids are
+                assigned before the INSERT rather than read back from
+                RETURNING, so skipped (already stored) rows keep their place.
+        """
+        if not findings:
+            return []
         
-        finally:
-            cur.close()
-            conn.close()
+        finding_ids = [str(f.get("id") or uuid.uuid4()) for f in findings]
+        columns = ("id",) + FINDING_INSERT_COLUMNS
+        rows = [
+            (finding_id,) + tuple(f.get(col) for col in FINDING_INSERT_COLUMNS)
+            for finding_id, f in zip(finding_ids, findings)
+        ]
+        
+        with _use_connection(self.pool, conn) as conn:
+            cur = conn.cursor()
+            
+            try:
+                execute_values(cur, f"""
+                    INSERT INTO compliance_findings ({", ".join(columns)})
+                    VALUES %s
+                    ON CONFLICT (id) DO NOTHING
+                """, rows, page_size=len(rows))
+                return finding_ids
+            
+            finally:
+                cur.close()
     
     def get_document_findings(
         self,
         document_id: str,
         framework: Optional[str] = None,
-        severity: Optional[str] = None
+        severity: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        view: str = "full",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Retrieve findings for a specific document.
+        Retrieve findings for a specific document, newest first.
+        
+        Args:
+            fields: Columns to return (see FINDING_COLUMNS)
+            view: 'full' (all columns) or 'summary' (FINDING_SUMMARY_FIELDS);
+                ignored when fields is given
+            limit: Maximum number of findings (default: all)
+            cursor: Resume after the position encoded by encode_findings_cursor()
+        """
+        return self.get_document_findings_page(
+            document_id,
+            framework=framework,
+            severity=severity,
+            fields=fields,
+            view=view,
+            limit=limit,
+            cursor=cursor
+        )["findings"]
+    
+    def get_document_findings_page(
+        self,
+        document_id: str,
+        framework: Optional[str] = None,
+        severity: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        view: str = "full",
+        limit: Optional[int] = 100,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Keyset-paginated findings on (created_at, id).
+        
+        Returns:
+            {"findings": [...], "next_cursor": str or None}
         """
-        conn = psycopg2.connect(self.conn_string)
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        columns = resolve_finding_columns(fields, view)
         
-        try:
-            query = "SELECT * FROM compliance_findings WHERE document_id = %s"
-            params = [document_id]
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
             
-            if framework:
-                query += " AND framework = %s"
-                params.append(framework)
+            try:
+                query = f"SELECT {', '.join(columns)} FROM compliance_findings WHERE document_id = %s"
+                params = [document_id]
+                
+                if framework:
+                    query += " AND framework = %s"
+                    params.append(framework)
+                
+                if severity:
+                    query += " AND severity = %s"
+                    params.append(severity)
+                
+                if cursor:
+                    query += " AND (created_at, id) < (%s::timestamptz, %s::uuid)"
+                    params.extend(decode_findings_cursor(cursor))
+                
+                query += " ORDER BY created_at DESC, id DESC"
+                
+                if limit is not None:
+                    # Fetch one extra row to know whether another page exists
+                    query += " LIMIT %s"
+                    params.append(limit + 1)
+                
+                cur.execute(query, params)
+                findings = [dict(row) for row in cur.fetchall()]
             
-            if severity:
-                query += " AND severity = %s"
-                params.append(severity)
+            finally:
+                cur.close()
+        
+        next_cursor = None
+        if limit is not None and len(findings) > limit:
+            findings = findings[:limit]
+            next_cursor = encode_findings_cursor(findings[-1])
+        
+        return {"findings": findings, "next_cursor": next_cursor}
+    
+    def get_document_severity_counts(self, document_id: str) -> Dict[str, Any]:
+        """
+        Aggregate a document's findings by severity and framework in one query.
+        """
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
             
-            query += " ORDER BY created_at DESC"
+            try:
+                cur.execute("""
+                    SELECT
+                        COUNT(*) AS total_findings,
+                        COUNT(*) FILTER (WHERE severity = 'critical') AS critical,
+                        COUNT(*) FILTER (WHERE severity = 'high') AS high,
+                        COUNT(*) FILTER (WHERE severity = 'medium') AS medium,
+                        COUNT(*) FILTER (WHERE severity = 'low') AS low,
+                        COALESCE(ARRAY_AGG(DISTINCT framework), '{}') AS frameworks_analyzed
+                    FROM compliance_findings
+                    WHERE document_id = %s
+                """, (document_id,))
+                
+                return dict(cur.fetchone())
             
-            cur.execute(query, params)
-            return [dict(row) for row in cur.fetchall()]
+            finally:
+                cur.close()
+    
+    def delete_findings(self, finding_ids: List[str], conn=None) -> int:
+        """
+        Delete findings superseded by a re-analysis.
         
-        finally:
-            cur.close()
-            conn.close()
+        Returns:
+            Number of rows deleted
+        """
+        if not finding_ids:
+            return 0
+        
+        with _use_connection(self.pool, conn) as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute(
+                    "DELETE FROM compliance_findings WHERE id = ANY(%s::uuid[])",
+                    (list(finding_ids),)
+                )
+                return cur.rowcount
+            
+            finally:
+                cur.close()
+    
+    def get_document_sections(self, document_id: str) -> List[Dict[str, Any]]:
+        """Section fingerprints of the revision last analyzed, in document order."""
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            
+            try:
+                cur.execute("""
+                    SELECT chunk_index, section_title, content_hash, start_char, end_char, frameworks
+                    FROM document_chunks
+                    WHERE document_id = %s AND content_hash IS NOT NULL
+                    ORDER BY chunk_index
+                """, (document_id,))
+                
+                return [dict(row) for row in cur.fetchall()]
+            
+            finally:
+                cur.close()
+    
+    def get_document_text(self, document_id: str) -> Optional[str]:
+        """
+        Text of the revision last analyzed, reassembled from its sections
+        (they cover the text end to end). None if none were stored.
+        """
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute("""
+                    SELECT content FROM document_chunks
+                    WHERE document_id = %s AND content_hash IS NOT NULL
+                    ORDER BY chunk_index
+                """, (document_id,))
+                
+                rows = cur.fetchall()
+                return "".join(row[0] for row in rows) if rows else None
+            
+            finally:
+                cur.close()
+    
+    def replace_document_sections(
+        self,
+        document_id: str,
+        sections: List[Dict[str, Any]],
+        conn=None,
+        analyzed_at: Optional[str] = None
+    ):
+        """
+        Replace a document's section fingerprints with those of the revision
+        just analyzed.
+        
+        Args:
+            sections: Dicts keyed by SECTION_INSERT_COLUMNS (without document_id)
+            conn: Optional connection whose transaction the write joins
+            analyzed_at: When the analysis ran, if not now (write-behind replay)
+        """
+        columns = SECTION_INSERT_COLUMNS + (("analyzed_at",) if analyzed_at else ())
+        rows = [
+            tuple(document_id if col == "document_id" else section.get(col) for col in SECTION_INSERT_COLUMNS)
+            + ((analyzed_at,) if analyzed_at else ())
+            for section in sections
+        ]
+        
+        with _use_connection(self.pool, conn) as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute("""
+                    DELETE FROM document_chunks
+                    WHERE document_id = %s AND content_hash IS NOT NULL
+                """, (document_id,))
+                
+                if rows:
+                    execute_values(cur, f"""
+                        INSERT INTO document_chunks ({", ".join(columns)})
+                        VALUES %s
+                    """, rows, page_size=1000)
+            
+            finally:
+                cur.close()
     
     def record_user_feedback(
         self,
@@ -103,23 +428,20 @@ class EpisodicComplianceMemory:
         """
         Record user feedback on a finding (for learning).
         """
-        conn = psycopg2.connect(self.conn_string)
-        cur = conn.cursor()
-        
-        try:
-            cur.execute("""
-                UPDATE compliance_findings
-                SET user_feedback = %s,
-                    user_action_taken = %s,
-                    resolved_at = CASE WHEN %s IN ('accepted', 'rejected') THEN NOW() ELSE resolved_at END
-                WHERE id = %s
-            """, (feedback, action_taken, feedback, finding_id))
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
             
-            conn.commit()
-        
-        finally:
-            cur.close()
-            conn.close()
+            try:
+                cur.execute("""
+                    UPDATE compliance_findings
+                    SET user_feedback = %s,
+                        user_action_taken = %s,
+                        resolved_at = CASE WHEN %s IN ('accepted', 'rejected') THEN NOW() ELSE resolved_at END
+                    WHERE id = %s
+                """, (feedback, action_taken, feedback, finding_id))
+            
+            finally:
+                cur.close()
 
 
 class SemanticComplianceMemory:
@@ -128,8 +450,15 @@ class SemanticComplianceMemory:
     Learns which patterns are true positives vs false positives.
     """
     
-    def __init__(self, db_connection_string: str):
+    def __init__(
+        self,
+        db_connection_string: str,
+        pool: Optional[ComplianceConnectionPool] = None,
+        pattern_cache: Optional[PatternCache] = None
+    ):
         self.conn_string = db_connection_string
+        self.pool = pool or ComplianceConnectionPool(db_connection_string)
+        self.pattern_cache = pattern_cache
     
     def record_pattern_observation(
         self,
@@ -138,85 +467,106 @@ class SemanticComplianceMemory:
         document_type: str,
         risk_indicator: str,
         is_true_positive: bool,
-        severity: Optional[str] = None
+        severity: Optional[str] = None,
+        conn=None
     ):
         """
         Record an observation of a risk pattern.
         Updates precision score based on user feedback.
         """
-        conn = psycopg2.connect(self.conn_string)
-        cur = conn.cursor()
+        self.record_pattern_observations([{
+            "pattern_key": pattern_key,
+            "framework": framework,
+            "document_type": document_type,
+            "risk_indicator": risk_indicator,
+            "is_true_positive": is_true_positive,
+            "severity": severity
+        }], conn=conn)
+    
+    def record_pattern_observations(
+        self,
+        observations: List[Dict[str, Any]],
+        conn=None
+    ):
+        """
+        Apply many pattern observations in one atomic upsert.
         
-        try:
-            # Check if pattern exists
-            cur.execute("""
-                SELECT id, frequency_observed, true_positive_count, false_positive_count
-                FROM risk_patterns
-                WHERE pattern_key = %s
-            """, (pattern_key,))
-            
-            result = cur.fetchone()
-            
-            if result:
-                # Update existing pattern
-                pattern_id, freq, tp_count, fp_count = result
-                
-                freq += 1
-                if is_true_positive:
-                    tp_count += 1
-                else:
-                    fp_count += 1
-                
-                total = tp_count + fp_count
-                precision = tp_count / total if total > 0 else 0.0
-                confidence = min(1.0, freq / 100.0)  # Confidence increases with observations
-                
-                cur.execute("""
-                    UPDATE risk_patterns
-                    SET frequency_observed = %s,
-                        true_positive_count = %s,
-                        false_positive_count = %s,
-                        precision_score = %s,
-                        confidence_score = %s,
-                        observation_count = %s,
-                        last_updated_at = NOW()
-                    WHERE id = %s
-                """, (freq, tp_count, fp_count, precision, confidence, freq, pattern_id))
+        Observations are aggregated per pattern_key and merged with
+        INSERT ... ON CONFLICT DO UPDATE, so counters, precision and
+        confidence are computed server-side and concurrent writers never
+        lose increments.
+        
+        Args:
+            observations: Dicts with pattern_key, framework, document_type,
+                risk_indicator, is_true_positive and optional severity
+            conn: Optional connection whose transaction the upsert joins
+        """
+        if not observations:
+            return
+        
+        rows = [
+            (
+                o["pattern_key"],
+                o["framework"],
+                o.get("document_type") or "unknown",
+                o.get("risk_indicator") or "",
+                bool(o["is_true_positive"]),
+                o.get("severity")
+            )
+            for o in observations
+        ]
+        
+        with _use_connection(self.pool, conn) as conn:
+            cur = conn.cursor()
             
-            else:
-                # Create new pattern
-                tp_count = 1 if is_true_positive else 0
-                fp_count = 0 if is_true_positive else 1
-                freq = 1
-                precision = tp_count / (tp_count + fp_count) if (tp_count + fp_count) > 0 else 0.0
-                confidence = 0.01  # Low confidence with just 1 observation
-                
-                cur.execute("""
-                    INSERT INTO risk_patterns
+            try:
+                # Rows are grouped (one upsert per key per statement) and ordered
+                # by key so concurrent batches lock patterns in the same order.
+                # Confidence increases with observations.
+                execute_values(cur, """
+                    INSERT INTO risk_patterns AS rp
                     (pattern_key, pattern_description, framework, document_type, risk_indicator,
-                     frequency_observed, true_positive_count, false_positive_count, 
+                     frequency_observed, true_positive_count, false_positive_count,
                      precision_score, confidence_score, avg_severity, observation_count, learned_rule)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 1, %s)
-                """, (
-                    pattern_key,
-                    f"Pattern: {risk_indicator} in {document_type}",
-                    framework,
-                    document_type,
-                    risk_indicator,
-                    freq,
-                    tp_count,
-                    fp_count,
-                    precision,
-                    confidence,
-                    severity or 'medium',
-                    f"Early pattern for {risk_indicator}"
-                ))
+                    SELECT
+                        obs.pattern_key,
+                        'Pattern: ' || (ARRAY_AGG(obs.risk_indicator))[1] || ' in ' || (ARRAY_AGG(obs.document_type))[1],
+                        (ARRAY_AGG(obs.framework))[1],
+                        (ARRAY_AGG(obs.document_type))[1],
+                        (ARRAY_AGG(obs.risk_indicator))[1],
+                        COUNT(*),
+                        COUNT(*) FILTER (WHERE obs.is_true_positive),
+                        COUNT(*) FILTER (WHERE NOT obs.is_true_positive),
+                        COUNT(*) FILTER (WHERE obs.is_true_positive)::numeric / COUNT(*),
+                        LEAST(1.0, COUNT(*) / 100.0),
+                        COALESCE((ARRAY_AGG(obs.severity::varchar))[1], 'medium'),
+                        COUNT(*),
+                        'Early pattern for ' || (ARRAY_AGG(obs.risk_indicator))[1]
+                    FROM (VALUES %s) AS obs(pattern_key, framework, document_type, risk_indicator,
+                                            is_true_positive, severity)
+                    GROUP BY obs.pattern_key
+                    ORDER BY obs.pattern_key
+                    ON CONFLICT (pattern_key) DO UPDATE SET
+                        frequency_observed = rp.frequency_observed + EXCLUDED.frequency_observed,
+                        true_positive_count = rp.true_positive_count + EXCLUDED.true_positive_count,
+                        false_positive_count = rp.false_positive_count + EXCLUDED.false_positive_count,
+                        precision_score = COALESCE(
+                            (rp.true_positive_count + EXCLUDED.true_positive_count)::numeric
+                            / NULLIF(rp.true_positive_count + EXCLUDED.true_positive_count
+                                     + rp.false_positive_count + EXCLUDED.false_positive_count, 0),
+                            0.0
+                        ),
+                        confidence_score = LEAST(1.0, (rp.frequency_observed + EXCLUDED.frequency_observed) / 100.0),
+                        observation_count = rp.frequency_observed + EXCLUDED.frequency_observed,
+                        last_updated_at = NOW()
+                """, rows, page_size=len(rows))
             
-            conn.commit()
+            finally:
+                cur.close()
         
-        finally:
-            cur.close()
-            conn.close()
+        # Other workers are invalidated by the risk_patterns NOTIFY trigger
+        if self.pattern_cache:
+            self.pattern_cache.invalidate()
     
     def get_high_precision_patterns(
         self,
@@ -227,48 +577,62 @@ class SemanticComplianceMemory:
         """
         Get patterns with high precision and confidence.
         These are reliable indicators of real risks.
+        Served from the pattern cache when one is configured.
         """
-        conn = psycopg2.connect(self.conn_string)
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        if self.pattern_cache:
+            patterns = self.pattern_cache.get_or_load(
+                ("high_precision", framework, min_precision, min_confidence),
+                lambda: self._query_high_precision_patterns(framework, min_precision, min_confidence)
+            )
+            return [dict(p) for p in patterns]
         
-        try:
-            query = """
-                SELECT * FROM risk_patterns
-                WHERE precision_score >= %s
-                  AND confidence_score >= %s
-            """
-            params = [min_precision, min_confidence]
-            
-            if framework:
-                query += " AND framework = %s"
-                params.append(framework)
+        return self._query_high_precision_patterns(framework, min_precision, min_confidence)
+    
+    def _query_high_precision_patterns(
+        self,
+        framework: Optional[str],
+        min_precision: float,
+        min_confidence: float
+    ) -> List[Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
             
-            query += " ORDER BY precision_score DESC, confidence_score DESC"
+            try:
+                query = """
+                    SELECT * FROM risk_patterns
+                    WHERE precision_score >= %s
+                      AND confidence_score >= %s
+                """
+                params = [min_precision, min_confidence]
+                
+                if framework:
+                    query += " AND framework = %s"
+                    params.append(framework)
+                
+                query += " ORDER BY precision_score DESC, confidence_score DESC"
+                
+                cur.execute(query, params)
+                return [dict(row) for row in cur.fetchall()]
             
-            cur.execute(query, params)
-            return [dict(row) for row in cur.fetchall()]
-        
-        finally:
-            cur.close()
-            conn.close()
+            finally:
+                cur.close()
     
     def get_pattern(self, pattern_key: str) -> Optional[Dict[str, Any]]:
         """Get a specific pattern by key."""
-        conn = psycopg2.connect(self.conn_string)
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        try:
-            cur.execute("""
-                SELECT * FROM risk_patterns
-                WHERE pattern_key = %s
-            """, (pattern_key,))
+        with self.pool.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
             
-            result = cur.fetchone()
-            return dict(result) if result else None
-        
-        finally:
-            cur.close()
-            conn.close()
+            try:
+                cur.execute("""
+                    SELECT * FROM risk_patterns
+                    WHERE pattern_key = %s
+                """, (pattern_key,))
+                
+                result = cur.fetchone()
+                return dict(result) if result else None
+            
+            finally:
+                cur.close()
     
     def get_remediation_template(self, pattern_key: str) -> Optional[str]:
         """Get the standard remediation for a pattern."""
@@ -282,9 +646,85 @@ class ComplianceMemoryAgent:
     Combines episodic (findings) and semantic (patterns) memory.
     """
     
-    def __init__(self, db_connection_string: str):
-        self.episodic = EpisodicComplianceMemory(db_connection_string)
-        self.semantic = SemanticComplianceMemory(db_connection_string)
+    def __init__(
+        self,
+        db_connection_string: str,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_checkout_timeout: float = 30.0,
+        pattern_cache_ttl: float = 300.0,
+        listen_for_pattern_changes: bool = True,
+        feedback_batch_size: int = 500,
+        feedback_flush_interval: float = 2.0,
+        batch_feedback: bool = True,
+        write_behind: bool = False,
+        write_behind_spill_dir: str = "/app/spill",
+        write_behind_batch_size: int = 200,
+        write_behind_flush_interval: float = 1.0,
+        write_behind_max_queue: int = 10000
+    ):
+        """
+        Args:
+            db_connection_string: PostgreSQL DSN
+            pool_min_size: Connections kept open when idle
+            pool_max_size: Maximum concurrent database connections
+            pool_checkout_timeout: Seconds to wait for a free connection
+            pattern_cache_ttl: Seconds reliable-pattern lookups stay cached
+            listen_for_pattern_changes: Invalidate the cache on risk_patterns
+                NOTIFY events so several workers stay coherent
+            feedback_batch_size: Maximum feedback events applied per statement
+            feedback_flush_interval: Maximum seconds feedback waits in the queue
+            batch_feedback: Queue feedback for periodic batches (False applies
+                each event immediately)
+            write_behind: Return from remember_findings_batch before the
+                commit; findings are group-committed by a background flusher
+            write_behind_spill_dir: Where pending findings are spilled while
+                PostgreSQL is unavailable
+            write_behind_batch_size: Maximum analyses per group commit
+            write_behind_flush_interval: Maximum seconds findings wait to be committed
+            write_behind_max_queue: Analyses buffered in memory before spilling
+        """
+        # One pool shared by episodic and semantic memory
+        self.pool = ComplianceConnectionPool(
+            db_connection_string,
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            checkout_timeout=pool_checkout_timeout
+        )
+        self.episodic = EpisodicComplianceMemory(db_connection_string, pool=self.pool)
+        self.pattern_cache = PatternCache(ttl=pattern_cache_ttl)
+        self.semantic = SemanticComplianceMemory(
+            db_connection_string,
+            pool=self.pool,
+            pattern_cache=self.pattern_cache
+        )
+        
+        self.pattern_listener = None
+        if listen_for_pattern_changes:
+            self.pattern_listener = PatternChangeListener(db_connection_string, self.pattern_cache)
+            self.pattern_listener.start()
+        
+        self.feedback_pipeline = FeedbackLearningPipeline(
+            self.pool,
+            pattern_cache=self.pattern_cache,
+            batch_size=feedback_batch_size,
+            flush_interval=feedback_flush_interval
+        )
+        self.batch_feedback = batch_feedback
+        if batch_feedback:
+            self.feedback_pipeline.start()
+        
+        self.write_behind = None
+        if write_behind:
+            self.write_behind = WriteBehindBuffer(
+                self._write_findings_group,
+                spill_dir=write_behind_spill_dir,
+                batch_size=write_behind_batch_size,
+                flush_interval=write_behind_flush_interval,
+                max_queue=write_behind_max_queue,
+                permanent_errors=PERMANENT_BATCH_ERRORS + (ValueError, KeyError, TypeError)
+            )
+            self.write_behind.start()
     
     def remember_finding(
         self,
@@ -325,24 +765,202 @@ class ComplianceMemoryAgent:
         
         return finding_id
     
+    def remember_findings_batch(
+        self,
+        document_id: str,
+        findings: List[Dict[str, Any]],
+        document_type: str = "unknown",
+        agent_name: Optional[str] = None,
+        superseded_ids: Optional[List[str]] = None,
+        sections: Optional[List[Dict[str, Any]]] = None
+    ) -> List[str]:
+        """
+        Store all findings of one analysis in a single transaction.
+        Pattern observations for findings carrying a pattern_key are
+        recorded in the same commit.
+        
+        Args:
+            document_id: UUID of the analyzed document
+            findings: Finding dicts (framework, finding_type, severity, title,
+                description, location, evidence, recommendation, reasoning,
+                optional pattern_key and section_hash)
+            document_type: Document type used for pattern observations
+            agent_name: Agent that produced the findings
+            superseded_ids: Earlier findings this analysis replaces (deleted
+                in the same transaction)
+            sections: Section fingerprints of the analyzed text, replacing
+                the document's previous ones
+        
+        Returns:
+            finding_ids: UUIDs of the stored findings, in input order. In
+                write-behind mode the ids are assigned up front and the rows
+                are committed by the background flusher.
+        """
+        if not findings and not superseded_ids and sections is None:
+            return []
+        
+        rows = [
+            {
+                "document_id": document_id,
+                "framework": f["framework"],
+                "finding_type": f["finding_type"],
+                "severity": f["severity"],
+                "title": f["title"],
+                "description": f["description"],
+                "location": f.get("location"),
+                "evidence": f.get("evidence"),
+                "recommendation": f.get("recommendation"),
+                "agent_name": f.get("agent_name", agent_name),
+                "agent_reasoning": f.get("agent_reasoning", f.get("reasoning")),
+                "pattern_key": f.get("pattern_key"),
+                "section_hash": f.get("section_hash")
+            }
+            for f in findings
+        ]
+        
+        observations = [
+            {
+                "pattern_key": f["pattern_key"],
+                "framework": f["framework"],
+                "document_type": document_type,
+                "risk_indicator": f.get("evidence") or "",
+                "is_true_positive": True,  # Assume true until user feedback says otherwise
+                "severity": f["severity"]
+            }
+            for f in findings
+            if f.get("pattern_key")
+        ]
+        
+        if self.write_behind:
+            # Ids are generated here so callers get them before the commit
+            for row in rows:
+                row["id"] = str(uuid.uuid4())
+            self.write_behind.submit({
+                "document_id": document_id,
+                "findings": rows,
+                "observations": observations,
+                "superseded_ids": list(superseded_ids or []),
+                "sections": sections,
+                "analyzed_at": datetime.now(timezone.utc).isoformat()
+            })
+            return [row["id"] for row in rows]
+        
+        with self.pool.connection() as conn:
+            self.episodic.delete_findings(superseded_ids or [], conn=conn)
+            finding_ids = self.episodic.store_findings_batch(rows, conn=conn)
+            self.semantic.record_pattern_observations(observations, conn=conn)
+            if sections is not None:
+                self.episodic.replace_document_sections(document_id, sections, conn=conn)
+        
+        return finding_ids
+    
+    def _write_findings_group(self, items: List[Dict[str, Any]]):
+        """
+        Group commit for the write-behind buffer: findings and pattern
+        observations of many analyses in one transaction.
+        
+        Items already committed (a spill replay after a crash) are skipped,
+        so pattern observations are not counted twice. Items older than the
+        document's stored sections (replayed after a newer analysis was
+        committed) only record their observations; their findings and
+        sections were superseded by that analysis.
+        """
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            
+            try:
+                item_ids = [item["item_id"] for item in items if item.get("item_id")]
+                applied = set()
+                if item_ids:
+                    cur.execute("""
+                        INSERT INTO write_behind_applied (item_id)
+                        SELECT unnest(%s::uuid[])
+                        ON CONFLICT (item_id) DO NOTHING
+                        RETURNING item_id
+                    """, (item_ids,))
+                    new_ids = {str(row[0]) for row in cur.fetchall()}
+                    applied = set(item_ids) - new_ids
+                    
+                    cur.execute(
+                        "DELETE FROM write_behind_applied WHERE applied_at < NOW() - INTERVAL '30 days'"
+                    )
+                
+                items = [item for item in items if item.get("item_id") not in applied]
+                
+                document_ids = list({item["document_id"] for item in items if item.get("analyzed_at")})
+                latest = {}
+                if document_ids:
+                    cur.execute("""
+                        SELECT document_id, MAX(analyzed_at)
+                        FROM document_chunks
+                        WHERE document_id = ANY(%s::uuid[]) AND content_hash IS NOT NULL
+                        GROUP BY document_id
+                    """, (document_ids,))
+                    latest = {str(row[0]): row[1] for row in cur.fetchall() if row[1] is not None}
+            
+            finally:
+                cur.close()
+            
+            current = [
+                item for item in items
+                if not (
+                    item.get("analyzed_at") and item["document_id"] in latest
+                    and datetime.fromisoformat(item["analyzed_at"]) < latest[item["document_id"]]
+                )
+            ]
+            
+            self.episodic.delete_findings(
+                [finding_id for item in current for finding_id in item.get("superseded_ids") or []],
+                conn=conn
+            )
+            self.episodic.store_findings_batch(
+                [row for item in current for row in item["findings"]],
+                conn=conn
+            )
+            self.semantic.record_pattern_observations(
+                [obs for item in items for obs in item["observations"]],
+                conn=conn
+            )
+            # In submission order, so the latest analysis of a document wins
+            for item in current:
+                if item.get("sections") is not None:
+                    self.episodic.replace_document_sections(
+                        item["document_id"], item["sections"], conn=conn,
+                        analyzed_at=item.get("analyzed_at")
+                    )
+    
     def learn_from_feedback(
         self,
         finding_id: str,
         feedback: str,
-        pattern_key: Optional[str] = None
+        pattern_key: Optional[str] = None,
+        action_taken: Optional[str] = None
     ):
         """
         Learn from user feedback on a finding.
         Updates both episodic and semantic memory.
-        """
-        # Update episodic memory
-        self.episodic.record_user_feedback(finding_id, feedback)
         
-        # Update semantic memory (pattern learning)
-        if pattern_key:
-            is_true_positive = feedback in ['accepted', 'true_positive']
-            # Would need to fetch finding details to update pattern
-            # Simplified for MVP
+        With batch_feedback enabled the event is queued and applied with the
+        next batch; the finding's stored pattern_key (or the one given here)
+        decides which risk pattern's true/false positive counts move.
+        
+        Raises:
+            ValueError: if finding_id is not a UUID
+            queue.Full: if the feedback queue is saturated
+        """
+        if self.batch_feedback:
+            self.feedback_pipeline.submit(finding_id, feedback, action_taken, pattern_key)
+        else:
+            self.feedback_pipeline.apply_batch([{
+                "finding_id": str(finding_id),
+                "feedback": feedback,
+                "action_taken": action_taken,
+                "pattern_key": pattern_key
+            }])
+    
+    def flush_feedback(self):
+        """Apply all queued feedback now."""
+        self.feedback_pipeline.flush()
     
     def get_reliable_patterns(
         self,
@@ -355,21 +973,49 @@ class ComplianceMemoryAgent:
             min_confidence=0.5
         )
     
-    def get_document_risk_profile(self, document_id: str) -> Dict[str, Any]:
+    def get_document_risk_profile(
+        self,
+        document_id: str,
+        include_findings: bool = True,
+        findings_view: str = "full",
+        findings_limit: Optional[int] = None,
+        findings_cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Get a complete risk profile for a document.
+        Get a risk profile for a document.
+        Counts are aggregated in SQL. By default all findings are included,
+        as before; dashboards that only need the counts pass
+        include_findings=False, or page through them with findings_limit.
+        
+        Args:
+            include_findings: Also return the findings (False: counts only)
+            findings_view: 'summary' or 'full' projection for the findings
+            findings_limit: Page size for the findings (None: all)
+            findings_cursor: next_cursor from a previous profile call
         """
-        findings = self.episodic.get_document_findings(document_id)
+        profile = self.episodic.get_document_severity_counts(document_id)
         
-        # Aggregate by severity
-        profile = {
-            "total_findings": len(findings),
-            "critical": len([f for f in findings if f['severity'] == 'critical']),
-            "high": len([f for f in findings if f['severity'] == 'high']),
-            "medium": len([f for f in findings if f['severity'] == 'medium']),
-            "low": len([f for f in findings if f['severity'] == 'low']),
-            "frameworks_analyzed": list(set(f['framework'] for f in findings)),
-            "findings": findings
-        }
+        if include_findings:
+            page = self.episodic.get_document_findings_page(
+                document_id,
+                view=findings_view,
+                limit=findings_limit,
+                cursor=findings_cursor
+            )
+            profile["findings"] = page["findings"]
+            profile["next_cursor"] = page["next_cursor"]
         
         return profile
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool occupancy and wait-time stats."""
+        return self.pool.stats()
+    
+    def close(self):
+        """Flush pending writes, stop background threads and release all pooled connections."""
+        if self.write_behind:
+            self.write_behind.close()
+        self.feedback_pipeline.close()
+        if self.pattern_listener:
+            self.pattern_listener.stop()
+        self.pool.close()
@@ -0,0 +1,227 @@
+"""
+Connection Pool: Shared PostgreSQL connections for SIAI memory
+Bounded, thread-safe pool with health checks on checkout and wait-time stats
+"""
+
+import psycopg2
+import psycopg2.extensions
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class ComplianceConnectionPool:
+    """
+    Bounded pool of psycopg2 connections shared by the memory classes.
+    
+    Connections are opened lazily up to max_size; min_size connections are
+    opened up front and kept warm. Callers block (up to checkout_timeout)
+    when every connection is in use.
+    """
+    
+    def __init__(
+        self,
+        db_connection_string: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        checkout_timeout: float = 30.0,
+        health_check_after: float = 30.0
+    ):
+        """
+        Args:
+            db_connection_string: PostgreSQL DSN
+            min_size: Connections opened at startup and kept idle
+            max_size: Hard upper bound on open connections
+            checkout_timeout: Seconds to wait for a free connection
+            health_check_after: Idle seconds after which a connection is
+                pinged with SELECT 1 before being handed out
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+        
+        self.conn_string = db_connection_string
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_after = health_check_after
+        
+        self._lock = threading.Condition()
+        self._idle: List[Any] = []  # (connection, last_used) tuples, most recent last
+        self._size = 0
+        self._closed = False
+        
+        # Stats
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._health_check_failures = 0
+        
+        for _ in range(min_size):
+            self._idle.append((self._open(), time.monotonic()))
+            self._size += 1
+    
+    def _open(self):
+        return psycopg2.connect(self.conn_string)
+    
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        """Check a connection before handing it out."""
+        if conn.closed:
+            return False
+        
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        
+        if time.monotonic() - last_used < self.health_check_after:
+            return True
+        
+        try:
+            cur = conn.cursor()
+            try:
+                cur.execute("SELECT 1")
+            finally:
+                cur.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+    
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+    
+    def getconn(self):
+        """
+        Check out a healthy connection, blocking while the pool is exhausted.
+        
+        Raises:
+            PoolTimeoutError: if no connection frees up within checkout_timeout
+        """
+        start = time.monotonic()
+        deadline = start + self.checkout_timeout
+        waited = False
+        
+        while True:
+            with self._lock:
+                while True:
+                    if self._closed:
+                        raise psycopg2.InterfaceError("connection pool is closed")
+                    
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    
+                    if self._size < self.max_size:
+                        self._size += 1
+                        conn, last_used = None, None
+                        break
+                    
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self.checkout_timeout}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    
+                    waited = True
+                    self._lock.wait(remaining)
+            
+            # Open or validate outside the lock so other callers are not blocked
+            if conn is None:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+            elif not self._is_healthy(conn, last_used):
+                self._discard(conn)
+                with self._lock:
+                    self._size -= 1
+                    self._health_check_failures += 1
+                continue
+            
+            wait = time.monotonic() - start
+            with self._lock:
+                self._checkouts += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+                if waited:
+                    self._waits += 1
+            
+            return conn
+    
+    def putconn(self, conn, discard: bool = False):
+        """Return a connection to the pool (or drop it if it is broken)."""
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        
+        with self._lock:
+            if discard or conn.closed or self._closed:
+                self._discard(conn)
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+    
+    @contextmanager
+    def connection(self):
+        """
+        Context manager for a pooled connection.
+        Commits on success, rolls back on error, then returns it to the pool.
+        """
+        conn = self.getconn()
+        discard = False
+        
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard or conn.closed)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and checkout wait-time statistics."""
+        with self._lock:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(1000 * self._total_wait / self._checkouts, 3) if self._checkouts else 0.0,
+                "max_wait_ms": round(1000 * self._max_wait, 3),
+                "health_check_failures": self._health_check_failures
+            }
+    
+    def close(self):
+        """Close all idle connections and refuse new checkouts."""
+        with self._lock:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._size -= len(self._idle)
+            self._idle = []
+            self._lock.notify_all()
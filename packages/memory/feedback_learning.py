@@ -0,0 +1,291 @@
+"""
+Feedback Learning: Batched application of reviewer feedback to semantic memory
+Queues feedback events and applies each batch to findings and risk_patterns in one statement
+"""
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import List, Dict, Optional, Any
+
+import psycopg2
+
+from .connection_pool import ComplianceConnectionPool
+from .pattern_cache import PatternCache
+
+
+logger = logging.getLogger(__name__)
+
+# Feedback values that confirm or refute a flagged pattern
+TRUE_POSITIVE_FEEDBACK = ("accepted", "true_positive")
+FALSE_POSITIVE_FEEDBACK = ("rejected", "false_positive")
+FEEDBACK_VALUES = TRUE_POSITIVE_FEEDBACK + FALSE_POSITIVE_FEEDBACK
+
+# Errors caused by the data in a batch: retrying the same batch cannot succeed
+PERMANENT_BATCH_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError)
+
+
+def feedback_batch_sql(finding_ids: str, feedbacks: str, actions: str, pattern_keys: str) -> str:
+    """
+    Build the single statement that applies a batch of feedback.
+    
+    Arguments are the driver's placeholders for four parallel arrays
+    (%s for psycopg2, $1..$4 for asyncpg).
+    
+    Findings stored with a pattern_key were counted as a provisional true
+    positive when detected, so "no feedback yet" counts as a true positive
+    for them. Counts move by the difference between the old and new
+    classification, so repeated or changed decisions never double count.
+    """
+    tp = ", ".join(f"'{v}'" for v in TRUE_POSITIVE_FEEDBACK)
+    fp = ", ".join(f"'{v}'" for v in FALSE_POSITIVE_FEEDBACK)
+    
+    return f"""
+        WITH fb AS (
+            SELECT * FROM unnest({finding_ids}::uuid[], {feedbacks}::varchar[], {actions}::text[], {pattern_keys}::varchar[])
+                AS fb(finding_id, feedback, action_taken, pattern_key)
+        ),
+        prev AS (
+            SELECT
+                COALESCE(cf.pattern_key, fb.pattern_key) AS pattern_key,
+                CASE WHEN cf.user_feedback IN ({tp}) THEN 'tp'
+                     WHEN cf.user_feedback IN ({fp}) THEN 'fp'
+                     WHEN cf.pattern_key IS NOT NULL THEN 'tp'
+                END AS old_class,
+                CASE WHEN fb.feedback IN ({tp}) THEN 'tp'
+                     WHEN fb.feedback IN ({fp}) THEN 'fp'
+                     WHEN cf.pattern_key IS NOT NULL THEN 'tp'
+                END AS new_class
+            FROM compliance_findings cf
+            JOIN fb ON cf.id = fb.finding_id
+        ),
+        updated AS (
+            UPDATE compliance_findings cf
+            SET user_feedback = fb.feedback,
+                user_action_taken = fb.action_taken,
+                resolved_at = CASE WHEN fb.feedback IN ('accepted', 'rejected') THEN NOW() ELSE cf.resolved_at END,
+                pattern_key = COALESCE(cf.pattern_key, fb.pattern_key)
+            FROM fb
+            WHERE cf.id = fb.finding_id
+            RETURNING cf.id
+        ),
+        deltas AS (
+            SELECT
+                pattern_key,
+                SUM((new_class IS NOT DISTINCT FROM 'tp')::int - (old_class IS NOT DISTINCT FROM 'tp')::int) AS tp_delta,
+                SUM((new_class IS NOT DISTINCT FROM 'fp')::int - (old_class IS NOT DISTINCT FROM 'fp')::int) AS fp_delta
+            FROM prev
+            WHERE pattern_key IS NOT NULL
+            GROUP BY pattern_key
+        )
+        UPDATE risk_patterns rp
+        SET true_positive_count = GREATEST(0, rp.true_positive_count + d.tp_delta),
+            false_positive_count = GREATEST(0, rp.false_positive_count + d.fp_delta),
+            precision_score = COALESCE(
+                GREATEST(0, rp.true_positive_count + d.tp_delta)::numeric
+                / NULLIF(GREATEST(0, rp.true_positive_count + d.tp_delta)
+                         + GREATEST(0, rp.false_positive_count + d.fp_delta), 0),
+                0.0
+            ),
+            last_updated_at = NOW()
+        FROM deltas d
+        WHERE rp.pattern_key = d.pattern_key
+          AND (d.tp_delta <> 0 OR d.fp_delta <> 0)
+    """
+
+
+def feedback_batch_params(events: List[Dict[str, Any]]) -> List[List[Optional[str]]]:
+    """
+    Collapse events to the latest decision per finding and split them into
+    the four parallel arrays feedback_batch_sql() expects.
+    """
+    latest: Dict[str, Dict[str, Any]] = {}
+    for event in events:
+        latest[event["finding_id"]] = event
+    
+    return [
+        [e["finding_id"] for e in latest.values()],
+        [e["feedback"] for e in latest.values()],
+        [e.get("action_taken") for e in latest.values()],
+        [e.get("pattern_key") for e in latest.values()]
+    ]
+
+
+class FeedbackLearningPipeline:
+    """
+    Bounded queue of reviewer feedback, drained by a background thread.
+    
+    Events are applied in batches of up to batch_size, or whatever has
+    arrived after flush_interval seconds, each batch as a single statement.
+    A click costs a queue put instead of a database write.
+    """
+    
+    def __init__(
+        self,
+        pool: ComplianceConnectionPool,
+        pattern_cache: Optional[PatternCache] = None,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_queue: int = 100000,
+        max_retries: int = 3
+    ):
+        """
+        Args:
+            pool: Shared connection pool
+            pattern_cache: Invalidated after each applied batch
+            batch_size: Maximum events per statement
+            flush_interval: Maximum seconds an event waits before being applied
+            max_queue: Events buffered before submit() raises queue.Full
+            max_retries: Attempts per batch on transient errors before it is
+                dropped (and logged). A batch rejected for its data is split
+                in halves until the offending events are isolated and dropped.
+        """
+        self.pool = pool
+        self.pattern_cache = pattern_cache
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()  # submit() runs on request threads
+        self._thread = threading.Thread(target=self._run, name="feedback-learning", daemon=True)
+        
+        # Stats
+        self._submitted = 0
+        self._applied = 0
+        self._batches = 0
+        self._dropped = 0
+        self._last_batch_ms = 0.0
+    
+    def start(self):
+        self._thread.start()
+    
+    def submit(
+        self,
+        finding_id: str,
+        feedback: str,
+        action_taken: Optional[str] = None,
+        pattern_key: Optional[str] = None
+    ):
+        """
+        Queue a feedback event without waiting for the database.
+        
+        Raises:
+            ValueError: if finding_id is not a UUID
+            queue.Full: if the pipeline is saturated
+        """
+        uuid.UUID(str(finding_id))
+        
+        self._queue.put_nowait({
+            "finding_id": str(finding_id),
+            "feedback": feedback,
+            "action_taken": action_taken,
+            "pattern_key": pattern_key
+        })
+        with self._stats_lock:
+            self._submitted += 1
+    
+    def apply_batch(self, events: List[Dict[str, Any]]):
+        """Apply feedback events to findings and risk patterns in one statement."""
+        if not events:
+            return
+        
+        start = time.monotonic()
+        
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            
+            try:
+                cur.execute(feedback_batch_sql("%s", "%s", "%s", "%s"), feedback_batch_params(events))
+            
+            finally:
+                cur.close()
+        
+        if self.pattern_cache:
+            self.pattern_cache.invalidate()
+        
+        self._batches += 1
+        self._applied += len(events)
+        self._last_batch_ms = round(1000 * (time.monotonic() - start), 3)
+    
+    def _drain(self, block: bool) -> List[Dict[str, Any]]:
+        """Collect up to batch_size events, waiting at most flush_interval for the first."""
+        events = []
+        deadline = time.monotonic() + self.flush_interval
+        
+        while len(events) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    events.append(self._queue.get(timeout=timeout))
+                else:
+                    events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        return events
+    
+    def _apply_with_retry(self, events: List[Dict[str, Any]]):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.apply_batch(events)
+                return
+            except PERMANENT_BATCH_ERRORS as e:
+                rejected = e
+                break
+            except Exception:
+                logger.exception("Feedback batch of %d events failed (attempt %d/%d)",
+                                 len(events), attempt, self.max_retries)
+                if attempt < self.max_retries:
+                    self._stop_event.wait(min(2 ** attempt, 30))
+        else:
+            self._dropped += len(events)
+            return
+        
+        if len(events) == 1:
+            logger.error("Dropping feedback event rejected by the database (%s): %s", rejected, events[0])
+            self._dropped += 1
+            return
+        
+        # Bisect so one bad event does not cost the whole batch; halves are
+        # applied in order, so the latest event per finding still wins
+        middle = len(events) // 2
+        self._apply_with_retry(events[:middle])
+        self._apply_with_retry(events[middle:])
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            events = self._drain(block=True)
+            if events:
+                with self._flush_lock:
+                    self._apply_with_retry(events)
+    
+    def flush(self):
+        """Apply everything queued so far on the calling thread."""
+        with self._flush_lock:
+            while True:
+                events = self._drain(block=False)
+                if not events:
+                    break
+                self._apply_with_retry(events)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "submitted": self._submitted,
+            "applied": self._applied,
+            "batches": self._batches,
+            "dropped": self._dropped,
+            "last_batch_ms": self._last_batch_ms
+        }
+    
+    def close(self):
+        """Stop the background thread and apply whatever is still queued."""
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
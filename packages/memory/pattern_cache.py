@@ -0,0 +1,152 @@
+"""
+Pattern Cache: In-process read-through cache for semantic memory lookups
+Entries expire after a TTL and are invalidated by Postgres LISTEN/NOTIFY
+"""
+
+import psycopg2
+import psycopg2.extensions
+import select
+import threading
+import time
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+
+
+# Channel the risk_patterns trigger notifies on (see packages/database/schema.sql)
+PATTERN_CHANGE_CHANNEL = "risk_patterns_changed"
+
+
+class PatternCache:
+    """
+    Thread-safe TTL cache for risk pattern queries.
+    
+    Every invalidation bumps a generation counter; a load that started
+    before an invalidation is returned to its caller but never cached,
+    so a stale read cannot overwrite fresher state.
+    """
+    
+    def __init__(self, ttl: float = 300.0):
+        """
+        Args:
+            ttl: Seconds an entry stays valid without an invalidation
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Any] = {}  # key -> (expires_at, value)
+        self.generation = 0
+        
+        # Stats
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+    
+    def lookup(self, key: Hashable) -> Tuple[bool, Any, int]:
+        """
+        Returns:
+            (hit, value, generation); pass generation back to store() after a miss
+        """
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._hits += 1
+                return True, entry[1], self.generation
+            self._misses += 1
+            return False, None, self.generation
+    
+    def store(self, key: Hashable, value: Any, generation: int):
+        """Cache a loaded value unless an invalidation happened since lookup()."""
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+    
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader() on a miss."""
+        hit, value, generation = self.lookup(key)
+        if hit:
+            return value
+        
+        value = loader()
+        self.store(key, value, generation)
+        return value
+    
+    def invalidate(self):
+        """Drop every entry (patterns changed somewhere)."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self._invalidations += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "generation": self.generation
+            }
+
+
+class PatternChangeListener(threading.Thread):
+    """
+    Background thread that LISTENs for risk_patterns changes and invalidates
+    the cache, keeping several workers coherent without polling.
+    
+    Uses a dedicated connection (LISTEN needs a session of its own, so it
+    cannot come from the shared pool). If the connection drops, the cache is
+    invalidated, since notifications may have been missed, and the listener
+    reconnects.
+    """
+    
+    def __init__(
+        self,
+        db_connection_string: str,
+        cache: PatternCache,
+        channel: str = PATTERN_CHANGE_CHANNEL,
+        reconnect_delay: float = 5.0
+    ):
+        super().__init__(name="pattern-change-listener", daemon=True)
+        self.conn_string = db_connection_string
+        self.cache = cache
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._stop_event = threading.Event()
+        self._conn: Optional[Any] = None
+    
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._conn = psycopg2.connect(self.conn_string)
+                self._conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cur = self._conn.cursor()
+                cur.execute(f"LISTEN {self.channel}")
+                cur.close()
+                
+                # Anything may have changed while we were not listening
+                self.cache.invalidate()
+                
+                while not self._stop_event.is_set():
+                    if select.select([self._conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    
+                    self._conn.poll()
+                    if self._conn.notifies:
+                        del self._conn.notifies[:]
+                        self.cache.invalidate()
+            
+            except psycopg2.Error:
+                self.cache.invalidate()
+                self._stop_event.wait(self.reconnect_delay)
+            
+            finally:
+                if self._conn is not None:
+                    try:
+                        self._conn.close()
+                    except psycopg2.Error:
+                        pass
+                    self._conn = None
+    
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,269 @@
+"""
+Write-Behind Buffer: Asynchronous group commit for episodic memory
+Findings are queued in-process, group-committed by size or time,
+and spilled to disk while PostgreSQL is unavailable
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import List, Dict, Any, Callable, Optional, Tuple, Type
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Bounded in-process queue of pending writes with a background flusher.
+    
+    Each item is one unit of work (e.g. all findings of an analysis).
+    The flusher hands up to batch_size items to flush_fn in one call, so
+    they share one transaction. If flush_fn fails, the items are appended
+    to a spill file (fsynced) and replayed once the database recovers. A
+    batch rejected with a permanent error is bisected, so only the items
+    causing it are set aside in spill_dir/quarantine.
+    
+    Every item gets an "item_id" on submit. A replay can hand flush_fn items
+    it already committed (e.g. a crash between a commit and the spill file
+    rewrite), so flush_fn must skip item ids it has seen.
+    """
+    
+    def __init__(
+        self,
+        flush_fn: Callable[[List[Dict[str, Any]]], None],
+        spill_dir: str,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        put_timeout: float = 1.0,
+        replay_interval: float = 10.0,
+        permanent_errors: Tuple[Type[BaseException], ...] = (ValueError, KeyError, TypeError)
+    ):
+        """
+        Args:
+            flush_fn: Writes a list of items in one transaction; raises on failure
+            spill_dir: Directory for durable spill files
+            batch_size: Maximum items per group commit
+            flush_interval: Maximum seconds an item waits before being flushed
+            max_queue: Items buffered in memory before submit() spills directly
+            put_timeout: Seconds submit() waits for queue space before spilling
+            replay_interval: Seconds between attempts to replay spill files
+            permanent_errors: flush_fn errors caused by the items themselves;
+                the offending items are quarantined instead of retried
+        """
+        self.flush_fn = flush_fn
+        self.spill_dir = spill_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.replay_interval = replay_interval
+        self.permanent_errors = permanent_errors
+        self.quarantine_dir = os.path.join(spill_dir, "quarantine")
+        
+        os.makedirs(spill_dir, exist_ok=True)
+        
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="episodic-write-behind", daemon=True)
+        self._next_replay = 0.0
+        
+        # Stats
+        self._submitted = 0
+        self._flushed = 0
+        self._commits = 0
+        self._spilled = 0
+        self._replayed = 0
+        self._quarantined = 0
+        self._last_commit_ms = 0.0
+    
+    def start(self):
+        self._thread.start()
+    
+    def submit(self, item: Dict[str, Any]):
+        """
+        Queue an item for the next group commit.
+        Never blocks longer than put_timeout: if the queue stays full the
+        item goes straight to the spill file.
+        """
+        item.setdefault("item_id", str(uuid.uuid4()))
+        self._submitted += 1
+        try:
+            self._queue.put(item, timeout=self.put_timeout)
+        except queue.Full:
+            logger.warning("Write-behind queue full, spilling item to disk")
+            self._spill([item])
+    
+    def _drain(self, block: bool) -> List[Dict[str, Any]]:
+        items = []
+        deadline = time.monotonic() + self.flush_interval
+        
+        while len(items) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    items.append(self._queue.get(timeout=timeout))
+                else:
+                    items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        return items
+    
+    def _commit(self, items: List[Dict[str, Any]]) -> bool:
+        start = time.monotonic()
+        try:
+            rejected = self._flush_isolating(items)
+        except Exception:
+            logger.exception("Write-behind flush of %d items failed; spilling to disk", len(items))
+            self._spill(items)
+            self._next_replay = time.monotonic() + self.replay_interval
+            return False
+        
+        self._quarantine_items(rejected)
+        self._commits += 1
+        self._flushed += len(items) - len(rejected)
+        self._last_commit_ms = round(1000 * (time.monotonic() - start), 3)
+        return True
+    
+    def _flush_isolating(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        flush_fn(items), bisecting on permanent errors so one bad item does
+        not cost the others. Halves are flushed in order, so the latest
+        analysis of a document still wins. Transient errors propagate.
+        
+        Returns:
+            Items rejected with a permanent error
+        """
+        try:
+            self.flush_fn(items)
+            return []
+        except self.permanent_errors as e:
+            if len(items) == 1:
+                logger.error("Write-behind item rejected by the database (%s): %.200s", e, items[0])
+                return list(items)
+        
+        middle = len(items) // 2
+        return self._flush_isolating(items[:middle]) + self._flush_isolating(items[middle:])
+    
+    def _spill(self, items: List[Dict[str, Any]]):
+        """Durably append items to a new spill file."""
+        name = f"spill-{time.time_ns()}-{uuid.uuid4().hex}.jsonl"
+        self._write_spill_file(os.path.join(self.spill_dir, name), items)
+        self._spilled += len(items)
+    
+    def _write_spill_file(self, path: str, items: List[Dict[str, Any]]):
+        """Write (or rewrite) a spill file atomically: temp file, fsync, rename."""
+        tmp_path = path + ".tmp"
+        
+        with self._spill_lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+    
+    def _spill_files(self) -> List[str]:
+        return sorted(
+            os.path.join(self.spill_dir, name)
+            for name in os.listdir(self.spill_dir)
+            if name.startswith("spill-") and name.endswith(".jsonl")
+        )
+    
+    def _quarantine_items(self, items: List[Dict[str, Any]]):
+        """Set rejected items aside for inspection; they are never replayed."""
+        if not items:
+            return
+        os.makedirs(self.quarantine_dir, exist_ok=True)
+        name = f"rejected-{time.time_ns()}-{uuid.uuid4().hex}.jsonl"
+        self._write_spill_file(os.path.join(self.quarantine_dir, name), items)
+        self._quarantined += len(items)
+    
+    def replay_spilled(self) -> bool:
+        """
+        Write spilled items back in file order, batch_size items at a time.
+        
+        After each committed slice the file is rewritten with what is left,
+        so a later failure does not replay committed slices. Items rejected
+        with a permanent error are quarantined and the rest committed; a
+        transient error stops the replay until the next interval.
+        
+        Returns:
+            True if no spill files remain
+        """
+        for path in self._spill_files():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    items = [json.loads(line) for line in f if line.strip()]
+            except ValueError:
+                logger.exception("Spill file %s is unreadable; quarantining it", path)
+                os.makedirs(self.quarantine_dir, exist_ok=True)
+                os.replace(path, os.path.join(self.quarantine_dir, os.path.basename(path)))
+                continue
+            
+            while items:
+                batch = items[:self.batch_size]
+                try:
+                    rejected = self._flush_isolating(batch)
+                except Exception:
+                    logger.warning("Replay of %s failed; will retry in %ss", path, self.replay_interval)
+                    self._next_replay = time.monotonic() + self.replay_interval
+                    return False
+                
+                self._quarantine_items(rejected)
+                items = items[len(batch):]
+                self._replayed += len(batch) - len(rejected)
+                if items:
+                    self._write_spill_file(path, items)
+                else:
+                    os.remove(path)
+        
+        return True
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            items = self._drain(block=True)
+            
+            with self._flush_lock:
+                if items:
+                    self._commit(items)
+                
+                if time.monotonic() >= self._next_replay:
+                    self._next_replay = time.monotonic() + self.replay_interval
+                    self.replay_spilled()
+    
+    def flush(self):
+        """Commit everything queued so far on the calling thread."""
+        with self._flush_lock:
+            while True:
+                items = self._drain(block=False)
+                if not items:
+                    break
+                self._commit(items)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "submitted": self._submitted,
+            "flushed": self._flushed,
+            "commits": self._commits,
+            "spilled": self._spilled,
+            "replayed": self._replayed,
+            "quarantined": self._quarantined,
+            "spill_files": len(self._spill_files()),
+            "last_commit_ms": self._last_commit_ms
+        }
+    
+    def close(self):
+        """Flush-on-shutdown: stop the flusher and commit (or spill) everything queued."""
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
@@ -0,0 +1,157 @@
+"""
+Smoke tests for the asyncpg memory backend, against an in-memory stand-in
+for the asyncpg module (no database needed)
+"""
+
+import asyncio
+import os
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages"))
+
+import memory.async_compliance_memory as async_memory  # noqa: E402
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.listeners = []
+        self.closed = False
+
+    async def execute(self, query, *args):
+        self.statements.append((" ".join(query.split()), args))
+        return "DELETE 0" if query.strip().startswith("DELETE") else "INSERT 0 1"
+
+    async def executemany(self, query, rows):
+        self.statements.append((" ".join(query.split()), rows))
+
+    async def add_listener(self, channel, callback):
+        self.listeners.append((channel, callback))
+
+    async def close(self):
+        self.closed = True
+
+    def transaction(self):
+        return _AsyncNoop()
+
+
+class _AsyncNoop:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+        self.closed = False
+        self.exhausted = False
+
+    async def acquire(self, timeout=None):
+        if self.exhausted:
+            raise asyncio.TimeoutError
+        return self.conn
+
+    async def release(self, conn):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+    def get_max_size(self):
+        return 1
+
+
+@pytest.fixture
+def fake_asyncpg(monkeypatch):
+    pool = FakePool()
+    listener = FakeConnection()
+
+    async def create_pool(*args, **kwargs):
+        return pool
+
+    async def connect(*args, **kwargs):
+        return listener
+
+    monkeypatch.setattr(async_memory, "asyncpg", types.SimpleNamespace(create_pool=create_pool, connect=connect))
+    return pool, listener
+
+
+def test_connect_wires_pattern_cache_and_listener(fake_asyncpg):
+    pool, listener = fake_asyncpg
+
+    async def run():
+        agent = async_memory.AsyncComplianceMemoryAgent("postgresql://test")
+        await agent.connect()
+
+        assert agent.semantic.pattern_cache is agent.pattern_cache
+        channel, callback = listener.listeners[0]
+        assert channel == async_memory.PATTERN_CHANGE_CHANNEL
+        callback()
+        assert agent.pattern_cache.stats()["invalidations"] == 1
+
+        await agent.close()
+        await agent.close()
+        assert listener.closed and pool.closed
+
+    asyncio.run(run())
+
+
+def test_close_before_connect(fake_asyncpg):
+    agent = async_memory.AsyncComplianceMemoryAgent("postgresql://test", listen_for_pattern_changes=False)
+    asyncio.run(agent.close())
+
+
+def test_remember_findings_batch_matches_sync_signature(fake_asyncpg):
+    pool, _ = fake_asyncpg
+
+    async def run():
+        agent = async_memory.AsyncComplianceMemoryAgent("postgresql://test", listen_for_pattern_changes=False)
+        await agent.connect()
+
+        finding_ids = await agent.remember_findings_batch(
+            "00000000-0000-0000-0000-000000000001",
+            [{
+                "framework": "gdpr",
+                "finding_type": "violation",
+                "severity": "high",
+                "title": "No retention period",
+                "description": "...",
+                "pattern_key": "missing_data_retention_gdpr"
+            }],
+            superseded_ids=["00000000-0000-0000-0000-000000000002"],
+            sections=[{"chunk_index": 0, "content": "text", "content_hash": "h", "frameworks": ["gdpr"]}]
+        )
+        return finding_ids
+
+    finding_ids = asyncio.run(run())
+
+    assert len(finding_ids) == 1
+    statements = [query for query, _ in pool.conn.statements]
+    assert statements[0].startswith("DELETE FROM compliance_findings")
+    assert any(query.startswith("INSERT INTO compliance_findings") for query in statements)
+    assert any(query.startswith("INSERT INTO document_chunks") for query in statements)
+
+
+def test_checkout_timeout_raises_pool_timeout_error(fake_asyncpg):
+    pool, _ = fake_asyncpg
+
+    async def run():
+        agent = async_memory.AsyncComplianceMemoryAgent(
+            "postgresql://test", pool_checkout_timeout=0.1, listen_for_pattern_changes=False
+        )
+        await agent.connect()
+        pool.exhausted = True
+
+        with pytest.raises(async_memory.PoolTimeoutError):
+            await agent.episodic.delete_findings(["00000000-0000-0000-0000-000000000001"])
+        assert agent.pool.timeouts == 1
+
+    asyncio.run(run())
@@ -0,0 +1,114 @@
+"""
+Tests for map-reduce chunking: splitting, merging and the token budget
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages"))
+
+from agents.chunking import TokenBudget, merge_findings, split_into_chunks  # noqa: E402
+from agents.compliance_agents import ComplianceFinding  # noqa: E402
+
+
+def document(sections=6, words=60):
+    return "".join(
+        f"# Section {i}\n" + " ".join(f"clause{i}-{w}" for w in range(words)) + ".\n\n"
+        for i in range(sections)
+    )
+
+
+def finding(title, severity="medium", evidence=None, location=None, framework="gdpr"):
+    return ComplianceFinding(
+        framework=framework, finding_type="gap", severity=severity, title=title,
+        description="...", evidence=evidence, location=location
+    )
+
+
+def test_short_documents_are_one_chunk():
+    chunks = split_into_chunks("Short policy.", max_chars=100)
+
+    assert len(chunks) == 1
+    assert (chunks[0].text, chunks[0].start_char, chunks[0].end_char) == ("Short policy.", 0, 13)
+
+
+def test_chunks_cover_the_document_on_section_boundaries():
+    text = document()
+    chunks = split_into_chunks(text, max_chars=1500, overlap_chars=0)
+
+    assert len(chunks) > 1
+    assert all(c.total == len(chunks) for c in chunks)
+    assert "".join(c.text for c in chunks) == text
+    assert all(c.text.startswith("# Section") for c in chunks)
+    assert all(len(c.text) <= 1500 for c in chunks)
+
+
+def test_overlap_repeats_the_end_of_the_previous_chunk():
+    text = document()
+    chunks = split_into_chunks(text, max_chars=1500, overlap_chars=100)
+
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start_char < previous.end_char
+        assert previous.end_char - chunk.start_char <= 100
+        assert text[chunk.start_char - 1] == " "  # overlap starts on a word
+        assert chunk.text == text[chunk.start_char:chunk.end_char]
+
+
+def test_oversized_sections_are_cut_inside():
+    text = document(sections=1, words=1000)
+    chunks = split_into_chunks(text, max_chars=2000, overlap_chars=0)
+
+    assert len(chunks) > 1
+    assert "".join(c.text for c in chunks) == text
+    assert all(len(c.text) <= 2000 for c in chunks)
+
+
+def test_merge_keeps_the_most_severe_duplicate_and_combines_locations():
+    merged = merge_findings([
+        [finding("No retention period", "medium", location="Part 1"), finding("No DPO")],
+        [finding("no  retention period.", "high", location="Part 2")]
+    ])
+
+    assert [f.title for f in merged] == ["no  retention period.", "No DPO"]
+    assert merged[0].severity == "high"
+    assert merged[0].location == "Part 1; Part 2"
+
+
+def test_merge_matches_duplicates_by_evidence_within_a_framework():
+    evidence = "Data is retained indefinitely for analytics purposes."
+    merged = merge_findings([
+        [finding("Indefinite retention", evidence=evidence)],
+        [finding("Unlimited storage period", evidence=evidence), finding("Same clause", evidence=evidence, framework="soc2")]
+    ])
+
+    assert [(f.framework, f.title) for f in merged] == [("gdpr", "Indefinite retention"), ("soc2", "Same clause")]
+
+
+def test_token_budget_blocks_until_tokens_are_released():
+    budget = TokenBudget(100)
+    first = budget.acquire(80)
+    admitted = threading.Event()
+
+    def second():
+        budget.release(budget.acquire(50))
+        admitted.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    time.sleep(0.05)
+    assert not admitted.is_set()
+
+    budget.release(first)
+    thread.join(1)
+    assert admitted.is_set()
+    assert budget.stats()["in_flight_tokens"] == 0
+    assert budget.stats()["peak_tokens"] == 80
+
+
+def test_token_budget_admits_an_oversized_request_alone():
+    budget = TokenBudget(100)
+
+    assert budget.acquire(500) == 100
+    assert budget.stats()["in_flight_tokens"] == 100
@@ -0,0 +1,43 @@
+"""
+Tests for turning model output into ComplianceFinding objects
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages"))
+
+from agents.compliance_agents import (  # noqa: E402
+    ContractRiskAgent,
+    GDPRComplianceAgent,
+    FINDING_TYPES,
+    SEVERITIES
+)
+
+
+def test_enum_fields_are_normalized_to_the_allowed_sets():
+    agent = GDPRComplianceAgent(llm_client=None)
+
+    finding = agent._to_finding({"title": "A", "severity": " Critical ", "finding_type": "Best Practice"})
+    assert (finding.severity, finding.finding_type) == ("critical", "best_practice")
+
+    finding = agent._to_finding({"title": "A", "severity": "moderate", "finding_type": "non-compliant"})
+    assert (finding.severity, finding.finding_type) == ("medium", "violation")
+
+    finding = agent._to_finding({"title": "A", "severity": "info", "finding_type": "compliant"})
+    assert (finding.severity, finding.finding_type) == ("info", "compliant")
+
+
+def test_unknown_or_missing_values_fall_back_to_the_defaults():
+    finding = ContractRiskAgent(llm_client=None)._to_finding(
+        {"severity": "catastrophic", "finding_type": 42, "title": None}
+    )
+
+    assert finding.severity == "medium"
+    assert finding.finding_type == "risk"
+    assert finding.title == ""
+    assert finding.severity in SEVERITIES and finding.finding_type in FINDING_TYPES
+
+
+def test_non_object_findings_are_dropped():
+    assert GDPRComplianceAgent(llm_client=None)._to_finding("no retention period") is None
@@ -0,0 +1,90 @@
+"""
+Tests for the bounded per-dependency executors
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "apps", "agent-os"))
+
+from executors import BoundedExecutor, ExecutorSaturatedError  # noqa: E402
+
+
+@pytest.fixture
+def gate():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def test_submissions_beyond_workers_and_queue_are_rejected(gate):
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    futures = [executor.submit(gate.wait) for _ in range(2)]
+
+    with pytest.raises(ExecutorSaturatedError) as excinfo:
+        executor.submit(gate.wait)
+
+    assert excinfo.value.retry_after >= 1
+    assert executor.stats()["rejected"] == 1
+
+    gate.set()
+    for future in futures:
+        future.result(timeout=1)
+    executor.shutdown()
+    assert executor.stats()["completed"] == 2
+
+
+def test_admission_is_released_after_failures(gate):
+    executor = BoundedExecutor("test", max_workers=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            executor.submit(fail).result(timeout=1)
+
+    gate.set()
+    assert executor.submit(lambda: 42).result(timeout=1) == 42
+    executor.shutdown()
+
+
+def test_cancelled_queued_futures_release_admission(gate):
+    executor = BoundedExecutor("test", max_workers=1, max_queue=2)
+    running = executor.submit(gate.wait)
+    queued = [executor.submit(gate.wait) for _ in range(2)]
+
+    assert all(future.cancel() for future in queued)
+    assert executor.stats()["queued"] == 0
+    executor.submit(gate.wait)  # the cancelled slots are free again
+
+    gate.set()
+    running.result(timeout=1)
+    executor.shutdown(cancel_futures=True)
+    assert executor._admitted == 0
+
+
+def test_shutdown_with_cancel_futures_releases_admission(gate):
+    executor = BoundedExecutor("test", max_workers=1, max_queue=3)
+    running = executor.submit(gate.wait)
+    for _ in range(3):
+        executor.submit(gate.wait)
+
+    executor.shutdown(wait=False, cancel_futures=True)
+    gate.set()
+    running.result(timeout=1)
+    executor.shutdown()
+
+    assert executor._admitted == 0
+    assert executor.stats()["completed"] == 1
+
+
+def test_run_awaits_the_result_on_the_pool():
+    executor = BoundedExecutor("test", max_workers=2)
+
+    assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+    executor.shutdown()
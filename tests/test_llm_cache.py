@@ -0,0 +1,65 @@
+"""
+Tests for the on-disk LLM response cache
+"""
+
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages"))
+
+import agents.llm_cache as llm_cache  # noqa: E402
+from agents.llm_cache import LLMResponseCache  # noqa: E402
+
+
+def test_key_depends_on_every_request_part():
+    key = LLMResponseCache.make_key("gpt-4o", "system", "user", 0.2)
+
+    assert key == LLMResponseCache.make_key("gpt-4o", "system", "user", 0.2)
+    assert key != LLMResponseCache.make_key("gpt-4o-mini", "system", "user", 0.2)
+    assert key != LLMResponseCache.make_key("gpt-4o", "system2", "user", 0.2)
+    assert key != LLMResponseCache.make_key("gpt-4o", "system", "user2", 0.2)
+    assert key != LLMResponseCache.make_key("gpt-4o", "system", "user", 0.0)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = itertools.count(1)
+    monkeypatch.setattr(llm_cache.time, "time", lambda: next(clock))
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), max_bytes=30)
+
+    cache.put("a", "gpt-4o", "x" * 10)
+    cache.put("b", "gpt-4o", "y" * 10)
+    cache.put("c", "gpt-4o", "z" * 10)
+    assert cache.get("a") == "x" * 10  # a is now the most recently used
+
+    cache.put("d", "gpt-4o", "w" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10
+    assert cache.get("c") == "z" * 10
+    assert cache.get("d") == "w" * 10
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["size_bytes"] == 30 and stats["evictions"] == 1
+
+
+def test_oversized_responses_are_not_cached(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), max_bytes=5)
+
+    cache.put("a", "gpt-4o", "too long")
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = LLMResponseCache(path)
+    cache.put("a", "gpt-4o", '{"findings": []}')
+    cache.put("a", "gpt-4o", '{"findings": [1]}')
+    cache.close()
+
+    reopened = LLMResponseCache(path)
+
+    assert reopened.get("a") == '{"findings": [1]}'
+    assert reopened.stats()["entries"] == 1
+    assert reopened.stats()["size_bytes"] == len('{"findings": [1]}')
@@ -0,0 +1,131 @@
+"""
+Tests for the LLM gateway's rate limiting, retries and circuit breaker
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages"))
+
+from agents.llm_gateway import (  # noqa: E402
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMGateway,
+    RateLimitTimeoutError,
+    TokenBucket
+)
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeClient:
+    """OpenAI-shaped client returning queued outcomes (exceptions are raised)."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+REQUEST = {"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 10}
+
+
+def test_token_bucket_refills_continuously_up_to_capacity():
+    bucket = TokenBucket(60)  # one per second
+    now = bucket.updated
+
+    assert bucket.wait_time(60, now) == 0.0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1, now + 1) == 0.0
+    assert bucket.wait_time(1000, now + 3600) == 0.0  # capped at capacity
+    assert bucket.tokens == 60
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    breaker.record_failure(0)
+    assert breaker.state == "closed" and not breaker.rejecting(0)
+    breaker.record_failure(1)
+    assert breaker.state == "open" and breaker.rejecting(5)
+    assert breaker.retry_after(5) == 6
+
+    assert not breaker.rejecting(11)
+    assert breaker.state == "half_open"
+    breaker.admit()
+    assert breaker.rejecting(11)  # one trial call at a time
+
+    breaker.record_success()
+    assert breaker.state == "closed" and not breaker.rejecting(12)
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10)
+    for now in range(5):
+        breaker.record_failure(now)
+
+    assert not breaker.rejecting(20)
+    breaker.admit()
+    breaker.record_failure(20)
+
+    assert breaker.state == "open" and breaker.rejecting(25)
+
+
+def test_transient_errors_are_retried():
+    client = FakeClient([APIStatusError(503), APIStatusError(429), "ok"])
+    gateway = LLMGateway(client, max_retries=3, base_delay=0)
+
+    assert gateway.create_chat_completion(**REQUEST) == "ok"
+    assert client.calls == 3
+    stats = gateway.stats()["models"]["gpt-4o"]
+    assert (stats["retries"], stats["failures"], stats["circuit"]) == (2, 2, "closed")
+
+
+def test_client_errors_are_not_retried_or_counted_against_the_breaker():
+    client = FakeClient([APIStatusError(400)])
+    gateway = LLMGateway(client, max_retries=3, base_delay=0, breaker_threshold=1)
+
+    with pytest.raises(APIStatusError):
+        gateway.create_chat_completion(**REQUEST)
+
+    assert client.calls == 1
+    assert gateway.stats()["models"]["gpt-4o"]["circuit"] == "closed"
+
+
+def test_open_breaker_rejects_without_calling_the_model():
+    client = FakeClient([APIStatusError(500), APIStatusError(500)])
+    gateway = LLMGateway(client, max_retries=1, base_delay=0, breaker_threshold=2, breaker_reset=60)
+
+    with pytest.raises(APIStatusError):
+        gateway.create_chat_completion(**REQUEST)
+    with pytest.raises(CircuitOpenError) as excinfo:
+        gateway.create_chat_completion(**REQUEST)
+
+    assert client.calls == 2
+    assert excinfo.value.retry_after > 0
+
+
+def test_exhausted_rate_limit_fails_after_max_wait():
+    client = FakeClient(["ok", "ok"])
+    gateway = LLMGateway(client, requests_per_minute=1, max_wait=0)
+
+    assert gateway.create_chat_completion(**REQUEST) == "ok"
+    with pytest.raises(RateLimitTimeoutError):
+        gateway.create_chat_completion(**REQUEST)
+    assert client.calls == 1
@@ -0,0 +1,95 @@
+"""
+Tests for the deterministic learned-indicator matcher
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages"))
+
+from agents.pattern_matcher import AhoCorasick, PatternMatcher  # noqa: E402
+
+
+def naive_matches(keywords, text):
+    return sorted(
+        (start, start + len(keyword), keyword)
+        for keyword in keywords
+        for start in range(len(text) - len(keyword) + 1)
+        if text.startswith(keyword, start)
+    )
+
+
+def automaton(keywords):
+    matcher = AhoCorasick()
+    for keyword in keywords:
+        matcher.add(keyword, keyword)
+    matcher.build()
+    return matcher
+
+
+def test_failure_links_find_overlapping_and_nested_keywords():
+    keywords = ["he", "she", "his", "hers"]
+
+    assert sorted(automaton(keywords).iter_matches("ushers")) == naive_matches(keywords, "ushers")
+
+
+def test_matches_agree_with_a_naive_search():
+    rng = random.Random(7)
+    for _ in range(50):
+        keywords = list({"".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(6)})
+        text = "".join(rng.choice("ab") for _ in range(40))
+
+        assert sorted(automaton(keywords).iter_matches(text)) == naive_matches(keywords, text)
+
+
+def pattern(key, indicator, **extra):
+    return {"pattern_key": key, "risk_indicator": indicator, "framework": "gdpr", **extra}
+
+
+def test_scan_reports_whole_word_matches_only_case_insensitively():
+    matcher = PatternMatcher()
+    matcher.refresh([pattern("indefinite", "retained indefinitely"), pattern("share", "share")])
+    text = "Data is Retained Indefinitely. We shareholders share it; (share)."
+
+    matches = matcher.scan(text)
+
+    assert [(m.pattern_key, m.matched_text) for m in matches] == [
+        ("indefinite", "Retained Indefinitely"),
+        ("share", "share"),
+        ("share", "share")
+    ]
+    assert all(text[m.start:m.end] == m.matched_text for m in matches)
+
+
+def test_absence_and_short_indicators_are_not_compiled():
+    matcher = PatternMatcher()
+    matcher.refresh([pattern("a", "no retention period"), pattern("b", "ok"), pattern("c", "without consent")])
+
+    assert matcher.stats()["patterns"] == 0
+    assert matcher.scan("no retention period without consent ok") == []
+
+
+def test_refresh_rebuilds_only_when_patterns_change():
+    matcher = PatternMatcher()
+    patterns = [pattern("indefinite", "retained indefinitely", precision_score=0.9)]
+
+    assert matcher.refresh(patterns) is True
+    assert matcher.refresh([dict(p) for p in patterns]) is False
+    assert matcher.refresh([pattern("indefinite", "retained indefinitely", precision_score=0.95)]) is True
+    assert matcher.precision_of("indefinite") == 0.95
+    assert matcher.stats()["builds"] == 2
+
+
+def test_one_finding_per_pattern_at_its_first_occurrence():
+    matcher = PatternMatcher()
+    matcher.refresh([pattern("indefinite", "retained indefinitely", avg_severity="high")])
+    text = "Logs are retained indefinitely. Backups are also retained indefinitely."
+
+    findings = matcher.to_findings(text, matcher.scan(text))
+
+    assert len(findings) == 1
+    assert findings[0].severity == "high"
+    assert findings[0].pattern_key == "indefinite"
+    assert findings[0].start_offset == text.index("retained")
+    assert "2 occurrences" in findings[0].description
@@ -0,0 +1,91 @@
+"""
+Tests for section fingerprints and incremental re-analysis planning
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages"))
+
+from agents.revisions import anchor_section, fingerprint_sections, plan_revision  # noqa: E402
+
+
+SECTIONS = [
+    "# Data Retention\nPersonal data is kept for as long as necessary.\n\n",
+    "# Data Subject Rights\nUsers may request access to their personal data at any time.\n\n",
+    "# Security\nAll data is encrypted at rest and in transit with AES-256.\n\n",
+    "# Subprocessors\nA list of subprocessors is published on our website and kept current.\n\n"
+]
+
+
+def stored_sections(sections, frameworks=("gdpr",)):
+    return [{"content_hash": s.content_hash, "frameworks": list(frameworks)} for s in sections]
+
+
+def edited(index, replacement):
+    return "".join(replacement if i == index else text for i, text in enumerate(SECTIONS))
+
+
+def test_fingerprints_ignore_whitespace_only_edits():
+    before = fingerprint_sections("".join(SECTIONS))
+    after = fingerprint_sections("".join(SECTIONS).replace("kept for as", "kept  for\nas"))
+
+    assert [s.content_hash for s in before] == [s.content_hash for s in after]
+    assert [s.section_title for s in before] == ["# Data Retention", "# Data Subject Rights", "# Security", "# Subprocessors"]
+
+
+def test_only_changed_sections_are_reanalyzed():
+    previous = fingerprint_sections("".join(SECTIONS))
+    current = fingerprint_sections(edited(0, "# Data Retention\nPersonal data is deleted after 24 months.\n\n"))
+    findings = [
+        {"id": "1", "framework": "gdpr", "section_hash": previous[0].content_hash},
+        {"id": "2", "framework": "gdpr", "section_hash": previous[2].content_hash},
+        {"id": "3", "framework": "gdpr", "section_hash": previous[2].content_hash, "pattern_key": "weak_encryption"}
+    ]
+
+    plan = plan_revision(current, stored_sections(previous), findings, ["gdpr"])
+
+    assert plan.incremental
+    assert [s.index for s in plan.changed] == [0]
+    assert [f["id"] for f in plan.carried_forward] == ["2"]
+
+
+def test_unanchored_finding_forces_full_reanalysis():
+    previous = fingerprint_sections("".join(SECTIONS))
+    current = fingerprint_sections(edited(0, "# Data Retention\nPersonal data is deleted after 24 months.\n\n"))
+    findings = [
+        {"id": "1", "framework": "gdpr", "section_hash": previous[2].content_hash},
+        {"id": "2", "framework": "gdpr", "section_hash": None, "title": "No retention period defined"}
+    ]
+
+    plan = plan_revision(current, stored_sections(previous), findings, ["gdpr"])
+
+    assert not plan.incremental
+    assert len(plan.changed) == len(current)
+    assert plan.carried_forward == []
+
+
+def test_large_or_unfingerprinted_changes_are_analyzed_in_full():
+    previous = fingerprint_sections("".join(SECTIONS))
+    current = fingerprint_sections("# Everything\n" + "New text. " * 200)
+
+    assert not plan_revision(current, stored_sections(previous), [], ["gdpr"]).incremental
+    assert not plan_revision(previous, [], [], ["gdpr"]).incremental
+
+
+def test_sections_unknown_to_a_planned_framework_count_as_changed():
+    previous = fingerprint_sections("".join(SECTIONS))
+
+    plan = plan_revision(previous, stored_sections(previous, ["gdpr"]), [], ["gdpr", "soc2"])
+
+    assert not plan.incremental
+
+
+def test_anchor_section_uses_offsets_then_evidence():
+    text = "".join(SECTIONS)
+    sections = fingerprint_sections(text)
+
+    assert anchor_section(text, sections, None, text.index("AES-256")) == sections[2].content_hash
+    assert anchor_section(text, sections, "Users may  request access to their personal data") == sections[1].content_hash
+    assert anchor_section(text, sections, "No retention period is defined anywhere") is None
+    assert anchor_section(text, sections, None) is None
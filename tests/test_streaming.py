@@ -0,0 +1,98 @@
+"""
+Tests for incremental findings parsing and streamed completions
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages"))
+
+from agents.compliance_agents import GDPRComplianceAgent  # noqa: E402
+from agents.streaming import IncrementalFindingsParser  # noqa: E402
+
+
+def feed_in_pieces(parser, text, size):
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return completed
+
+
+def test_parser_emits_each_finding_once_complete():
+    parser = IncrementalFindingsParser()
+
+    assert parser.feed('{"findings": [{"title": "A"}, {"ti') == [{"title": "A"}]
+    assert parser.feed('tle": "B"}]}') == [{"title": "B"}]
+    assert parser.emitted == 2
+
+
+def test_parser_handles_escapes_and_nested_braces():
+    text = (
+        '{"summary": "ignore {this} and \\"findings\\": [{}]", '
+        '"findings": [{"title": "Quote \\" and brace }", "location": {"section": "4.2"}, "tags": ["a", "]"]}, '
+        '{"title": "Backslash \\\\"}]}'
+    )
+
+    for size in (1, 3, len(text)):
+        completed = feed_in_pieces(IncrementalFindingsParser(), text, size)
+        assert completed == [
+            {"title": 'Quote " and brace }', "location": {"section": "4.2"}, "tags": ["a", "]"]},
+            {"title": "Backslash \\"}
+        ]
+
+
+def test_parser_ignores_arrays_under_other_keys():
+    parser = IncrementalFindingsParser()
+
+    assert parser.feed('{"meta": {"findings": [{"title": "nested"}]}, "other": [{"x": 1}], "findings": []}') == []
+
+
+class FakeCompletions:
+    """chat.completions with the keyword-only signature of the pinned openai SDK (no **kwargs)."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = []
+
+    def create(
+        self,
+        *,
+        messages,
+        model,
+        max_tokens=None,
+        response_format=None,
+        stream=None,
+        stream_options=None,
+        temperature=None
+    ):
+        self.calls.append({"stream": stream, "stream_options": stream_options})
+        return iter(self.chunks)
+
+
+def chunk(content=None, usage=None):
+    choices = [] if content is None else [SimpleNamespace(delta=SimpleNamespace(content=content))]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def test_stream_completion_reports_findings_and_usage():
+    usage = SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+    completions = FakeCompletions([
+        chunk('{"findings": [{"title": "No retention period", "severity": "high"}'),
+        chunk(', {"title": "No DPO"}]}'),
+        chunk(usage=usage)
+    ])
+    agent = GDPRComplianceAgent(SimpleNamespace(chat=SimpleNamespace(completions=completions)), model="gpt-4o")
+    reported = []
+
+    text, final_usage = agent._stream_completion(
+        {"model": "gpt-4o", "messages": [], "temperature": 0.2, "max_tokens": 100,
+         "response_format": {"type": "json_object"}},
+        reported.append
+    )
+
+    assert [f.title for f in reported] == ["No retention period", "No DPO"]
+    assert all(f.framework == "gdpr" for f in reported)
+    assert text.endswith("]}")
+    assert final_usage is usage
+    assert completions.calls == [{"stream": True, "stream_options": {"include_usage": True}}]
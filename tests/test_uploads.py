@@ -0,0 +1,92 @@
+"""
+Tests for chunked upload storage and the upload size limit
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "apps", "agent-os"))
+
+from uploads import UploadSizeLimitMiddleware, UploadTooLargeError, read_upload, store_upload  # noqa: E402
+
+
+class FakeUploadFile:
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+
+    async def read(self, size=-1):
+        return self.stream.read(size)
+
+
+def test_store_upload_writes_content_addressed_file(tmp_path):
+    data = "Données personnelles conservées 24 mois.\n".encode("utf-8") * 100
+
+    stored = asyncio.run(store_upload(FakeUploadFile(data), str(tmp_path), max_bytes=10_000, chunk_size=7))
+
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert stored.size_bytes == len(data)
+    assert read_upload(stored.path) == data.decode("utf-8")
+    assert os.listdir(tmp_path) == [f"{stored.sha256}.txt"]
+
+
+@pytest.mark.parametrize("data, error", [(b"x" * 101, UploadTooLargeError), (b"\xff\xfe text", UnicodeDecodeError)])
+def test_store_upload_rejects_and_cleans_up(tmp_path, data, error):
+    with pytest.raises(error):
+        asyncio.run(store_upload(FakeUploadFile(data), str(tmp_path), max_bytes=100, chunk_size=16))
+
+    assert os.listdir(tmp_path) == []
+
+
+async def read_body_app(scope, receive, send):
+    """Reads the whole body; answers 400 if reading fails, like form parsing does."""
+    try:
+        while (await receive()).get("more_body"):
+            pass
+    except Exception:
+        await send({"type": "http.response.start", "status": 400, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def post(chunks, headers=(), path="/upload"):
+    messages = iter(
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    )
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = UploadSizeLimitMiddleware(read_body_app, path="/upload", max_bytes=8, limit_bytes=10)
+    scope = {"type": "http", "method": "POST", "path": path, "headers": list(headers)}
+    asyncio.run(middleware(scope, receive, send))
+    return [m["status"] for m in sent if m["type"] == "http.response.start"]
+
+
+def test_bodies_within_the_limit_pass():
+    assert post([b"12345", b"12345"]) == [200]
+
+
+def test_chunked_bodies_are_cut_off_once_over_the_limit():
+    assert post([b"123456", b"123456", b"never read"]) == [413]
+
+
+def test_declared_content_length_is_rejected_up_front():
+    assert post([b""], headers=[(b"content-length", b"1000")]) == [413]
+
+
+def test_other_routes_are_not_limited():
+    assert post([b"x" * 100], path="/api/documents/analyze") == [200]
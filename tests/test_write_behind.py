@@ -0,0 +1,119 @@
+"""
+Tests for the write-behind buffer's spill, replay and quarantine handling
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "packages"))
+
+from memory.write_behind import WriteBehindBuffer  # noqa: E402
+
+
+class FakeStore:
+    """flush_fn that commits batches atomically and fails on demand."""
+
+    def __init__(self):
+        self.committed = []
+        self.down = False
+        self.bad = set()
+
+    def __call__(self, items):
+        if self.down:
+            raise ConnectionError("database unavailable")
+        if any(item["n"] in self.bad for item in items):
+            raise ValueError("invalid input syntax for type uuid")
+        self.committed.extend(item["n"] for item in items)
+
+
+def make_buffer(tmp_path, store, batch_size=2):
+    # Not started: tests drive flush() and replay_spilled() directly
+    return WriteBehindBuffer(store, spill_dir=str(tmp_path), batch_size=batch_size, put_timeout=0.01)
+
+
+def quarantined(buffer):
+    items = []
+    for name in sorted(os.listdir(buffer.quarantine_dir)):
+        with open(os.path.join(buffer.quarantine_dir, name), encoding="utf-8") as f:
+            items.extend(json.loads(line)["n"] for line in f)
+    return items
+
+
+def test_submit_assigns_item_ids_and_flush_commits_in_order(tmp_path):
+    store = FakeStore()
+    buffer = make_buffer(tmp_path, store)
+
+    items = [{"n": n} for n in range(5)]
+    for item in items:
+        buffer.submit(item)
+    buffer.flush()
+
+    assert store.committed == [0, 1, 2, 3, 4]
+    assert len({item["item_id"] for item in items}) == 5
+    assert buffer.stats()["flushed"] == 5
+
+
+def test_failed_flush_spills_and_replays_once_the_database_recovers(tmp_path):
+    store = FakeStore()
+    buffer = make_buffer(tmp_path, store)
+
+    store.down = True
+    for n in range(3):
+        buffer.submit({"n": n})
+    buffer.flush()
+
+    assert store.committed == []
+    assert buffer.stats()["spill_files"] == 2
+
+    assert buffer.replay_spilled() is False
+
+    store.down = False
+    assert buffer.replay_spilled() is True
+    assert store.committed == [0, 1, 2]
+    assert buffer.stats()["spill_files"] == 0
+
+
+def test_replay_keeps_progress_of_committed_slices(tmp_path):
+    store = FakeStore()
+    buffer = make_buffer(tmp_path, store)
+    buffer._spill([{"n": n} for n in range(5)])
+
+    def fail_after_first_slice(items):
+        if store.committed:
+            raise ConnectionError("database unavailable")
+        store(items)
+
+    buffer.flush_fn = fail_after_first_slice
+    assert buffer.replay_spilled() is False
+
+    buffer.flush_fn = store
+    assert buffer.replay_spilled() is True
+    assert store.committed == [0, 1, 2, 3, 4]
+
+
+def test_permanent_error_quarantines_only_the_bad_item(tmp_path):
+    store = FakeStore()
+    buffer = make_buffer(tmp_path, store, batch_size=4)
+    store.bad = {2}
+
+    for n in range(4):
+        buffer.submit({"n": n})
+    buffer.flush()
+
+    assert store.committed == [0, 1, 3]
+    assert quarantined(buffer) == [2]
+    assert buffer.stats()["quarantined"] == 1
+    assert buffer.stats()["spill_files"] == 0
+
+
+def test_replay_quarantines_bad_items_and_continues(tmp_path):
+    store = FakeStore()
+    buffer = make_buffer(tmp_path, store, batch_size=3)
+    buffer._spill([{"n": n} for n in range(4)])
+    buffer._spill([{"n": 10}])
+    store.bad = {1}
+
+    assert buffer.replay_spilled() is True
+    assert store.committed == [0, 2, 3, 10]
+    assert quarantined(buffer) == [1]